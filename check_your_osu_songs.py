@@ -11,6 +11,8 @@ errs = {}
 # Your osu songs
 # Will traverse a directory and try to read and calculate all .osu files
 OSU_SONGS_PATH = r'E:\osu\songs'
+# Parsed beatmap snapshots, the next runs will load them instead of parsing (set None to disable)
+CACHE_DIR = r'./.beatmap_cache'
 
 
 def walk(path):
@@ -36,16 +38,18 @@ async def main():
 
     # Start
     print('[ Start task ]')
-    for f in osu_list:
+    # Parse in parallel on native threads, calculate as soon as a beatmap is ready
+    start = time.time_ns()
+    for f, beatmap in iter_beatmaps(osu_list, cache_dir=CACHE_DIR):
         try:
-            start = time.time_ns()
-            c.calculate(Beatmap(f))
-            instant_ms = (time.time_ns() - start) / 1000 / 1000
-            total_dutaion += instant_ms
+            if isinstance(beatmap, Exception):
+                raise beatmap
+            c.calculate(beatmap)
             ok_count += 1
         except Exception as err:
             err_count += 1
             errs[f] = str(err)
+        total_dutaion = (time.time_ns() - start) / 1000 / 1000
         done += 1
         print(
             '\r{}/{}; ok: {}, err: {}; total time: {:.2f}ms, avg: {:.2f}ms'.format(
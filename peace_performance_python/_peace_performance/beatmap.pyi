@@ -1,8 +1,12 @@
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING, overload
 
 from .types import BaseGetter
 
+if TYPE_CHECKING:
+    from numpy import ndarray
+    from .pp import CalcResult
+
 
 class DifficultyPoint(BaseGetter):
     '''
@@ -149,6 +153,102 @@ class HitObject(BaseGetter):
     def attrs_dict(self) -> Dict[str, float]: ...
 
 
+class HitObjectView:
+    '''
+    Sequence view over the hit objects of a Beatmap (`Rust`),
+    the HitObject objects are only created on access (no copy of the whole list).
+
+    Slices with a step of 1 return a view, other slices return a list.
+    '''
+    def __len__(self) -> int: ...
+    @overload
+    def __getitem__(self, index: int) -> HitObject: ...
+    @overload
+    def __getitem__(self, index: slice) -> Union['HitObjectView', List[HitObject]]: ...
+    def __iter__(self) -> 'HitObjectIter': ...
+
+    def to_list(self) -> List[HitObject]:
+        '''Materialize the whole view into a list'''
+        ...
+
+    def between(self, start_ms: float, end_ms: float) -> 'HitObjectView':
+        '''View of the items with `start_ms <= time < end_ms` (binary search)'''
+        ...
+
+    def objects_between(self, start_ms: float, end_ms: float) -> 'HitObjectView':
+        '''View of the hit objects with `start_ms <= start_time < end_ms` (binary search)'''
+        ...
+
+
+class HitObjectIter:
+    def __iter__(self) -> 'HitObjectIter': ...
+    def __next__(self) -> HitObject: ...
+
+
+class TimingPointView:
+    '''
+    Sequence view over the timing points of a Beatmap (`Rust`),
+    the TimingPoint objects are only created on access (no copy of the whole list).
+
+    Slices with a step of 1 return a view, other slices return a list.
+    '''
+    def __len__(self) -> int: ...
+    @overload
+    def __getitem__(self, index: int) -> TimingPoint: ...
+    @overload
+    def __getitem__(self, index: slice) -> Union['TimingPointView', List[TimingPoint]]: ...
+    def __iter__(self) -> 'TimingPointIter': ...
+
+    def to_list(self) -> List[TimingPoint]:
+        '''Materialize the whole view into a list'''
+        ...
+
+    def between(self, start_ms: float, end_ms: float) -> 'TimingPointView':
+        '''View of the items with `start_ms <= time < end_ms` (binary search)'''
+        ...
+
+    def at_time(self, time_ms: float) -> Optional[TimingPoint]:
+        '''The timing point in effect at `time_ms` (the last one at or before it), binary search'''
+        ...
+
+
+class TimingPointIter:
+    def __iter__(self) -> 'TimingPointIter': ...
+    def __next__(self) -> TimingPoint: ...
+
+
+class DifficultyPointView:
+    '''
+    Sequence view over the difficulty points of a Beatmap (`Rust`),
+    the DifficultyPoint objects are only created on access (no copy of the whole list).
+
+    Slices with a step of 1 return a view, other slices return a list.
+    '''
+    def __len__(self) -> int: ...
+    @overload
+    def __getitem__(self, index: int) -> DifficultyPoint: ...
+    @overload
+    def __getitem__(self, index: slice) -> Union['DifficultyPointView', List[DifficultyPoint]]: ...
+    def __iter__(self) -> 'DifficultyPointIter': ...
+
+    def to_list(self) -> List[DifficultyPoint]:
+        '''Materialize the whole view into a list'''
+        ...
+
+    def between(self, start_ms: float, end_ms: float) -> 'DifficultyPointView':
+        '''View of the items with `start_ms <= time < end_ms` (binary search)'''
+        ...
+
+    def at_time(self, time_ms: float) -> Optional[DifficultyPoint]:
+        '''The difficulty point in effect at `time_ms` (the last one at or before it), binary search'''
+        ...
+
+
+class DifficultyPointIter:
+    def __iter__(self) -> 'DifficultyPointIter': ...
+    def __next__(self) -> DifficultyPoint: ...
+
+
 class Beatmap(BaseGetter):
     '''
     The Beatmap (`Rust`) used to calculate the pp, it contains the parsed .osu beatmap.
@@ -186,6 +286,16 @@ class Beatmap(BaseGetter):
     `timing_points`: `Optional[List[TimingPoint]]`
 
     `difficulty_points`: `Optional[List[DifficultyPoint]]`
+
+    `difficulty_cache_hits`: `int`
+
+    `difficulty_cache_misses`: `int`
+
+    `difficulty_cache_size`: `int`
+
+    `difficulty_cache_limit`: `int` # Least recently used entries are evicted first
+
+    `strains_cache_size`: `int`
     '''
     mode: int
     mode_str: Optional[str]
@@ -203,24 +313,303 @@ class Beatmap(BaseGetter):
     tick_rate: float
     stack_leniency: Optional[float]
 
+    difficulty_cache_hits: int
+    difficulty_cache_misses: int
+    difficulty_cache_size: int
+    difficulty_cache_limit: int
+    strains_cache_size: int
+
     @property
     def as_dict(self) -> Dict[str, float, str, None]: ...
     @property
     def attrs_dict(self) -> Dict[str, float, str, None]: ...
 
+    @property
+    def md5(self) -> Optional[str]:
+        '''md5 (lowercase hex) of the .osu file content, only if computed during the parse (`hash=True`)'''
+        ...
+    @property
+    def fast_hash(self) -> Optional[int]:
+        '''Fast (xxh3, 64 bits) hash of the .osu file content, only if computed during the parse (`hash=True`)'''
+        ...
+
     @property
     def hit_objects(self) -> List[HitObject]: ...
     @property
+    def hit_objects_view(self) -> HitObjectView: ...
+    @property
+    def timing_points_view(self) -> TimingPointView: ...
+    @property
+    def difficulty_points_view(self) -> DifficultyPointView: ...
+    @property
     def timing_points(self) -> List[TimingPoint]: ...
     @property
     def difficulty_points(self) -> List[DifficultyPoint]: ...
 
+    def __init__(self) -> 'Beatmap':
+        '''Empty Beatmap, only used by pickle'''
+        ...
+
+    def to_bytes(self) -> bytes:
+        '''Serialize into the compact (versioned) binary format, pickle uses the same format'''
+        ...
+
+    @staticmethod
+    def from_bytes_serialized(buf: Union[bytes, bytearray, memoryview]) -> 'Beatmap':
+        '''Load a beatmap serialized with `to_bytes` (any buffer protocol object, not copied)'''
+        ...
+
+    def set_difficulty_cache_limit(self, limit: int) -> None:
+        '''
+        Set the max amount of memoized difficulty attributes (and strains), `0` disables the cache.
+        The least recently used entries are evicted first
+        '''
+        ...
+
+    def clear_difficulty_cache(self) -> None:
+        '''Clear the memoized difficulty attributes and strains (and reset hit / miss counters)'''
+        ...
+
+    def difficulty_table(self, mods_list: Sequence[int], mode: Optional[Union[int, str]] = None,
+                         workers: Optional[int] = None) -> List['CalcResult']:
+        '''
+        SS results (stars, max combo, pp) of each mods in one native call.
+
+        Mods which share the same difficulty reuse the difficulty attributes,
+        the distinct ones are calculated on `workers` native threads.
+        '''
+        ...
+
+    def strains(self, mode: Optional[Union[int, str]] = None,
+                mods: int = 0) -> Dict[str, Union[int, float, 'ndarray']]:
+        '''
+        Section strain peaks of each skill (contiguous numpy arrays), memoized per (mode, mods).
+
+        Keys: `mode`, `section_len` (ms), and the skills of the mode:
+        `aim`, `aim_no_sliders`, `speed`, `flashlight` (std),
+        `color`, `rhythm`, `stamina` (taiko), `movement` (ctb), `strains` (mania)
+
+        ### Available only when feature `numpy` is enabled. (Default enabled)
+        '''
+        ...
+
+    def hit_objects_array(self) -> Dict[str, 'ndarray']:
+        '''
+        Hit objects as struct-of-arrays (contiguous numpy arrays).
+
+        Keys: `start_time`, `end_time`, `x`, `y`, `kind` (0: circle, 1: slider, 2: spinner, 3: hold),
+        `repeats` (0 if not a slider), `pixel_len` (0.0 if not a slider)
+
+        ### Available only when feature `numpy` is enabled. (Default enabled)
+        '''
+        ...
+
+    def timing_points_array(self) -> Dict[str, 'ndarray']:
+        '''Timing points as struct-of-arrays (numpy arrays), keys: `time`, `beat_len`'''
+        ...
+
+    def difficulty_points_array(self) -> Dict[str, 'ndarray']:
+        '''Difficulty points as struct-of-arrays (numpy arrays), keys: `time`, `speed_multiplier`'''
+        ...
+
 
 async def read_beatmap_async(path: Path) -> Beatmap:
     '''Read a beatmap async, returns Beatmap object (`Rust`)'''
     ...
 
 
-def read_beatmap_sync(path: Path) -> Beatmap:
-    '''Read a beatmap, returns Beatmap object (`Rust`)'''
+def read_beatmap_sync(path: Path, mmap: bool = False, cache_dir: Optional[Path] = None,
+                      hash: bool = False) -> Beatmap:
+    '''
+    Read a beatmap, returns Beatmap object (`Rust`)
+
+    `mmap`: parse from a memory-mapped region of the file
+
+    `cache_dir`: load the parsed beatmap snapshot from this directory, or parse and write it on a miss
+
+    `hash`: compute the md5 (and a fast hash) of the file content during the parse (one read of the file)
+    '''
+    ...
+
+
+def read_beatmap_bytes(buf: Union[bytes, bytearray, memoryview], hash: bool = False) -> Beatmap:
+    '''
+    Parse a beatmap from a buffer protocol object without copying it, returns Beatmap object (`Rust`)
+
+    `hash`: compute the md5 (and a fast hash) of the content
+    '''
+    ...
+
+
+async def read_beatmap_bytes_async(buf: Union[bytes, bytearray, memoryview]) -> Beatmap:
+    '''Parse a beatmap async from a buffer protocol object without copying it, returns Beatmap object (`Rust`)'''
+    ...
+
+
+def read_beatmaps(paths: Sequence[Path], workers: Optional[int] = None,
+                  mmap: bool = False, cache_dir: Optional[Path] = None,
+                  hash: bool = False) -> List[Union[Beatmap, Exception]]:
+    '''
+    Read beatmaps in parallel on native threads, returns Beatmap objects (`Rust`) in the order of the paths,
+    or the exception objects if failed.
+    '''
+    ...
+
+
+class BeatmapLoader:
+    '''Iterator of (path, Beatmap object (`Rust`) or exception object), in the completion order'''
+
+    def __iter__(self) -> 'BeatmapLoader': ...
+    def __next__(self) -> Tuple[str, Union[Beatmap, Exception]]: ...
+
+
+def iter_beatmaps(paths: Sequence[Path], workers: Optional[int] = None,
+                  mmap: bool = False, cache_dir: Optional[Path] = None,
+                  hash: bool = False) -> BeatmapLoader:
+    '''Read beatmaps in parallel on native threads, yields (path, Beatmap or exception) in the completion order'''
     ...
+
+
+class BeatmapMetadata(BaseGetter):
+    '''
+    Beatmap metadata (`Rust`) scanned from the .osu file, without the objects
+
+    `mode`: `int`
+
+    `mode_str`: `str`
+
+    `version`: `int`
+
+    `n_circles`: `int`
+
+    `n_sliders`: `int`
+
+    `n_spinners`: `int`
+
+    `n_objects`: `int`
+
+    `ar`: `float`
+
+    `od`: `float`
+
+    `cs`: `float`
+
+    `hp`: `float`
+
+    `sv`: `float`
+
+    `tick_rate`: `float`
+
+    `stack_leniency`: `float`
+    '''
+    mode: int
+    mode_str: str
+    version: int
+    n_circles: int
+    n_sliders: int
+    n_spinners: int
+    n_objects: int
+    ar: float
+    od: float
+    cs: float
+    hp: float
+    sv: float
+    tick_rate: float
+    stack_leniency: float
+
+    @property
+    def as_dict(self) -> Dict[str, Union[float, int, str]]: ...
+    @property
+    def attrs_dict(self) -> Dict[str, Union[float, int, str]]: ...
+
+
+def scan_beatmap_metadata(source: Union[Path, bytes, bytearray, memoryview]) -> BeatmapMetadata:
+    '''
+    Scan the metadata of a beatmap (a .osu file path, or a buffer protocol object with its content)
+    without parsing the hit objects, timing points and slider curves
+    '''
+    ...
+
+
+def scan_beatmaps_metadata(paths: Sequence[Path],
+                           workers: Optional[int] = None) -> List[Union[BeatmapMetadata, Exception]]:
+    '''
+    Scan the metadata of beatmaps in parallel on native threads, returns BeatmapMetadata objects (`Rust`)
+    in the order of the paths, or the exception objects if failed.
+    '''
+    ...
+
+
+class BeatmapStore:
+    '''
+    Thread-safe native beatmap store (`Rust`) with Lru eviction and an optional ttl.
+
+    Beatmaps can be indexed with `md5`, `bid` (beatmap id) or their `path`.
+
+    `limit`: `int` # Max amount of beatmaps
+
+    `ttl`: `Optional[float]` # Seconds, beatmaps older than this are expired
+
+    `max_bytes`: `Optional[int]` # Max (approximate) memory used by the beatmaps
+
+    `bytes`: `int` # (approximate) memory used by the beatmaps
+
+    `hits`: `int`
+
+    `misses`: `int`
+
+    `evictions`: `int`
+    '''
+    limit: int
+    ttl: Optional[float]
+    max_bytes: Optional[int]
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, limit: int = 1000, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    @property
+    def as_string(self) -> str:
+        '''Get attrs as text'''
+        ...
+
+    def insert_raw(self, beatmap: Beatmap, md5: Optional[str] = None,
+                   bid: Optional[int] = None, path: Optional[Path] = None) -> None:
+        '''
+        Insert a Beatmap (`Rust`) (replace the old one with the same keys),
+        `md5` defaults to the md5 computed during the parse (`hash=True`)
+        '''
+        ...
+
+    def swap_raw(self, beatmap: Beatmap, path: Path, md5: Optional[str] = None) -> bool:
+        '''
+        Atomically replace the Beatmap (`Rust`) stored at `path` (e.g. a re-parsed .osu file),
+        the entries with the same md5 at other paths are kept.
+        The difficulty cache of the replaced beatmap is cleared. Returns whether a beatmap was replaced
+        '''
+        ...
+
+    def get_raw(self, md5: Optional[str] = None, bid: Optional[int] = None,
+                path: Optional[Path] = None) -> Optional[Tuple[Beatmap, Optional[str]]]:
+        '''Get a Beatmap (`Rust`) and its path with md5, bid or path, returns `None` if missed or expired'''
+        ...
+
+    def get_or_load_raw(self, path: Path, md5: Optional[str] = None,
+                        bid: Optional[int] = None) -> Beatmap:
+        '''
+        Get a Beatmap (`Rust`), read and parse the .osu files if missed
+        (registered with the md5 computed during the parse if `md5` is not given)
+        '''
+        ...
+
+    def remove(self, md5: Optional[str] = None, bid: Optional[int] = None,
+               path: Optional[Path] = None) -> bool:
+        '''Remove a Beatmap, returns whether it was stored'''
+        ...
+
+    def clear(self) -> None: ...
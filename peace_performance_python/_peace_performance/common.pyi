@@ -41,6 +41,17 @@ async def rust_sleep(secs: int) -> None:
     ...
 
 
+def set_runtime_threads(threads: int) -> None:
+    '''
+    Set the worker threads of the process-wide async runtime (shared by all sync and async reads).
+
+    Must be called at startup, raises `RuntimeError` if the runtime is already started.
+
+    ### Available only when feature `async_tokio` / `async_std` is enabled. (Default enabled)
+    '''
+    ...
+
+
 def osu_mode_str(mode: OsuModeInt) -> Optional[OsuModeStr]:
     '''Get osu! Mode str with mode int'''
     ...
@@ -1,8 +1,11 @@
-from typing import Dict, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
 
 from .types import BaseGetter, ModeResult, OsuModeInt, OsuModeStr
 from .beatmap import Beatmap
 
+if TYPE_CHECKING:
+    from numpy import ndarray
+
 
 class Calculator(BaseGetter):
     '''
@@ -116,6 +119,44 @@ class Calculator(BaseGetter):
         '''
         ...
 
+    async def calculate_async_raw(self, beatmap: Beatmap) -> 'CalcResult':
+        '''
+        Calculate pp with a Beatmap (`Rust raw`) on the blocking thread pool of the async runtime.
+
+        ### Available only when feature `async_tokio` / `async_std` is enabled.
+        '''
+        ...
+
+    def calculate_pp_only_raw(self, beatmap: Beatmap) -> float:
+        '''Calculate pp with a Beatmap (`Rust raw`), fast path returning only the pp'''
+        ...
+
+    def calculate_tuple_raw(self, beatmap: Beatmap) -> Tuple[float, float, Optional[int]]:
+        '''Calculate pp with a Beatmap (`Rust raw`), fast path returning `(pp, stars, max_combo)`'''
+        ...
+
+    def calculate_many_raw(self, beatmap: Beatmap,
+                           configs: Union[Sequence[Dict[str, Union[int, float, None]]],
+                                          Dict[str, Sequence[Union[int, float, None]]]]) -> List['CalcResult']:
+        '''
+        Calculate many score configs against one Beatmap (`Rust raw`) in a single native call.
+
+        The attrs of this Calculator are used as the defaults of each config.
+
+        `configs`: a sequence of score dicts (or Calculators), or a dict of parallel arrays
+        '''
+        ...
+
+    def pp_curve_raw(self, beatmap: Beatmap, accs: Sequence[float],
+                     misses: Optional[Sequence[int]] = None) -> Union['ndarray', List[float]]:
+        '''
+        pp of each accuracy (and misses, aligned with `accs`) with a Beatmap (`Rust raw`) in one native call.
+
+        The difficulty attributes are calculated once.
+        Returns a float numpy array (a list if feature `numpy` is not enabled).
+        '''
+        ...
+
     def getattr(self, attr: str) -> Union[int, float, None]: ...
 
     def setattr(self, attr: str, value: Union[int, float, None]) -> None: ...
@@ -206,6 +247,51 @@ class Calculator(BaseGetter):
     def get_score(self) -> Optional[int]: ...
 
 
+class GradualCalculator:
+    '''
+    Stateful pp calculator (`Rust`) for a score in progress (live spectating, replays).
+
+    Feed the hit results object by object,
+    each step only processes the new objects instead of recalculating the whole map.
+
+    ### Examples:
+    ```
+    beatmap = Beatmap('path_to_osu_file')
+    g = GradualCalculator(beatmap._raw, mods=Mods.HIDDEN)
+    result = g.process_next(n300=1)
+    result = g.process_next(n100=1, combo=2)
+    ```
+    '''
+    mods: int
+    processed: int
+    n_objects: int
+    finished: bool
+
+    def __init__(self, beatmap: Beatmap, mods: int = 0) -> 'GradualCalculator': ...
+
+    @property
+    def state(self) -> Dict[str, int]:
+        '''Current (cumulative) score state'''
+        ...
+
+    def process_next(self, n300: int = 0, n100: int = 0, n50: int = 0,
+                     katu: int = 0, miss: int = 0, combo: Optional[int] = None,
+                     score: Optional[int] = None, n_objects: int = 1) -> Optional['CalcResult']:
+        '''
+        Process the next `n_objects` hit objects with the hit results judged since the last call.
+
+        A step is a hit object (osu!, taiko, mania) or a fruit / droplet (catch),
+        so catch maps have more steps than `n_objects`.
+
+        The hit counts are increments, `combo` is the current max combo of the score
+        (if omitted it is derived from the max combo of the processed objects, slider ticks included,
+        the misses of a step are assumed before its hits).
+
+        Returns `None` if there are no more objects to process.
+        '''
+        ...
+
+
 class RawStars(BaseGetter):
     '''
     Raw PP Calculation results: `RawStars` (`Rust`) (read only).
@@ -357,3 +443,25 @@ class CalcResult(BaseGetter):
 def new_calculator() -> Calculator:
     '''Create new native Calculator (`Rust`)'''
     ...
+
+
+def calculate_batch(beatmap: Beatmap,
+                    configs: Union[Sequence[Dict[str, Union[int, float, None]]],
+                                   Dict[str, Sequence[Union[int, float, None]]]]) -> List[CalcResult]:
+    '''
+    Calculate many score configs against one Beatmap (`Rust`) in a single native call.
+
+    `configs`: a sequence of score dicts (or Calculators), or a dict of parallel arrays
+    '''
+    ...
+
+
+async def calculate_many_async(jobs: Sequence[Tuple[Beatmap, Calculator]],
+                               max_concurrency: Optional[int] = None) -> List[CalcResult]:
+    '''
+    Calculate (Beatmap (`Rust`), Calculator) jobs on at most `max_concurrency` native threads,
+    off the event loop. Returns the results in the order of the jobs.
+
+    ### Available only when feature `async_tokio` / `async_std` is enabled.
+    '''
+    ...
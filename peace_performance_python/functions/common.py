@@ -1,21 +1,35 @@
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 
 from .._peace_performance.beatmap import (
     Beatmap,
     read_beatmap_sync as raw_read_beatmap_sync,
-    read_beatmap_async as raw_read_beatmap_async
+    read_beatmap_async as raw_read_beatmap_async,
+    read_beatmap_bytes as raw_read_beatmap_bytes,
+    read_beatmap_bytes_async as raw_read_beatmap_bytes_async,
+    read_beatmaps as raw_read_beatmaps,
+    iter_beatmaps as raw_iter_beatmaps,
+    scan_beatmap_metadata as raw_scan_beatmap_metadata,
+    scan_beatmaps_metadata as raw_scan_beatmaps_metadata,
+    BeatmapMetadata
 )
 from .._peace_performance.common import (
     rust_sleep as raw_rust_sleep,
     set_log_level,
+    set_runtime_threads,
     init_logger
 )
 from .._peace_performance.pp import (
-    new_calculator as raw_calculator
+    CalcResult,
+    new_calculator as raw_calculator,
+    calculate_batch as raw_calculate_batch,
+    calculate_many_async as raw_calculate_many_async
 )
 
+from ..objects.beatmap import Beatmap as BeatmapWrapper
 from ..objects.calculator import Calculator
+from ..objects.executor import AsyncExecutor, get_executor, set_executor
 
 
 async def raw_read_beatmap_async_rs(osu_file_path: Path) -> Beatmap:
@@ -23,13 +37,97 @@ async def raw_read_beatmap_async_rs(osu_file_path: Path) -> Beatmap:
     return await raw_read_beatmap_async(osu_file_path)
 
 
-async def raw_read_beatmap_async_py(osu_file_path: Path) -> Beatmap:
+async def raw_read_beatmap_async_py(osu_file_path: Path, mmap: bool = False,
+                                    cache_dir: Optional[Path] = None, hash: bool = False) -> Beatmap:
     '''
     ### Python Async Wrapper
 
-    Read and parse .osu files from local, returns native beatmap object
+    Read and parse .osu files from local on the AsyncExecutor (`set_executor`), returns native beatmap object
     '''
-    return raw_read_beatmap_sync(osu_file_path)
+    return await get_executor().run(raw_read_beatmap_sync, osu_file_path, mmap, cache_dir, hash)
+
+
+def read_beatmaps(osu_file_paths: Iterable[Path], workers: Optional[int] = None,
+                  mmap: bool = False, cache_dir: Optional[Path] = None,
+                  hash: bool = False) -> List[Union[BeatmapWrapper, Exception]]:
+    '''
+    Read and parse .osu files in parallel on native threads (without holding the GIL).
+
+    Returns Beatmap objects in the order of the paths,
+    a failed path gets its exception object instead of raising.
+
+    `mmap`: parse from memory-mapped regions of the files
+
+    `cache_dir`: load the parsed beatmap snapshots from this directory, or parse and write them on a miss
+
+    `hash`: compute the `md5` (and `fast_hash`) of each file during the parse (each file is read once)
+    '''
+    paths = list(osu_file_paths)
+    return [
+        BeatmapWrapper.from_raw(result, path) if isinstance(result, Beatmap) else result
+        for path, result in zip(paths, raw_read_beatmaps(paths, workers, mmap, cache_dir, hash))
+    ]
+
+
+def iter_beatmaps(osu_file_paths: Iterable[Path], workers: Optional[int] = None,
+                  mmap: bool = False, cache_dir: Optional[Path] = None,
+                  hash: bool = False) -> Iterator[Tuple[str, Union[BeatmapWrapper, Exception]]]:
+    '''
+    Read and parse .osu files in parallel on native threads,
+    yields (path, Beatmap or exception object) in the completion order.
+
+    `mmap`, `cache_dir`, `hash`: same as `read_beatmaps`
+
+    ### Examples:
+    ```
+    for path, beatmap in iter_beatmaps(paths, workers=8):
+        if isinstance(beatmap, Exception):
+            continue
+        Calculator().calculate(beatmap)
+    ```
+    '''
+    for path, result in raw_iter_beatmaps(list(osu_file_paths), workers, mmap, cache_dir, hash):
+        yield path, BeatmapWrapper.from_raw(result, path) if isinstance(result, Beatmap) else result
+
+
+def scan_beatmap_metadata(path_or_bytes: Union[Path, bytes, bytearray, memoryview]) -> BeatmapMetadata:
+    '''
+    Scan the metadata of a beatmap (mode, version, ar, od, cs, hp, sv, tick_rate and the object counts),
+    without parsing the hit objects, timing points and slider curves.
+
+    `path_or_bytes`: a .osu file path, or the content of a .osu file (any buffer protocol object)
+    '''
+    return raw_scan_beatmap_metadata(path_or_bytes)
+
+
+def scan_beatmaps_metadata(osu_file_paths: Iterable[Path],
+                           workers: Optional[int] = None) -> List[Union[BeatmapMetadata, Exception]]:
+    '''
+    Scan the metadata of beatmaps in parallel on native threads (without holding the GIL).
+
+    Returns BeatmapMetadata objects in the order of the paths,
+    a failed path gets its exception object instead of raising.
+    '''
+    return raw_scan_beatmaps_metadata(list(osu_file_paths), workers)
+
+
+def scan_directory_metadata(directory: Path, workers: Optional[int] = None,
+                            recursive: bool = False) -> List[Tuple[Path, Union[BeatmapMetadata, Exception]]]:
+    '''
+    Scan the metadata of the .osu files of a directory (and its sub directories if `recursive`)
+    in parallel on native threads, returns (path, BeatmapMetadata or exception object) sorted by path.
+
+    ### Examples:
+    ```
+    for path, metadata in scan_directory_metadata('songs', workers=8, recursive=True):
+        if isinstance(metadata, Exception):
+            continue
+        index(path, metadata.as_dict)
+    ```
+    '''
+    directory = Path(directory)
+    paths = sorted(directory.rglob('*.osu') if recursive else directory.glob('*.osu'))
+    return list(zip(paths, raw_scan_beatmaps_metadata(paths, workers)))
 
 
 def new_calculator() -> Calculator:
@@ -37,6 +135,41 @@ def new_calculator() -> Calculator:
     return Calculator()
 
 
+def calculate_batch(beatmap: BeatmapWrapper,
+                    configs: Union[Sequence[Dict[str, Union[int, float, None]]],
+                                   Dict[str, Sequence[Union[int, float, None]]]]) -> List[CalcResult]:
+    '''
+    Calculate many score configs against one Beatmap in a single native call.
+
+    `configs`: a sequence of score dicts (or Calculators), or a dict of parallel arrays
+    '''
+    return raw_calculate_batch(beatmap._raw, configs)
+
+
+async def calculate_many_async(jobs: Iterable[Tuple[BeatmapWrapper, Union[Calculator, Dict[str, Union[int, float, None]]]]],
+                               max_concurrency: Optional[int] = None) -> List[CalcResult]:
+    '''
+    ### Real Rust Async
+
+    Calculate `(Beatmap, Calculator or score dict)` jobs on at most `max_concurrency` native threads
+    (default: the available parallelism), the event loop keeps running other coroutines meanwhile.
+
+    Returns the results in the order of the jobs.
+
+    ### Available only when feature `async_tokio` / `async_std` is enabled.
+
+    ### Examples:
+    ```
+    results = await calculate_many_async(
+        [(beatmap, {'acc': 98.8}), (beatmap, Calculator(acc=99, miss=1))], max_concurrency=4)
+    ```
+    '''
+    return await raw_calculate_many_async([
+        (beatmap._raw, Calculator(config) if isinstance(config, dict) else config)
+        for beatmap, config in jobs
+    ], max_concurrency)
+
+
 async def rust_sleep(secs: int) -> None:
     '''
     Async sleep (rust).
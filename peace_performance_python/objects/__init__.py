@@ -1,3 +1,8 @@
 from .beatmap import *
 from .calculator import *
+from .executor import *
+from .pool import *
 from .pp_result import *
+from .recalc import *
+from .store import *
+from .watcher import *
@@ -1,6 +1,10 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union, TYPE_CHECKING
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from numpy import ndarray
+    from .._peace_performance.pp import CalcResult
+
 
 from .._peace_performance.beatmap import (
     DifficultyPoint,
@@ -9,14 +13,25 @@ from .._peace_performance.beatmap import (
     Pos2,
     HitObjectKind,
     Beatmap as BeatmapRust,
+    HitObjectView,
+    TimingPointView,
+    DifficultyPointView,
     read_beatmap_async,
-    read_beatmap_sync
+    read_beatmap_sync,
+    read_beatmap_bytes,
+    read_beatmap_bytes_async
 )
 
-from ..utils import _read_only_property_generator
+from .executor import get_executor
+from ..utils import _cached_property_generator, _read_only_property_generator
+
+
+# Not fetched yet (`None` and empty lists are valid values)
+_UNSET = object()
 
 
 @_read_only_property_generator
+@_cached_property_generator
 class Beatmap:
     '''
     The Beatmap used to calculate the pp, it contains the parsed .osu beatmap.
@@ -49,11 +64,25 @@ class Beatmap:
 
     `stack_leniency`: `Optional[float]`
 
-    `hit_objects`: `Optional[List[HitObject]]`
+    `hit_objects`: `HitObjectView` (sequence of `HitObject`, created on access)
+
+    `timing_points`: `TimingPointView` (sequence of `TimingPoint`, created on access)
+
+    `difficulty_points`: `DifficultyPointView` (sequence of `DifficultyPoint`, created on access)
+
+    `md5`: `Optional[str]` # Only if computed during the parse (`hash=True`)
+
+    `fast_hash`: `Optional[int]` # Only if computed during the parse (`hash=True`)
+
+    `difficulty_cache_hits`: `int`
+
+    `difficulty_cache_misses`: `int`
+
+    `difficulty_cache_size`: `int`
 
-    `timing_points`: `Optional[List[TimingPoint]]`
+    `difficulty_cache_limit`: `int` # Least recently used entries are evicted first (default 64)
 
-    `difficulty_points`: `Optional[List[DifficultyPoint]]`
+    `strains_cache_size`: `int`
 
 
     ### Examples:
@@ -62,12 +91,20 @@ class Beatmap:
     beatmap = Beatmap('path_to_osu_file')
     # Same as
     beatmap = Beatmap.create('path_to_osu_file')
+    # Parse from a memory-mapped region of the file (large maps, bulk scans)
+    beatmap = Beatmap('path_to_osu_file', mmap=True)
+    # Load / write the parsed beatmap snapshot in a cache directory (warm starts)
+    beatmap = Beatmap('path_to_osu_file', cache_dir='.beatmap_cache')
 
     # Async Rust
     beatmap = await Beatmap.create_async_rs('path_to_osu_file')
     # Async Python (wrapper)
     beatmap = await Beatmap.create_async_py('path_to_osu_file')
 
+    # Parse from bytes / bytearray / memoryview (without copying)
+    beatmap = Beatmap.from_bytes(osu_file_bytes)
+    # Async Rust
+    beatmap = await Beatmap.from_bytes_async(osu_file_bytes)
 
 
     # We can reload this .osu files as:
@@ -97,15 +134,18 @@ class Beatmap:
 
     ```
     '''
-    _raw_attrs = ('version', 'n_circles', 'n_sliders',
-                  'n_spinners', 'ar', 'od', 'cs',
-                  'hp', 'sv', 'tick_rate', 'mode',
-                  'mode_str', 'stack_leniency',)
-    _extra_attrs = ('_raw', 'path', '_hit_objects',
-                    '_timing_points', '_difficulty_points',)
-    __slots__ = _raw_attrs + _extra_attrs
-
-    _raw: Optional[BeatmapRust]
+    # Immutable, read once (in one native call) on the first access
+    _cached_attrs = ('version', 'n_circles', 'n_sliders',
+                     'n_spinners', 'ar', 'od', 'cs',
+                     'hp', 'sv', 'tick_rate', 'mode',
+                     'mode_str', 'stack_leniency',)
+    # Live, read from the native Beatmap on each access
+    _raw_attrs = ('difficulty_cache_hits', 'difficulty_cache_misses',
+                  'difficulty_cache_size', 'difficulty_cache_limit',
+                  'strains_cache_size',)
+    __slots__ = ('_raw_native', 'path', '_attrs_cache', '_hit_objects',
+                 '_timing_points', '_difficulty_points',)
+
     path: Optional[Path]
     # raw attrs
     mode: int
@@ -124,45 +164,96 @@ class Beatmap:
     tick_rate: float
     stack_leniency: Optional[float]
 
-    # cache needed attrs
-    hit_objects: Optional[List[HitObject]]
-    timing_points: Optional[List[TimingPoint]]
-    difficulty_points: Optional[List[DifficultyPoint]]
+    # difficulty attributes cache
+    difficulty_cache_hits: int
+    difficulty_cache_misses: int
+    difficulty_cache_size: int
+    difficulty_cache_limit: int
+    strains_cache_size: int
 
-    def __init__(self, osu_file_path: Path) -> 'Beatmap':
-        '''Init with .osu files'''
+    # fetched once on the first access
+    hit_objects: HitObjectView
+    timing_points: TimingPointView
+    difficulty_points: DifficultyPointView
+
+    def __init__(self, osu_file_path: Path, mmap: bool = False,
+                 cache_dir: Optional[Path] = None, hash: bool = False) -> 'Beatmap':
+        '''
+        Init with .osu files
+
+        `mmap`: parse from a memory-mapped region of the file
+
+        `cache_dir`: load the parsed beatmap snapshot from this directory
+        (one snapshot per path, replaced when the mtime or size changes),
+        or parse and write it atomically on a miss
+
+        `hash`: compute the `md5` (and `fast_hash`) of the file content during the parse,
+        the file is read once
+        '''
         self.path = osu_file_path
-        self._raw = read_beatmap_sync(osu_file_path)
+        self._raw = read_beatmap_sync(osu_file_path, mmap, cache_dir, hash)
 
     def __repr__(self) -> str:
         return f'<Beatmap object ({self.attrs})>'
 
-    def __cache_get__(self, attr: str) -> Optional[Any]:
-        _attr = getattr(self, attr, None)
-        if _attr:
-            return _attr
-        _tmp = getattr(self._raw, attr[1:])
-        if not _tmp:
-            return _tmp
-        setattr(self, attr, _tmp)
-        return _tmp
+    @property
+    def _raw(self) -> BeatmapRust:
+        '''The native Beatmap object (`Rust`)'''
+        return self._raw_native
+
+    @_raw.setter
+    def _raw(self, raw: BeatmapRust) -> None:
+        # A new native Beatmap, the fetched attrs are outdated
+        self._raw_native = raw
+        self._attrs_cache = None
+        self._hit_objects = self._timing_points = self._difficulty_points = _UNSET
 
     # Sync ------------
-    def init(self, osu_file_path: Path) -> 'Beatmap':
-        '''Load the .osu files with path'''
+    def init(self, osu_file_path: Path, mmap: bool = False,
+             cache_dir: Optional[Path] = None, hash: bool = False) -> 'Beatmap':
+        '''Load the .osu files with path (`mmap`, `cache_dir`, `hash`: same as `Beatmap()`)'''
         self.path = osu_file_path
-        self._raw = read_beatmap_sync(osu_file_path)
+        self._raw = read_beatmap_sync(osu_file_path, mmap, cache_dir, hash)
         return self
 
-    def reload(self) -> 'Beatmap':
-        '''Reload this .osu files'''
-        self._raw = read_beatmap_sync(self.path)
+    def reload(self, mmap: bool = False, cache_dir: Optional[Path] = None,
+               hash: bool = False) -> 'Beatmap':
+        '''Reload this .osu files (`mmap`, `cache_dir`, `hash`: same as `Beatmap()`)'''
+        self._raw = read_beatmap_sync(self.path, mmap, cache_dir, hash)
         return self
 
     @classmethod
-    def create(cls, osu_file_path: Path) -> 'Beatmap':
-        '''Create Beatmap with .osu files'''
-        obj = cls(osu_file_path)
+    def create(cls, osu_file_path: Path, mmap: bool = False,
+               cache_dir: Optional[Path] = None, hash: bool = False) -> 'Beatmap':
+        '''Create Beatmap with .osu files (`mmap`, `cache_dir`, `hash`: same as `Beatmap()`)'''
+        obj = cls(osu_file_path, mmap, cache_dir, hash)
+        return obj
+
+    @classmethod
+    def from_bytes(cls, buf: Union[bytes, bytearray, memoryview], hash: bool = False) -> 'Beatmap':
+        '''
+        Create Beatmap with the content of .osu files (any buffer protocol object, not copied)
+
+        `hash`: compute the `md5` (and `fast_hash`) of the content
+        '''
+        return cls.from_raw(read_beatmap_bytes(buf, hash))
+
+    @classmethod
+    def from_bytes_serialized(cls, buf: Union[bytes, bytearray, memoryview],
+                              osu_file_path: Optional[Path] = None) -> 'Beatmap':
+        '''
+        Load a Beatmap serialized with `to_bytes` (any buffer protocol object, not copied).
+
+        Much faster than parsing the .osu files again (warm restarts, shipping to worker processes).
+        '''
+        return cls.from_raw(BeatmapRust.from_bytes_serialized(buf), osu_file_path)
+
+    @classmethod
+    def from_raw(cls, raw: BeatmapRust, osu_file_path: Optional[Path] = None) -> 'Beatmap':
+        '''Wrap a native Beatmap object (`Rust`), does not parse again'''
+        obj: 'Beatmap' = cls.__new__(cls)
+        obj.path = osu_file_path
+        obj._raw = raw
         return obj
 
     # Real Rust Async ------------
@@ -202,31 +293,117 @@ class Beatmap:
         obj._raw = await read_beatmap_async(osu_file_path)
         return obj
 
+    @classmethod
+    async def from_bytes_async(cls, buf: Union[bytes, bytearray, memoryview]) -> 'Beatmap':
+        '''
+        ### Real Rust Async
+
+        Create Beatmap with the content of .osu files (any buffer protocol object, not copied)'''
+        return cls.from_raw(await read_beatmap_bytes_async(buf))
+
     # Python Async wrapper ------------
-    async def init_async_py(self, osu_file_path: Path) -> 'Beatmap':
+    # The blocking parse runs on the AsyncExecutor (`set_executor`), off the event loop
+    async def init_async_py(self, osu_file_path: Path, mmap: bool = False,
+                            cache_dir: Optional[Path] = None, hash: bool = False) -> 'Beatmap':
         '''
         ### Python Async wrapper
-        Load the .osu files with path'''
+        Load the .osu files with path (`mmap`, `cache_dir`, `hash`: same as `Beatmap()`)'''
         self.path = osu_file_path
-        self._raw = read_beatmap_sync(osu_file_path)
+        self._raw = await get_executor().run(read_beatmap_sync, osu_file_path, mmap, cache_dir, hash)
         return self
 
-    async def reload_async_py(self) -> 'Beatmap':
+    async def reload_async_py(self, mmap: bool = False, cache_dir: Optional[Path] = None,
+                              hash: bool = False) -> 'Beatmap':
         '''
         ### Python Async wrapper
-        Reload this .osu files'''
-        self._raw = read_beatmap_sync(self.path)
+        Reload this .osu files (`mmap`, `cache_dir`, `hash`: same as `Beatmap()`)'''
+        self._raw = await get_executor().run(read_beatmap_sync, self.path, mmap, cache_dir, hash)
         return self
 
     @classmethod
-    async def create_async_py(cls, osu_file_path: Path) -> 'Beatmap':
+    async def create_async_py(cls, osu_file_path: Path, mmap: bool = False,
+                              cache_dir: Optional[Path] = None, hash: bool = False) -> 'Beatmap':
         '''
         ### Python Async wrapper
-        Create Beatmap with .osu files'''
-        obj: 'Beatmap' = cls.__new__(cls)
-        obj.path = osu_file_path
-        obj._raw = read_beatmap_sync(osu_file_path)
-        return obj
+        Create Beatmap with .osu files (`mmap`, `cache_dir`, `hash`: same as `Beatmap()`)'''
+        return cls.from_raw(
+            await get_executor().run(read_beatmap_sync, osu_file_path, mmap, cache_dir, hash), osu_file_path)
+
+    # Columnar exports ------------
+    def hit_objects_array(self) -> Dict[str, 'ndarray']:
+        '''
+        Hit objects as struct-of-arrays (contiguous numpy arrays), without any per-object wrapper.
+
+        Keys: `start_time`, `end_time`, `x`, `y`, `kind` (0: circle, 1: slider, 2: spinner, 3: hold),
+        `repeats` (0 if not a slider), `pixel_len` (0.0 if not a slider)
+
+        ### Available only when feature `numpy` is enabled. (Default enabled)
+        '''
+        return self._raw.hit_objects_array()
+
+    def timing_points_array(self) -> Dict[str, 'ndarray']:
+        '''Timing points as struct-of-arrays (numpy arrays), keys: `time`, `beat_len`'''
+        return self._raw.timing_points_array()
+
+    def difficulty_points_array(self) -> Dict[str, 'ndarray']:
+        '''Difficulty points as struct-of-arrays (numpy arrays), keys: `time`, `speed_multiplier`'''
+        return self._raw.difficulty_points_array()
+
+    def to_bytes(self) -> bytes:
+        '''
+        Serialize the parsed beatmap into a compact (versioned) binary format,
+        load it with `Beatmap.from_bytes_serialized`.
+
+        Pickle is supported too (with the same format).
+        '''
+        return self._raw.to_bytes()
+
+    def __reduce__(self) -> tuple:
+        return (self.__class__.from_raw, (self._raw, self.path))
+
+    def strains(self, mode: Optional[Union[int, str]] = None,
+                mods: int = 0) -> Dict[str, Union[int, float, 'ndarray']]:
+        '''
+        Section strain peaks of each skill (contiguous numpy arrays), for difficulty graphs.
+
+        Computed in one native pass and memoized per (mode, mods) on this beatmap.
+
+        Keys: `mode`, `section_len` (ms), and the skills of the mode:
+        `aim`, `aim_no_sliders`, `speed`, `flashlight` (std),
+        `color`, `rhythm`, `stamina` (taiko), `movement` (ctb), `strains` (mania)
+
+        ### Available only when feature `numpy` is enabled. (Default enabled)
+        '''
+        return self._raw.strains(mode, mods)
+
+    def difficulty_table(self, mods_list: Sequence[int], mode: Optional[Union[int, str]] = None,
+                         workers: Optional[int] = None) -> List['CalcResult']:
+        '''
+        SS results (`stars`, `raw_stars.max_combo`, `pp`) of each mods in one native call.
+
+        Mods which share the same difficulty (e.g. `HD` / `NF` / `SO` with `NM`, `NC` with `DT`)
+        reuse the difficulty attributes, the distinct ones are calculated on `workers` native threads.
+
+        ### Examples:
+        ```
+        beatmap = Beatmap('path_to_osu_file')
+        table = beatmap.difficulty_table([0, Mods.HIDDEN, Mods.HARDROCK, Mods.DOUBLETIME])
+        for result in table:
+            print(result.mods, result.stars, result.raw_stars.max_combo, result.pp)
+        ```
+        '''
+        return self._raw.difficulty_table(mods_list, mode, workers)
+
+    def set_difficulty_cache_limit(self, limit: int) -> None:
+        '''
+        Set the max amount of memoized difficulty attributes (and strains), `0` disables the cache.
+        The least recently used entries are evicted first
+        '''
+        self._raw.set_difficulty_cache_limit(limit)
+
+    def clear_difficulty_cache(self) -> None:
+        '''Clear the memoized difficulty attributes and strains (and reset hit / miss counters)'''
+        self._raw.clear_difficulty_cache()
 
     # Properties ------------
     @property
@@ -234,6 +411,16 @@ class Beatmap:
         '''Returns whether the beatmap (.osu files) has been loaded and parsed'''
         return (self._raw and self.path) is not None
 
+    @property
+    def md5(self) -> Optional[str]:
+        '''md5 (lowercase hex) of the .osu file content, `None` if not computed during the parse (`hash`)'''
+        return self._raw.md5
+
+    @property
+    def fast_hash(self) -> Optional[int]:
+        '''Fast (xxh3, 64 bits) hash of the .osu file content, `None` if not computed during the parse (`hash`)'''
+        return self._raw.fast_hash
+
     @property
     def attrs(self) -> str:
         '''Get attrs as text'''
@@ -244,21 +431,34 @@ class Beatmap:
         '''Get attrs as dict'''
         return {'path': self.path, 'is_initialized': self.is_initialized, **self._raw.as_dict}
 
-    # Cache needed ------------
+    # Fetched once ------------
     @property
-    def hit_objects(self) -> Optional[List[HitObject]]:
-        '''Returns wrapped HitObject object list'''
-        return self.__cache_get__('_hit_objects')
+    def hit_objects(self) -> HitObjectView:
+        '''Returns a sequence view of the HitObject objects, they are only created on access (no copy)'''
+        view = self._hit_objects
+        if view is _UNSET:
+            view = self._hit_objects = self._raw.hit_objects_view
+        return view
 
     @property
-    def timing_points(self) -> Optional[List[TimingPoint]]:
-        '''Returns wrapped TimingPoint object list'''
-        return self.__cache_get__('_timing_points')
+    def timing_points(self) -> TimingPointView:
+        '''Returns a sequence view of the TimingPoint objects (`at_time` lookups)'''
+        view = self._timing_points
+        if view is _UNSET:
+            view = self._timing_points = self._raw.timing_points_view
+        return view
 
     @property
-    def difficulty_points(self) -> Optional[List[DifficultyPoint]]:
-        '''Returns wrapped DifficultyPoint object list'''
-        return self.__cache_get__('_difficulty_points')
+    def difficulty_points(self) -> DifficultyPointView:
+        '''Returns a sequence view of the DifficultyPoint objects (`at_time` lookups)'''
+        view = self._difficulty_points
+        if view is _UNSET:
+            view = self._difficulty_points = self._raw.difficulty_points_view
+        return view
+
+    def objects_between(self, start_ms: float, end_ms: float) -> HitObjectView:
+        '''View of the hit objects with `start_ms <= start_time < end_ms` (binary search)'''
+        return self.hit_objects.objects_between(start_ms, end_ms)
 
 
 class AsyncBeatmapRust(Beatmap):
@@ -305,6 +505,7 @@ class AsyncBeatmapRust(Beatmap):
 class AsyncBeatmapPython(Beatmap):
     '''
     AsyncBeatmapPython using Python asynchronous methods by default
+    (the parse runs on the AsyncExecutor, see `set_executor`)
 
     ## Examples:
     ```
@@ -323,18 +524,15 @@ class AsyncBeatmapPython(Beatmap):
 
     async def init(self, osu_file_path: Path) -> 'AsyncBeatmapPython':
         '''Async load the .osu files with path'''
-        self.path = osu_file_path
-        self._raw = read_beatmap_sync(osu_file_path)
-        return self
+        return await self.init_async_py(osu_file_path)
 
     async def reload(self) -> 'AsyncBeatmapPython':
         '''Async reload this .osu files'''
-        self._raw = read_beatmap_sync(self.path)
-        return self
+        return await self.reload_async_py()
 
     @classmethod
     async def create(cls, osu_file_path: Path) -> 'AsyncBeatmapPython':
         '''Async create Beatmap with .osu files'''
         obj = cls(osu_file_path)
-        obj._raw = read_beatmap_sync(osu_file_path)
+        obj._raw = await get_executor().run(read_beatmap_sync, osu_file_path)
         return obj
@@ -1,7 +1,13 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
 from .beatmap import Beatmap
+
+if TYPE_CHECKING:
+    from numpy import ndarray
 from .._peace_performance.pp import (
     CalcResult,
-    Calculator as CalculatorRust
+    Calculator as CalculatorRust,
+    GradualCalculator as GradualCalculatorRust
 )
 
 
@@ -61,3 +67,127 @@ class Calculator(CalculatorRust):
         ```
         '''
         return self.calculate_raw(beatmap._raw)
+
+    async def calculate_async(self, beatmap: Beatmap) -> CalcResult:
+        '''
+        ### Real Rust Async
+
+        Calculate pp with a Beatmap on the blocking thread pool of the async runtime,
+        the event loop keeps running other coroutines during the calculation.
+
+        ### Available only when feature `async_tokio` / `async_std` is enabled.
+        '''
+        return await self.calculate_async_raw(beatmap._raw)
+
+    def calculate_pp_only(self, beatmap: Beatmap) -> float:
+        '''
+        Calculate pp with a Beatmap, fast path returning only the pp (a float).
+
+        No `CalcResult` (and its `RawPP`, `RawStars`) objects are built.
+        '''
+        return self.calculate_pp_only_raw(beatmap._raw)
+
+    def calculate_tuple(self, beatmap: Beatmap) -> Tuple[float, float, Optional[int]]:
+        '''
+        Calculate pp with a Beatmap, fast path returning a plain tuple: `(pp, stars, max_combo)`.
+
+        No `CalcResult` (and its `RawPP`, `RawStars`) objects are built.
+        `max_combo` is `None` for osu!taiko and osu!mania.
+
+        ### Examples:
+        ```
+        pp, stars, max_combo = Calculator(acc=98.8, miss=3).calculate_tuple(beatmap)
+        ```
+        '''
+        return self.calculate_tuple_raw(beatmap._raw)
+
+    def calculate_many(self, beatmap: Beatmap,
+                       configs: Union[Sequence[Dict[str, Union[int, float, None]]],
+                                      Dict[str, Sequence[Union[int, float, None]]]]) -> List[CalcResult]:
+        '''
+        Calculate many score configs against one Beatmap in a single native call.
+
+        The attrs of this Calculator are used as the defaults of each config,
+        the difficulty attributes are calculated once per distinct mods.
+
+        `configs`: a sequence of score dicts (or Calculators), or a dict of parallel arrays
+
+        ### Examples:
+        ```
+        beatmap = Beatmap('path_to_osu_file')
+        c = Calculator(mods=Mods.HIDDEN)
+        results = c.calculate_many(beatmap, [{'acc': 98.8}, {'acc': 99, 'miss': 1}])
+        # or
+        results = c.calculate_many(beatmap, {'acc': [98.8, 99], 'miss': [0, 1]})
+        ```
+        '''
+        return self.calculate_many_raw(beatmap._raw, configs)
+
+    def pp_curve(self, beatmap: Beatmap, accs: Sequence[float],
+                 misses: Optional[Sequence[int]] = None) -> Union['ndarray', List[float]]:
+        '''
+        pp of each accuracy (and misses, aligned with `accs`) in one native call.
+
+        The difficulty attributes are calculated once, then only the performance formula
+        is evaluated for each point. The other attrs of this Calculator are used for every point.
+
+        Returns a float numpy array (a list if feature `numpy` is not enabled) aligned with `accs`.
+
+        ### Examples:
+        ```
+        beatmap = Beatmap('path_to_osu_file')
+        c = Calculator(mods=Mods.HIDDEN)
+        pp_95, pp_97, pp_98, pp_99, pp_ss = c.pp_curve(beatmap, [95, 97, 98, 99, 100])
+        ```
+        '''
+        return self.pp_curve_raw(beatmap._raw, accs, misses)
+
+
+class GradualCalculator(GradualCalculatorRust):
+    '''
+    Stateful pp calculator for a score in progress (live spectating, replays).
+
+    Feed the hit results object by object,
+    each step only processes the new objects instead of recalculating the whole map.
+
+    `mods`: `int`
+
+    `processed`: `int` # Amount of processed steps (hit objects, or fruits and droplets for catch)
+
+    `n_objects`: `int` # Amount of hit objects of the map
+
+    `finished`: `bool` # No more objects to process (set once a step asks for more objects than remain)
+
+    `state`: `Dict[str, int]` # Current (cumulative) score state
+
+    ### Examples:
+    ```
+    beatmap = Beatmap('path_to_osu_file')
+    g = GradualCalculator(beatmap, mods=Mods.HIDDEN)
+    result = g.process_next(n300=1)
+    result = g.process_next(n100=1, combo=2)
+    result = g.process_next(miss=1)
+    # or many objects at once
+    result = g.process_next(n300=10, n_objects=10)
+    ```
+    '''
+
+    def __new__(cls, beatmap: Beatmap, mods: int = 0) -> 'GradualCalculator':
+        return super().__new__(cls, beatmap._raw, mods)
+
+    def process_next(self, n300: int = 0, n100: int = 0, n50: int = 0,
+                     katu: int = 0, miss: int = 0, combo: Optional[int] = None,
+                     score: Optional[int] = None, n_objects: int = 1) -> Optional[CalcResult]:
+        '''
+        Process the next `n_objects` hit objects with the hit results judged since the last call.
+
+        A step is a hit object (osu!, taiko, mania) or a fruit / droplet (catch),
+        so catch maps have more steps than `n_objects`.
+
+        The hit counts are increments, `combo` is the current max combo of the score
+        (if omitted it is derived from the max combo of the processed objects, slider ticks included,
+        the misses of a step are assumed before its hits).
+
+        Returns `None` if there are no more objects to process.
+        '''
+        return super().process_next(n300, n100, n50, katu, miss, combo, score, n_objects)
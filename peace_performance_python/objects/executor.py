@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+from weakref import WeakKeyDictionary
+
+
+T = TypeVar('T')
+
+
+class AsyncExecutor:
+    '''
+    Runs the blocking native work (parse, calculate) of the "Python async" paths off the event loop.
+
+    The native work releases the GIL, so a thread pool runs it in parallel
+    without blocking the event loop (or the other threads).
+
+    `executor`: `Optional[concurrent.futures.Executor]` # Defaults to a thread pool of `os.cpu_count()` threads,
+    can be shared with the application (e.g. the default executor of the loop)
+
+    `max_concurrency`: `Optional[int]` # Max amount of jobs running at once (per event loop),
+    the others wait without taking an executor slot
+
+    Cancelling the awaiting task cancels the job if it has not started yet,
+    a started native job runs to completion and its result is discarded.
+
+    ### Examples:
+    ```
+    set_executor(AsyncExecutor(max_concurrency=4))
+
+    beatmap = await Beatmap.create_async_py('path_to_osu_file')
+    # or
+    raw = await get_executor().run(read_beatmap_sync, 'path_to_osu_file')
+    ```
+    '''
+
+    def __init__(self, executor: Optional[Executor] = None,
+                 max_concurrency: Optional[int] = None) -> 'AsyncExecutor':
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('max_concurrency must be >= 1')
+        self._executor = executor
+        self._owned = executor is None
+        self.max_concurrency = max_concurrency
+        self._semaphores: 'WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = WeakKeyDictionary()
+
+    def __repr__(self) -> str:
+        return f'<AsyncExecutor (executor: {self._executor}, max_concurrency: {self.max_concurrency})>'
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1, thread_name_prefix='peace_performance')
+        return self._executor
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Semaphore]:
+        if self.max_concurrency is None:
+            return None
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Created on the loop (<= python3.9 binds it to the current loop)
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        '''Run `fn(*args, **kwargs)` on the executor, without blocking the event loop'''
+        loop = asyncio.get_event_loop()
+        call = partial(fn, *args, **kwargs)
+        semaphore = self._semaphore(loop)
+        if semaphore is None:
+            return await loop.run_in_executor(self.executor, call)
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, call)
+
+    def shutdown(self, wait: bool = True) -> None:
+        '''Shutdown the executor if it was created by this object (a shared one is left running)'''
+        if self._owned and self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_EXECUTOR = AsyncExecutor()
+
+
+def get_executor() -> AsyncExecutor:
+    '''Returns the AsyncExecutor used by the "Python async" paths'''
+    return _EXECUTOR
+
+
+def set_executor(executor: Optional[AsyncExecutor] = None) -> AsyncExecutor:
+    '''
+    Set the AsyncExecutor used by the "Python async" paths (`None`: a new default one),
+    returns the previous one (not shut down)
+    '''
+    global _EXECUTOR
+    previous, _EXECUTOR = _EXECUTOR, executor if executor is not None else AsyncExecutor()
+    return previous
@@ -0,0 +1,199 @@
+import os
+import sys
+
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .beatmap import Beatmap
+from .._peace_performance.beatmap import Beatmap as BeatmapRust
+from .._peace_performance.pp import calculate_batch as raw_calculate_batch
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # <= python3.7
+    SharedMemory = None
+
+
+ScoreConfig = Dict[str, Union[int, float, None]]
+# (shared memory name, size)
+_Snapshot = Tuple[str, int]
+
+# Worker side: snapshot name -> Beatmap (`Rust`), deserialized once per worker
+_WORKER_BEATMAPS: 'OrderedDict[str, BeatmapRust]' = OrderedDict()
+_WORKER_BEATMAPS_LIMIT = 256
+
+
+def _attach(name: str) -> 'SharedMemory':
+    '''Attach to a segment owned by the main process, without registering it to the resource tracker'''
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # Registering would make the tracker of the worker warn about a leaked segment and unlink it again,
+    # and unregistering would drop the registration of the main process when the tracker is shared
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _worker_beatmap(snapshot: _Snapshot) -> BeatmapRust:
+    name, size = snapshot
+    beatmap = _WORKER_BEATMAPS.get(name)
+    if beatmap is not None:
+        _WORKER_BEATMAPS.move_to_end(name)
+        return beatmap
+    shm = _attach(name)
+    buf = None
+    try:
+        # Read-only view: deserialized without a copy
+        buf = shm.buf[:size].toreadonly()
+        beatmap = BeatmapRust.from_bytes_serialized(buf)
+    finally:
+        # Exported views must be released before closing
+        if buf is not None:
+            buf.release()
+        shm.close()
+    _WORKER_BEATMAPS[name] = beatmap
+    if len(_WORKER_BEATMAPS) > _WORKER_BEATMAPS_LIMIT:
+        _WORKER_BEATMAPS.popitem(last=False)
+    return beatmap
+
+
+def _worker_calculate(snapshot: _Snapshot, configs: List[ScoreConfig]) -> List[Dict[str, Any]]:
+    return [result.as_dict for result in raw_calculate_batch(_worker_beatmap(snapshot), configs)]
+
+
+def _worker_calculate_one(snapshot: _Snapshot, config: ScoreConfig) -> Dict[str, Any]:
+    return _worker_calculate(snapshot, [config])[0]
+
+
+class PPWorkerPool:
+    '''
+    Process pool for CPU-heavy pp calculations (e.g. leaderboard recalculation).
+
+    Beatmaps are parsed once in the main process, then shared with the workers as serialized
+    snapshots (`Beatmap.to_bytes`) in shared memory, each worker deserializes a snapshot once.
+
+    Jobs are `(beatmap_id, score config)`, the results are `CalcResult.as_dict` dicts.
+
+    ### Requires python >= 3.8 (`multiprocessing.shared_memory`)
+
+    ### Examples:
+    ```
+    with PPWorkerPool(workers=8) as pool:
+        pool.add_beatmap(1234, Beatmap('path_to_osu_file'))
+        pool.add_beatmap_file(5678, 'path_to_osu_file')
+
+        future = pool.submit(1234, {'acc': 98.8, 'miss': 3})
+        print(future.result()['pp'])
+
+        for result in pool.map((bid, config) for bid, config in jobs):
+            ...
+    ```
+    '''
+
+    def __init__(self, workers: Optional[int] = None, mp_context: Any = None) -> 'PPWorkerPool':
+        if SharedMemory is None:
+            raise RuntimeError('PPWorkerPool requires python >= 3.8 (multiprocessing.shared_memory)')
+        self._workers: int = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self._workers, mp_context=mp_context)
+        self._segments: Dict[Hashable, SharedMemory] = {}
+        self._snapshots: Dict[Hashable, _Snapshot] = {}
+
+    def __enter__(self) -> 'PPWorkerPool':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def __repr__(self) -> str:
+        return f'<PPWorkerPool (workers: {self._workers}, beatmaps: {len(self)})>'
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def add_beatmap(self, beatmap_id: Hashable, beatmap: Beatmap) -> None:
+        '''Share a Beatmap with the workers (replace the old one with the same id)'''
+        data = beatmap.to_bytes()
+        shm = SharedMemory(create=True, size=max(len(data), 1))
+        shm.buf[:len(data)] = data
+        self.remove_beatmap(beatmap_id)
+        self._segments[beatmap_id] = shm
+        self._snapshots[beatmap_id] = (shm.name, len(data))
+
+    def add_beatmap_file(self, beatmap_id: Hashable, osu_file_path: Path,
+                         cache_dir: Optional[Path] = None) -> None:
+        '''Read and parse a .osu file, then share it with the workers'''
+        self.add_beatmap(beatmap_id, Beatmap(osu_file_path, cache_dir=cache_dir))
+
+    def remove_beatmap(self, beatmap_id: Hashable) -> bool:
+        '''Release the shared snapshot (jobs already submitted with it may fail)'''
+        shm = self._segments.pop(beatmap_id, None)
+        self._snapshots.pop(beatmap_id, None)
+        if shm is None:
+            return False
+        shm.close()
+        shm.unlink()
+        return True
+
+    def _snapshot(self, beatmap_id: Hashable) -> _Snapshot:
+        try:
+            return self._snapshots[beatmap_id]
+        except KeyError:
+            raise KeyError(f'Beatmap {beatmap_id!r} is not added to the pool') from None
+
+    def submit(self, beatmap_id: Hashable, config: ScoreConfig) -> 'Future[Dict[str, Any]]':
+        '''Submit one job, returns a Future of the `CalcResult.as_dict` dict'''
+        return self._executor.submit(_worker_calculate_one, self._snapshot(beatmap_id), config)
+
+    def submit_many(self, beatmap_id: Hashable,
+                    configs: List[ScoreConfig]) -> 'Future[List[Dict[str, Any]]]':
+        '''Submit many jobs of one beatmap (calculated in one native batch by a worker)'''
+        return self._executor.submit(_worker_calculate, self._snapshot(beatmap_id), list(configs))
+
+    def map(self, jobs: Iterable[Tuple[Hashable, ScoreConfig]],
+            chunksize: int = 64) -> Iterator[Dict[str, Any]]:
+        '''
+        Calculate `(beatmap_id, score config)` jobs, yields the results in the order of the jobs.
+
+        Consecutive jobs of the same beatmap are sent in chunks of `chunksize`,
+        at most `workers * 2` chunks are in flight (bounded memory with a lazy `jobs` iterator).
+        '''
+        pending: Deque[Future] = deque()
+        max_pending = self._workers * 2
+        chunk_id, chunk = None, []
+
+        def _flush() -> Iterator[Dict[str, Any]]:
+            pending.append(self.submit_many(chunk_id, chunk))
+            while len(pending) > max_pending:
+                yield from pending.popleft().result()
+
+        for beatmap_id, config in jobs:
+            if chunk and (beatmap_id != chunk_id or len(chunk) >= chunksize):
+                yield from _flush()
+                chunk = []
+            chunk_id = beatmap_id
+            chunk.append(config)
+        if chunk:
+            yield from _flush()
+        while pending:
+            yield from pending.popleft().result()
+
+    def calculate_many(self, jobs: Iterable[Tuple[Hashable, ScoreConfig]],
+                       chunksize: int = 64) -> List[Dict[str, Any]]:
+        '''Calculate `(beatmap_id, score config)` jobs, returns the results in the order of the jobs'''
+        return list(self.map(jobs, chunksize))
+
+    def close(self) -> None:
+        '''Shutdown the workers and release all the shared snapshots'''
+        self._executor.shutdown(wait=True)
+        for beatmap_id in list(self._segments):
+            self.remove_beatmap(beatmap_id)
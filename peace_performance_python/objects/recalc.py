@@ -0,0 +1,176 @@
+import time
+
+from itertools import islice
+from pathlib import Path
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping,
+                    NamedTuple, Optional, Tuple)
+
+from .beatmap import Beatmap
+from .store import BeatmapStore
+from .._peace_performance.pp import calculate_batch as raw_calculate_batch
+
+
+# Score row keys used for the calculation (missing keys are `None`)
+SCORE_ROW_ATTRS = ('n300', 'n100', 'n50', 'katu', 'miss', 'combo')
+
+
+class RecalcResult(NamedTuple):
+    '''
+    Recalculated score.
+
+    `offset`: position of the row in the stream, resume with `offset + 1`
+
+    `row`: the score row
+
+    `pp`, `stars`: `None` if failed
+
+    `error`: the exception if the beatmap could not be loaded
+    '''
+    offset: int
+    row: Mapping[str, Any]
+    pp: Optional[float]
+    stars: Optional[float]
+    error: Optional[Exception] = None
+
+
+class RecalcPipeline:
+    '''
+    Streaming leaderboard recalculation over an iterator of score rows.
+
+    Score rows are mappings with: `md5` (beatmap md5), `mode`, `mods`,
+    `n300`, `n100`, `n50`, `katu`, `miss`, `combo`.
+
+    The rows are read in windows of `batch_size` (bounded memory),
+    grouped by (beatmap, mode, mods) and calculated natively in one batch per group,
+    so the difficulty is calculated once per group. Beatmaps are loaded through a bounded
+    `BeatmapStore` (`cache_limit`), `resolve` maps a beatmap md5 to its .osu file path.
+
+    The results are yielded in the order of the rows, with their offset in the stream:
+    pass the last offset + 1 as `offset` to resume an interrupted run.
+
+    ### Examples:
+    ```
+    pipeline = RecalcPipeline(lambda md5: songs_dir / f'{md5}.osu', cache_limit=2000)
+    for result in pipeline.run(fetch_scores(), offset=last_checkpoint):
+        save(result.row['id'], result.pp)
+    print(pipeline.stats)
+    ```
+    '''
+
+    def __init__(self, resolve: Callable[[str], Optional[Path]], cache_limit: int = 1000,
+                 batch_size: int = 4096, cache_dir: Optional[Path] = None,
+                 store: Optional[BeatmapStore] = None) -> 'RecalcPipeline':
+        self.resolve = resolve
+        self.batch_size = max(batch_size, 1)
+        self.cache_dir = cache_dir
+        self.store = store if store is not None else BeatmapStore(limit=cache_limit)
+        self.processed = 0
+        self.failed = 0
+        self.groups = 0
+        self.elapsed = 0.0
+
+    def __repr__(self) -> str:
+        return f'<RecalcPipeline ({self.attrs})>'
+
+    @property
+    def attrs(self) -> str:
+        return ', '.join(f'{k}: {v}' for k, v in self.stats.items())
+
+    @property
+    def throughput(self) -> float:
+        '''Scores per second'''
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'processed': self.processed,
+            'failed': self.failed,
+            'groups': self.groups,
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'beatmap_cache_hits': self.store.hits,
+            'beatmap_cache_misses': self.store.misses,
+        }
+
+    def _load(self, md5: str) -> Any:
+        '''Returns the native Beatmap (`Rust`), through the bounded store'''
+        raw = self.store.get_raw(md5=md5)
+        if raw is not None:
+            return raw[0]
+        path = self.resolve(md5)
+        if path is None:
+            raise FileNotFoundError(f'Could not resolve beatmap: {md5}')
+        # Parsed then inserted (`get_or_load_raw` would look the md5 up and count a miss again)
+        beatmap = Beatmap(path, cache_dir=self.cache_dir)._raw
+        self.store.insert_raw(beatmap, md5, None, path)
+        return beatmap
+
+    def _calculate_group(self, beatmap: Any, window: List[Tuple[int, Mapping[str, Any]]],
+                         indexes: List[int], mode: Any, mods: Any) -> List[RecalcResult]:
+        '''Calculate the rows of a group in one batch, row by row if a row is invalid'''
+        def columns(indexes: List[int]) -> Dict[str, List[Any]]:
+            columns = {attr: [window[i][1].get(attr) for i in indexes] for attr in SCORE_ROW_ATTRS}
+            columns['mode'] = [mode] * len(indexes)
+            columns['mods'] = [mods] * len(indexes)
+            return columns
+
+        try:
+            return [
+                RecalcResult(window[i][0], window[i][1], result.pp, result.stars)
+                for i, result in zip(indexes, raw_calculate_batch(beatmap, columns(indexes)))
+            ]
+        except Exception:
+            pass
+        # Find the invalid rows, the others are still calculated
+        results = []
+        for i in indexes:
+            try:
+                result = raw_calculate_batch(beatmap, columns([i]))[0]
+                results.append(RecalcResult(window[i][0], window[i][1], result.pp, result.stars))
+            except Exception as err:
+                results.append(RecalcResult(window[i][0], window[i][1], None, None, err))
+                self.failed += 1
+        return results
+
+    def _calculate_window(self, window: List[Tuple[int, Mapping[str, Any]]]) -> List[RecalcResult]:
+        groups: Dict[Tuple[str, Any, Any], List[int]] = {}
+        for i, (_, row) in enumerate(window):
+            groups.setdefault((row['md5'], row.get('mode'), row.get('mods')), []).append(i)
+
+        results: List[Optional[RecalcResult]] = [None] * len(window)
+        for (md5, mode, mods), indexes in groups.items():
+            self.groups += 1
+            try:
+                beatmap = self._load(md5)
+            except Exception as err:
+                for i in indexes:
+                    results[i] = RecalcResult(window[i][0], window[i][1], None, None, err)
+                self.failed += len(indexes)
+                continue
+            for i, result in zip(indexes, self._calculate_group(beatmap, window, indexes, mode, mods)):
+                results[i] = result
+        return results
+
+    def run(self, rows: Iterable[Mapping[str, Any]], offset: int = 0,
+            skip: bool = True) -> Iterator[RecalcResult]:
+        '''
+        Recalculate the score rows, yields `RecalcResult` in the order of the rows.
+
+        `offset`: offset of the first row to calculate.
+        If `skip`, the first `offset` rows of `rows` are skipped,
+        otherwise `rows` is expected to start at `offset` already (e.g. a resumed db query).
+        '''
+        rows = iter(rows)
+        if skip and offset:
+            rows = islice(rows, offset, None)
+        while True:
+            start = time.perf_counter()
+            window = list(zip(range(offset, offset + self.batch_size), rows))
+            if not window:
+                break
+            results = self._calculate_window(window)
+            offset += len(window)
+            self.processed += len(window)
+            self.elapsed += time.perf_counter() - start
+            yield from results
@@ -0,0 +1,65 @@
+from typing import Optional
+from pathlib import Path
+
+from .beatmap import Beatmap
+from .._peace_performance.beatmap import BeatmapStore as BeatmapStoreRust
+
+
+class BeatmapStore(BeatmapStoreRust):
+    '''
+    Thread-safe native beatmap store with Lru eviction and an optional ttl.
+
+    Beatmaps can be indexed with `md5`, `bid` (beatmap id) or their `path`.
+
+    `limit`: `int` # Max amount of beatmaps
+
+    `ttl`: `Optional[float]` # Seconds, beatmaps older than this are expired
+
+    `max_bytes`: `Optional[int]` # Max (approximate) memory used by the beatmaps
+
+    `bytes`: `int` # (approximate) memory used by the beatmaps
+
+    `hits`: `int`
+
+    `misses`: `int`
+
+    `evictions`: `int`
+
+    ### Examples:
+    ```
+    store = BeatmapStore(limit=5000, ttl=3600)
+
+    # Parse on miss
+    beatmap = store.get_or_load('path_to_osu_file', md5='...', bid=1234)
+
+    # Then
+    beatmap = store.get(md5='...')
+    # or
+    beatmap = store.get(bid=1234)
+    ```
+    '''
+
+    def insert(self, beatmap: Beatmap, md5: Optional[str] = None, bid: Optional[int] = None) -> None:
+        '''
+        Insert a Beatmap (replace the old one with the same keys),
+        `md5` defaults to `beatmap.md5` (computed during the parse with `hash=True`)
+        '''
+        self.insert_raw(beatmap._raw, md5, bid, beatmap.path)
+
+    def get(self, md5: Optional[str] = None, bid: Optional[int] = None,
+            path: Optional[Path] = None) -> Optional[Beatmap]:
+        '''Get a Beatmap with md5, bid or path, returns `None` if missed or expired'''
+        result = self.get_raw(md5, bid, path)
+        if result is None:
+            return None
+        return Beatmap.from_raw(*result)
+
+    def get_or_load(self, osu_file_path: Path, md5: Optional[str] = None,
+                    bid: Optional[int] = None) -> Beatmap:
+        '''
+        Get a Beatmap, read and parse the .osu files if missed.
+
+        The md5 is computed during the parse (one read of the file),
+        the beatmap is registered with it if `md5` is not given.
+        '''
+        return Beatmap.from_raw(self.get_or_load_raw(osu_file_path, md5, bid), osu_file_path)
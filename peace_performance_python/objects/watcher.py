@@ -0,0 +1,373 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .store import BeatmapStore
+from .._peace_performance.beatmap import Beatmap as RawBeatmap
+from .._peace_performance.beatmap import read_beatmaps as raw_read_beatmaps
+
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+# (mtime_ns, size) of a .osu file
+FileState = Tuple[int, int]
+
+
+class _Inotify:
+    '''Minimal inotify (Linux) binding through libc, raises `OSError` if not available'''
+
+    def __init__(self) -> '_Inotify':
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on Linux')
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches: Dict[int, str] = {}
+
+    def add(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed: {directory}')
+        self.watches[wd] = directory
+
+    def read(self, timeout: float) -> List[Tuple[str, int]]:
+        '''Returns the `(path, mask)` events, waits up to `timeout` seconds for the first one'''
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events, offset = [], 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None and not mask & IN_Q_OVERFLOW:
+                continue
+            events.append((os.path.join(directory, os.fsdecode(name)) if name else directory or '', mask))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class BeatmapWatcher:
+    '''
+    Watches a directory of .osu files and keeps a `BeatmapStore` up to date.
+
+    Added and modified files are re-parsed in parallel (native threads) and swapped into the store
+    atomically (`BeatmapStore.swap_raw`): readers get the old or the new beatmap, never a missing one,
+    and the difficulty caches of the replaced beatmaps are cleared. Removed files are removed from the store.
+
+    Beatmaps are stored with their path (`os.path.join(directory, ...)`) and their md5,
+    identical files at several paths are stored once per path.
+
+    Changes are detected with inotify (Linux), or by polling the mtime and size of the files
+    every `interval` seconds (other platforms, network filesystems, or `use_inotify=False`).
+
+    `recursive`: also watch the sub directories
+
+    `debounce`: seconds to wait for more changes after the first one, the changes are reloaded in one batch
+
+    `workers`: threads used to parse a batch (`None`: cpu count)
+
+    `cache_dir`: parsed beatmap snapshots directory (see `read_beatmaps`)
+
+    `backend`: `'inotify'` or `'polling'`
+
+    `stats`: counts of the `added`, `modified`, `removed` and `failed` files, the `reloads` (batches)
+    and the reload latency (seconds, from the detection of a change to its swap into the store)
+
+    ### Examples:
+    ```
+    with BeatmapWatcher('./songs', store=BeatmapStore(limit=100000)) as watcher:
+        ...
+        beatmap = watcher.store.get(md5='...')
+        print(watcher.stats)
+    ```
+    '''
+
+    def __init__(self, directory: Path, store: Optional[BeatmapStore] = None, recursive: bool = True,
+                 interval: float = 1.0, debounce: float = 0.05, workers: Optional[int] = None,
+                 use_inotify: bool = True, cache_dir: Optional[Path] = None) -> 'BeatmapWatcher':
+        self.directory = os.fspath(directory)
+        if not os.path.isdir(self.directory):
+            raise NotADirectoryError(self.directory)
+        self.store = store if store is not None else BeatmapStore(limit=100000)
+        self.recursive = recursive
+        self.interval = interval
+        self.debounce = debounce
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.use_inotify = use_inotify
+        self.backend = 'polling'
+        self.added = 0
+        self.modified = 0
+        self.removed = 0
+        self.failed = 0
+        self.reloads = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+        self._reloaded = 0
+        self._files: Dict[str, FileState] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+
+    def __repr__(self) -> str:
+        return f'<BeatmapWatcher ({self.attrs})>'
+
+    def __enter__(self) -> 'BeatmapWatcher':
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @property
+    def attrs(self) -> str:
+        return ', '.join(f'{k}: {v}' for k, v in self.stats.items())
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def avg_latency(self) -> float:
+        return self._total_latency / self._reloaded if self._reloaded else 0.0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend,
+            'files': len(self._files),
+            'added': self.added,
+            'modified': self.modified,
+            'removed': self.removed,
+            'failed': self.failed,
+            'reloads': self.reloads,
+            'last_latency': self.last_latency,
+            'avg_latency': self.avg_latency,
+            'max_latency': self.max_latency,
+        }
+
+    @property
+    def paths(self) -> List[str]:
+        '''Paths of the watched .osu files'''
+        return list(self._files)
+
+    # Detection
+
+    def _directories(self) -> Iterable[str]:
+        if not self.recursive:
+            return [self.directory]
+        return (root for root, _, _ in os.walk(self.directory))
+
+    @staticmethod
+    def _stat(path: str) -> Optional[FileState]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _scan(self, directory: Optional[str] = None) -> Dict[str, FileState]:
+        '''Returns the state of the .osu files in the (watched) directory'''
+        directories = [root for root, _, _ in os.walk(directory)] if directory else self._directories()
+        files = {}
+        for root in directories:
+            try:
+                entries = os.scandir(root)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.endswith('.osu') and entry.is_file():
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        files[entry.path] = stat.st_mtime_ns, stat.st_size
+        return files
+
+    def _diff(self, files: Dict[str, FileState], prefix: Optional[str] = None) -> Tuple[Set[str], Set[str]]:
+        '''Returns the changed and the removed paths (under `prefix`), compared to the known files'''
+        changed = {path for path, state in files.items() if self._files.get(path) != state}
+        removed = {
+            path for path in self._files
+            if path not in files and (prefix is None or path.startswith(prefix + os.sep))
+        }
+        return changed, removed
+
+    def _inotify_changes(self, timeout: float) -> Tuple[Set[str], Set[str]]:
+        changed, removed = set(), set()
+        events = self._inotify.read(timeout)
+        if events and self.debounce > 0:
+            # Editors and copies write a file in several events, reload it once
+            deadline = time.perf_counter() + self.debounce
+            while True:
+                remaining = deadline - time.perf_counter()
+                more = self._inotify.read(remaining) if remaining > 0 else []
+                if not more:
+                    break
+                events.extend(more)
+        for path, mask in events:
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, compare with a full scan
+                rescan_changed, rescan_removed = self._diff(self._scan())
+                changed |= rescan_changed
+                removed |= rescan_removed
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.recursive:
+                    for directory in (root for root, _, _ in os.walk(path)):
+                        self._add_watch(directory)
+                    # The files written before the watch was added
+                    changed |= self._diff(self._scan(path))[0]
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    removed |= {p for p in self._files if p.startswith(path + os.sep)}
+            elif path.endswith('.osu'):
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    removed.add(path)
+                    changed.discard(path)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    changed.add(path)
+                    removed.discard(path)
+        return changed, removed
+
+    def _add_watch(self, directory: str) -> None:
+        try:
+            self._inotify.add(directory)
+        except OSError:
+            # e.g. the directory was removed meanwhile, or the watch limit is reached
+            pass
+
+    # Reload
+
+    def _apply(self, changed: Iterable[str], removed: Iterable[str], detected: float) -> int:
+        '''Re-parse the changed files and swap them into the store, returns the amount of changes'''
+        with self._lock:
+            states = {path: self._stat(path) for path in changed}
+            # Removed meanwhile
+            removed = set(removed) | {path for path, state in states.items() if state is None}
+            paths = [path for path, state in states.items() if state is not None]
+
+            swapped = 0
+            for path, result in zip(paths, raw_read_beatmaps(paths, self.workers, False, self.cache_dir, True)):
+                if isinstance(result, RawBeatmap):
+                    # Keyed by path: identical files at other paths keep their entries
+                    if self.store.swap_raw(result, path, result.md5):
+                        self.modified += 1
+                    else:
+                        self.added += 1
+                    swapped += 1
+                else:
+                    # Keep the old beatmap (if any), retried on the next change of the file
+                    self.failed += 1
+                self._files[path] = states[path]
+
+            n_removed = 0
+            for path in removed:
+                if self._files.pop(path, None) is not None:
+                    self.store.remove(path=path)
+                    n_removed += 1
+            self.removed += n_removed
+
+            # The failed files are not reloaded
+            count = swapped + n_removed
+            if count:
+                self.reloads += 1
+                self.last_latency = time.perf_counter() - detected
+                self.max_latency = max(self.max_latency, self.last_latency)
+                self._total_latency += self.last_latency
+                self._reloaded += 1
+            return count
+
+    def poll_once(self) -> int:
+        '''Compare the directory with the known files and reload the changes now, returns the amount of changes'''
+        detected = time.perf_counter()
+        return self._apply(*self._diff(self._scan()), detected)
+
+    # Lifecycle
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self._inotify is not None:
+                    changed, removed = self._inotify_changes(min(self.interval, 0.5))
+                    if changed or removed:
+                        self._apply(changed, removed, time.perf_counter())
+                else:
+                    self.poll_once()
+                    self._stop.wait(self.interval)
+            except Exception:
+                # Keep watching (e.g. a directory removed during a scan)
+                self._stop.wait(self.interval)
+
+    def start(self) -> 'BeatmapWatcher':
+        '''Load the existing files, then watch the changes in a background thread'''
+        if self.running:
+            return self
+        self._stop.clear()
+        self.backend = 'polling'
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify()
+                for directory in self._directories():
+                    self._inotify.add(directory)
+                self.backend = 'inotify'
+            except (OSError, AttributeError):
+                # Not Linux, or no inotify in the libc
+                self._close_inotify()
+        # After the watches are added: no change is missed between the scan and the watch
+        self.poll_once()
+        self._thread = threading.Thread(target=self._run, name='peace_performance_watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        '''Stop watching (the store is kept)'''
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._close_inotify()
+
+    def _close_inotify(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -40,6 +40,23 @@ def _read_only_property_generator(cls):
     return cls
 
 
+def _cached_getter_maker(attr: str) -> Callable[[Any], Any]:
+    '''Returns a getter for Wrapper(_raw) -> _raw, reading all the attrs once with `_raw.as_dict`'''
+    def _fn(c: Any) -> Any:
+        cache = c._attrs_cache
+        if cache is None:
+            cache = c._attrs_cache = c._raw.as_dict
+        return cache[attr]
+    return _fn
+
+
+def _cached_property_generator(cls):
+    '''Property generator for Wrapper(_raw) -> _raw (read only, immutable attrs read once)'''
+    for attr in cls._cached_attrs:
+        setattr(cls, attr, property(fget=_cached_getter_maker(attr)))
+    return cls
+
+
 def _get_attrs_str(target: object, attrs: Iterable[str]) -> str:
     '''Get object attrs as str'''
     return ', '.join([f'{attr}: {getattr(target, attr)}' for attr in attrs])
@@ -47,7 +47,9 @@ setup(
         "Operating System :: Microsoft :: Windows",
     ],
     install_requires=[
-        "typing_extensions"
+        "typing_extensions",
+        # Feature `numpy` (default enabled)
+        "numpy",
     ],
     packages=["peace_performance_python", "peace_performance_python.objects",
               "peace_performance_python.functions"],
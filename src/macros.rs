@@ -29,6 +29,15 @@ macro_rules! pyo3_py_dict {
     }};
 }
 
+#[macro_export]
+macro_rules! pyo3_numpy_dict {
+    ($py:ident, $obj:ident; {$($attr:ident),*}) => {{
+        let d = PyDict::new($py);
+        $(d.set_item(stringify!($attr), numpy::IntoPyArray::into_pyarray($obj.$attr, $py))?;)*
+        d
+    }};
+}
+
 #[macro_export]
 macro_rules! async_not_enabled_err {
     () => {
@@ -47,6 +56,13 @@ macro_rules! rust_logger_not_enabled_err {
     };
 }
 
+#[macro_export]
+macro_rules! numpy_not_enabled_err {
+    () => {
+        crate::python::exceptions::FeatureEnabledError::new_err("`numpy` features are not enabled.")
+    };
+}
+
 #[macro_export]
 macro_rules! invalid_gamemode_err {
     () => {
@@ -194,3 +210,25 @@ macro_rules! cfg_not_rust_logger {
         )*
     }
 }
+
+#[macro_export]
+macro_rules! cfg_numpy {
+    ($($item:item)*) => {
+        $(
+            #[cfg(feature = "numpy")]
+            #[cfg_attr(docsrs, doc(cfg(feature = "numpy")))]
+            $item
+        )*
+    }
+}
+
+#[macro_export]
+macro_rules! cfg_not_numpy {
+    ($($item:item)*) => {
+        $(
+            #[cfg(not(feature = "numpy"))]
+            #[cfg_attr(docsrs, doc(cfg(not(feature = "numpy"))))]
+            $item
+        )*
+    }
+}
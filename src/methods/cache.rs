@@ -0,0 +1,236 @@
+use std::{
+    collections::HashMap,
+    hash::Hash,
+    sync::{
+        atomic::{AtomicUsize, Ordering},
+        Arc, RwLock,
+    },
+};
+
+use rosu_pp::DifficultyAttributes;
+
+use super::columns::StrainColumns;
+
+/// Default max amount of difficulty attributes (and strains) memoized by one beatmap
+pub const DIFFICULTY_CACHE_LIMIT: usize = 64;
+
+/// (mode, mods, passed_obj)
+pub type DifficultyKey = (Option<u8>, u32, Option<usize>);
+
+/// (mode, mods)
+pub type StrainsKey = (Option<u8>, u32);
+
+/// Memoized value with its last use (tick of the cache clock)
+#[derive(Debug)]
+struct Entry<V> {
+    value: V,
+    used: AtomicUsize,
+}
+
+impl<V: Clone> Clone for Entry<V> {
+    fn clone(&self) -> Self {
+        Self {
+            value: self.value.clone(),
+            used: AtomicUsize::new(self.used.load(Ordering::Relaxed)),
+        }
+    }
+}
+
+type LruMap<K, V> = HashMap<K, Entry<V>>;
+
+/// Evict the least recently used entries until there is room for one more
+fn evict_lru<K: Clone + Eq + Hash, V>(map: &mut LruMap<K, V>, limit: usize) {
+    while !map.is_empty() && map.len() >= limit {
+        let oldest = map
+            .iter()
+            .min_by_key(|(_, entry)| entry.used.load(Ordering::Relaxed))
+            .map(|(key, _)| key.clone());
+        match oldest {
+            Some(key) => map.remove(&key),
+            None => break,
+        };
+    }
+}
+
+/// Memoized difficulty attributes of a beatmap.
+///
+/// The difficulty (strain) pass only depends on (mode, mods, passed_obj),
+/// so the performance calculation can reuse it when only acc / combo / misses change.
+/// The strain timelines (difficulty graphs) are memoized per (mode, mods) too.
+///
+/// Both are bounded by `limit` (e.g. increasing `passed_obj`),
+/// the least recently used entry is evicted when a new one does not fit.
+#[derive(Debug)]
+pub struct DifficultyCache {
+    attributes: RwLock<LruMap<DifficultyKey, DifficultyAttributes>>,
+    strains: RwLock<LruMap<StrainsKey, Arc<StrainColumns>>>,
+    clock: AtomicUsize,
+    limit: AtomicUsize,
+    hits: AtomicUsize,
+    misses: AtomicUsize,
+}
+
+impl Default for DifficultyCache {
+    fn default() -> Self {
+        Self::with_limit(DIFFICULTY_CACHE_LIMIT)
+    }
+}
+
+impl Clone for DifficultyCache {
+    fn clone(&self) -> Self {
+        Self {
+            attributes: RwLock::new(self.attributes.read().unwrap().clone()),
+            strains: RwLock::new(self.strains.read().unwrap().clone()),
+            clock: AtomicUsize::new(self.clock.load(Ordering::Relaxed)),
+            limit: AtomicUsize::new(self.limit()),
+            hits: AtomicUsize::new(self.hits()),
+            misses: AtomicUsize::new(self.misses()),
+        }
+    }
+}
+
+impl DifficultyCache {
+    #[inline(always)]
+    pub fn with_limit(limit: usize) -> Self {
+        Self {
+            attributes: Default::default(),
+            strains: Default::default(),
+            clock: AtomicUsize::new(0),
+            limit: AtomicUsize::new(limit),
+            hits: AtomicUsize::new(0),
+            misses: AtomicUsize::new(0),
+        }
+    }
+
+    #[inline(always)]
+    fn tick(&self) -> usize {
+        self.clock.fetch_add(1, Ordering::Relaxed)
+    }
+
+    /// Get and mark as recently used
+    #[inline(always)]
+    fn touch<K: Eq + Hash, V: Clone>(&self, map: &LruMap<K, V>, key: &K) -> Option<V> {
+        map.get(key).map(|entry| {
+            entry.used.store(self.tick(), Ordering::Relaxed);
+            entry.value.clone()
+        })
+    }
+
+    #[inline(always)]
+    pub fn get(&self, key: &DifficultyKey) -> Option<DifficultyAttributes> {
+        let attributes = self.touch(&self.attributes.read().unwrap(), key);
+        match attributes {
+            Some(_) => self.hits.fetch_add(1, Ordering::Relaxed),
+            None => self.misses.fetch_add(1, Ordering::Relaxed),
+        };
+        attributes
+    }
+
+    /// Get without counting a hit / miss
+    #[inline(always)]
+    pub fn get_quiet(&self, key: &DifficultyKey) -> Option<DifficultyAttributes> {
+        self.touch(&self.attributes.read().unwrap(), key)
+    }
+
+    #[inline(always)]
+    pub fn insert(&self, key: DifficultyKey, attributes: DifficultyAttributes) {
+        let limit = self.limit();
+        if limit == 0 {
+            return;
+        }
+        let mut map = self.attributes.write().unwrap();
+        if !map.contains_key(&key) {
+            evict_lru(&mut map, limit);
+        }
+        let used = AtomicUsize::new(self.tick());
+        map.insert(
+            key,
+            Entry {
+                value: attributes,
+                used,
+            },
+        );
+    }
+
+    /// Get the memoized strains, or compute and memoize them
+    #[inline(always)]
+    pub fn strains_or_insert_with<F>(&self, key: StrainsKey, f: F) -> Arc<StrainColumns>
+    where
+        F: FnOnce() -> StrainColumns,
+    {
+        if let Some(strains) = self.touch(&self.strains.read().unwrap(), &key) {
+            return strains;
+        }
+        // Computed without holding the lock
+        let strains = Arc::new(f());
+        let limit = self.limit();
+        if limit == 0 {
+            return strains;
+        }
+        let mut map = self.strains.write().unwrap();
+        if !map.contains_key(&key) {
+            evict_lru(&mut map, limit);
+        }
+        let used = self.tick();
+        map.entry(key)
+            .or_insert(Entry {
+                value: strains,
+                used: AtomicUsize::new(used),
+            })
+            .value
+            .clone()
+    }
+
+    #[inline(always)]
+    pub fn strains_len(&self) -> usize {
+        self.strains.read().unwrap().len()
+    }
+
+    #[inline(always)]
+    pub fn limit(&self) -> usize {
+        self.limit.load(Ordering::Relaxed)
+    }
+
+    /// Set the max amount of memoized entries (`0`: no memoization),
+    /// evicting the least recently used ones if needed
+    #[inline(always)]
+    pub fn set_limit(&self, limit: usize) {
+        self.limit.store(limit, Ordering::Relaxed);
+        let mut attributes = self.attributes.write().unwrap();
+        if attributes.len() > limit {
+            evict_lru(&mut attributes, limit + 1);
+        }
+        let mut strains = self.strains.write().unwrap();
+        if strains.len() > limit {
+            evict_lru(&mut strains, limit + 1);
+        }
+    }
+
+    #[inline(always)]
+    pub fn clear(&self) {
+        self.attributes.write().unwrap().clear();
+        self.strains.write().unwrap().clear();
+        self.hits.store(0, Ordering::Relaxed);
+        self.misses.store(0, Ordering::Relaxed);
+    }
+
+    #[inline(always)]
+    pub fn len(&self) -> usize {
+        self.attributes.read().unwrap().len()
+    }
+
+    #[inline(always)]
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    #[inline(always)]
+    pub fn hits(&self) -> usize {
+        self.hits.load(Ordering::Relaxed)
+    }
+
+    #[inline(always)]
+    pub fn misses(&self) -> usize {
+        self.misses.load(Ordering::Relaxed)
+    }
+}
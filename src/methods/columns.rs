@@ -0,0 +1,136 @@
+use rosu_pp::{
+    beatmap::{DifficultyPoint as RawDifficultyPoint, TimingPoint as RawTimingPoint},
+    parse::{HitObject as RawHitObject, HitObjectKind as RawHitObjectKind},
+    Strains,
+};
+
+pub const KIND_CIRCLE: u8 = 0;
+pub const KIND_SLIDER: u8 = 1;
+pub const KIND_SPINNER: u8 = 2;
+pub const KIND_HOLD: u8 = 3;
+
+/// Hit objects as struct-of-arrays
+#[derive(Clone, Debug, Default)]
+pub struct HitObjectColumns {
+    pub start_time: Vec<f64>,
+    pub end_time: Vec<f64>,
+    pub x: Vec<f32>,
+    pub y: Vec<f32>,
+    pub kind: Vec<u8>,
+    /// 0 if not a slider
+    pub repeats: Vec<u64>,
+    /// 0.0 if not a slider
+    pub pixel_len: Vec<f64>,
+}
+
+impl HitObjectColumns {
+    pub fn new(hit_objects: &[RawHitObject]) -> Self {
+        let len = hit_objects.len();
+        let mut columns = Self {
+            start_time: Vec::with_capacity(len),
+            end_time: Vec::with_capacity(len),
+            x: Vec::with_capacity(len),
+            y: Vec::with_capacity(len),
+            kind: Vec::with_capacity(len),
+            repeats: Vec::with_capacity(len),
+            pixel_len: Vec::with_capacity(len),
+        };
+        for obj in hit_objects {
+            let (kind, repeats, pixel_len) = match &obj.kind {
+                RawHitObjectKind::Circle => (KIND_CIRCLE, 0, 0.0),
+                RawHitObjectKind::Slider {
+                    pixel_len, repeats, ..
+                } => (KIND_SLIDER, *repeats as u64, *pixel_len),
+                RawHitObjectKind::Spinner { .. } => (KIND_SPINNER, 0, 0.0),
+                RawHitObjectKind::Hold { .. } => (KIND_HOLD, 0, 0.0),
+            };
+            columns.start_time.push(obj.start_time);
+            columns.end_time.push(obj.end_time());
+            columns.x.push(obj.pos.x);
+            columns.y.push(obj.pos.y);
+            columns.kind.push(kind);
+            columns.repeats.push(repeats);
+            columns.pixel_len.push(pixel_len);
+        }
+        columns
+    }
+}
+
+/// Timing points as struct-of-arrays
+#[derive(Clone, Debug, Default)]
+pub struct TimingPointColumns {
+    pub time: Vec<f64>,
+    pub beat_len: Vec<f64>,
+}
+
+impl TimingPointColumns {
+    pub fn new(timing_points: &[RawTimingPoint]) -> Self {
+        Self {
+            time: timing_points.iter().map(|point| point.time).collect(),
+            beat_len: timing_points.iter().map(|point| point.beat_len).collect(),
+        }
+    }
+}
+
+/// Difficulty points as struct-of-arrays
+#[derive(Clone, Debug, Default)]
+pub struct DifficultyPointColumns {
+    pub time: Vec<f64>,
+    pub speed_multiplier: Vec<f64>,
+}
+
+impl DifficultyPointColumns {
+    pub fn new(difficulty_points: &[RawDifficultyPoint]) -> Self {
+        Self {
+            time: difficulty_points.iter().map(|point| point.time).collect(),
+            speed_multiplier: difficulty_points
+                .iter()
+                .map(|point| point.speed_multiplier)
+                .collect(),
+        }
+    }
+}
+
+/// Section strain peaks of each skill, all the skills share the same sections
+#[derive(Clone, Debug, Default)]
+pub struct StrainColumns {
+    pub mode: u8,
+    pub section_len: f64,
+    pub skills: Vec<(&'static str, Vec<f64>)>,
+}
+
+impl From<Strains> for StrainColumns {
+    fn from(strains: Strains) -> Self {
+        match strains {
+            Strains::Osu(s) => Self {
+                mode: 0,
+                section_len: s.section_len,
+                skills: vec![
+                    ("aim", s.aim),
+                    ("aim_no_sliders", s.aim_no_sliders),
+                    ("speed", s.speed),
+                    ("flashlight", s.flashlight),
+                ],
+            },
+            Strains::Taiko(s) => Self {
+                mode: 1,
+                section_len: s.section_len,
+                skills: vec![
+                    ("color", s.color),
+                    ("rhythm", s.rhythm),
+                    ("stamina", s.stamina),
+                ],
+            },
+            Strains::Catch(s) => Self {
+                mode: 2,
+                section_len: s.section_len,
+                skills: vec![("movement", s.movement)],
+            },
+            Strains::Mania(s) => Self {
+                mode: 3,
+                section_len: s.section_len,
+                skills: vec![("strains", s.strains)],
+            },
+        }
+    }
+}
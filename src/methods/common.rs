@@ -1,5 +1,5 @@
-use pyo3::{PyAny, PyErr};
-use rosu_pp::{GameMode, ParseError};
+use pyo3::{buffer::PyBuffer, exceptions::PyBufferError, PyAny, PyErr};
+use rosu_pp::{Beatmap as RawBeatmap, GameMode, ParseError};
 use std::path::PathBuf;
 
 use crate::python::exceptions::{ParseBeatmapError, ReadFileError};
@@ -47,26 +47,143 @@ pub fn py_any_into_osu_mode(py_input: &PyAny) -> Result<GameMode, PyErr> {
     Err(crate::invalid_gamemode_err!())
 }
 
+/// View of a python buffer protocol object (bytes, bytearray, memoryview...),
+/// used without the GIL: zero-copy for read-only buffers, writable buffers are copied
+/// (another thread could write them during the parse)
+pub enum BytesBuffer {
+    ReadOnly(PyBuffer<u8>),
+    Copied(Vec<u8>),
+}
+
+impl BytesBuffer {
+    pub fn get(obj: &PyAny) -> Result<Self, PyErr> {
+        let buf = PyBuffer::<u8>::get(obj)?;
+        if !buf.is_c_contiguous() {
+            return Err(PyBufferError::new_err("The buffer must be C-contiguous"));
+        }
+        if buf.readonly() {
+            return Ok(Self::ReadOnly(buf));
+        }
+        Ok(Self::Copied(buf.to_vec(obj.py())?))
+    }
+
+    #[inline(always)]
+    pub fn as_slice(&self) -> &[u8] {
+        match self {
+            Self::ReadOnly(buf) => {
+                if buf.len_bytes() == 0 {
+                    return &[];
+                }
+                // Safety: read-only C-contiguous buffer of `len_bytes` bytes,
+                // kept alive (and not resized) while the PyBuffer is held
+                unsafe { std::slice::from_raw_parts(buf.buf_ptr() as *const u8, buf.len_bytes()) }
+            }
+            Self::Copied(bytes) => bytes,
+        }
+    }
+}
+
 crate::cfg_any_async! {
-    use std::future::Future;
+    use pyo3::{exceptions::PyRuntimeError, IntoPy, PyObject, PyResult, Python};
+    use std::{
+        future::Future,
+        sync::atomic::{AtomicBool, Ordering},
+    };
+
+    static RUNTIME_STARTED: AtomicBool = AtomicBool::new(false);
+
+    /// Mark the process-wide runtime as used, it can no longer be configured
+    #[inline(always)]
+    pub fn runtime_started() {
+        RUNTIME_STARTED.store(true, Ordering::Relaxed);
+    }
+
+    #[inline(always)]
+    fn check_runtime_not_started() -> Result<(), PyErr> {
+        if RUNTIME_STARTED.load(Ordering::Relaxed) {
+            return Err(PyRuntimeError::new_err(
+                "The async runtime is already started, set its threads before any beatmap is read.",
+            ));
+        }
+        Ok(())
+    }
 
     crate::cfg_async_std! {
         use async_std::fs::File as AsyncFile;
+        use pyo3_asyncio::async_std as pyo3_async_runtime;
+
+        /// Run blocking work on the blocking thread pool of the async-std runtime
+        pub async fn spawn_blocking<F, T>(f: F) -> Result<T, PyErr>
+        where
+            F: FnOnce() -> T + Send + 'static,
+            T: Send + 'static,
+        {
+            Ok(async_std::task::spawn_blocking(f).await)
+        }
 
         pub fn block_on<F: Future>(future: F) -> F::Output {
+            runtime_started();
             async_std::task::block_on(future)
         }
+
+        /// Set the worker threads of the global async-std runtime
+        pub fn set_runtime_threads(threads: usize) -> Result<(), PyErr> {
+            check_runtime_not_started()?;
+            std::env::set_var("ASYNC_STD_THREAD_COUNT", threads.max(1).to_string());
+            Ok(())
+        }
     }
 
     crate::cfg_async_tokio! {
         use tokio::fs::File as AsyncFile;
+        use pyo3_asyncio::tokio as pyo3_async_runtime;
+
+        /// Run blocking work on the blocking thread pool of the tokio runtime
+        pub async fn spawn_blocking<F, T>(f: F) -> Result<T, PyErr>
+        where
+            F: FnOnce() -> T + Send + 'static,
+            T: Send + 'static,
+        {
+            tokio::task::spawn_blocking(f)
+                .await
+                .map_err(|err| PyRuntimeError::new_err(format!("Blocking task failed: {}", err)))
+        }
+
+        /// The process-wide (lazily initialized) tokio runtime, shared with the python futures
+        #[inline(always)]
+        pub fn runtime() -> &'static tokio::runtime::Runtime {
+            runtime_started();
+            pyo3_asyncio::tokio::get_runtime()
+        }
 
         pub fn block_on<F: Future>(future: F) -> F::Output {
-            use tokio::runtime::Runtime;
-            Runtime::new().unwrap().block_on(future)
+            runtime().block_on(future)
+        }
+
+        /// Set the worker threads of the process-wide tokio runtime
+        pub fn set_runtime_threads(threads: usize) -> Result<(), PyErr> {
+            check_runtime_not_started()?;
+            let mut builder = tokio::runtime::Builder::new_multi_thread();
+            builder.worker_threads(threads.max(1)).enable_all();
+            pyo3_asyncio::tokio::init(builder);
+            Ok(())
         }
     }
 
+    /// Run blocking (native) work on the blocking thread pool of the async runtime,
+    /// returns a python awaitable resolved with its result (the event loop is never blocked)
+    pub fn blocking_into_py<F, T>(py: Python, f: F) -> PyResult<&PyAny>
+    where
+        F: FnOnce() -> PyResult<T> + Send + 'static,
+        T: IntoPy<PyObject> + Send + 'static,
+    {
+        runtime_started();
+        pyo3_async_runtime::future_into_py(py, async move {
+            let result = spawn_blocking(f).await??;
+            Python::with_gil(|py| Ok(result.into_py(py)))
+        })
+    }
+
     /// Async read file
     #[inline(always)]
     #[cfg_attr(feature = "rust_logger", timed::timed(duration(printer = "trace!")))]
@@ -80,6 +197,21 @@ crate::cfg_any_async! {
         }
     }
 
+    /// Read and parse a beatmap, blocking the current thread
+    #[inline(always)]
+    pub fn read_beatmap(path: PathBuf) -> Result<RawBeatmap, PyErr> {
+        block_on(async {
+            let file = async_read_file(path).await?;
+            RawBeatmap::parse(file).await.map_err(map_parse_err)
+        })
+    }
+
+    /// Parse a beatmap from bytes, blocking the current thread (no actual io)
+    #[inline(always)]
+    pub fn parse_beatmap_bytes(bytes: &[u8]) -> Result<RawBeatmap, PyErr> {
+        block_on(RawBeatmap::parse(bytes)).map_err(map_parse_err)
+    }
+
     /// Async sleep
     #[inline(always)]
     pub async fn sleep(secs: u64) {
@@ -92,6 +224,10 @@ crate::cfg_any_async! {
 crate::cfg_not_async! {
     use std::fs::File as SyncFile;
 
+    pub fn set_runtime_threads(_threads: usize) -> Result<(), PyErr> {
+        Err(crate::async_not_enabled_err!())
+    }
+
     pub async fn sleep(_secs: u64) -> Result<(), PyErr> {
         Err(crate::async_not_enabled_err!())
     }
@@ -108,6 +244,39 @@ crate::cfg_not_async! {
             ))),
         }
     }
+
+    /// Read and parse a beatmap
+    #[inline(always)]
+    pub fn read_beatmap(path: PathBuf) -> Result<RawBeatmap, PyErr> {
+        RawBeatmap::parse(sync_read_file(path)?).map_err(map_parse_err)
+    }
+
+    /// Parse a beatmap from bytes
+    #[inline(always)]
+    pub fn parse_beatmap_bytes(bytes: &[u8]) -> Result<RawBeatmap, PyErr> {
+        RawBeatmap::parse(bytes).map_err(map_parse_err)
+    }
+}
+
+/// Read and parse a beatmap straight from a memory-mapped region of the file
+#[cfg_attr(feature = "rust_logger", timed::timed(duration(printer = "trace!")))]
+pub fn read_beatmap_mmap(path: PathBuf) -> Result<RawBeatmap, PyErr> {
+    let file = std::fs::File::open(path)
+        .map_err(|err| ReadFileError::new_err(format!("Could not read file: {}", err)))?;
+    // Safety: the mapped file could be modified by other processes, the parser only reads it once
+    let mmap = unsafe { memmap2::Mmap::map(&file) }
+        .map_err(|err| ReadFileError::new_err(format!("Could not map file: {}", err)))?;
+    parse_beatmap_bytes(&mmap)
+}
+
+/// Read and parse a beatmap, with a memory-mapped region of the file or the file reader
+#[inline(always)]
+pub fn read_beatmap_file(path: PathBuf, mmap: bool) -> Result<RawBeatmap, PyErr> {
+    if mmap {
+        read_beatmap_mmap(path)
+    } else {
+        read_beatmap(path)
+    }
 }
 
 pub fn map_parse_err(err: ParseError) -> PyErr {
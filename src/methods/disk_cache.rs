@@ -0,0 +1,161 @@
+use std::{
+    fs, io,
+    path::{Path, PathBuf},
+    sync::atomic::{AtomicUsize, Ordering},
+    time::UNIX_EPOCH,
+};
+
+use pyo3::PyErr;
+use rosu_pp::Beatmap as RawBeatmap;
+
+use super::{
+    common,
+    hash::{self, ContentHash},
+    serialize,
+};
+
+/// Extension of the snapshot files in the cache directory
+pub const SNAPSHOT_EXTENSION: &str = "ppyb";
+
+const FNV_OFFSET: u64 = 0xcbf29ce484222325;
+const FNV_PRIME: u64 = 0x100000001b3;
+
+static TMP_COUNTER: AtomicUsize = AtomicUsize::new(0);
+
+#[inline(always)]
+fn fnv1a(hash: u64, bytes: &[u8]) -> u64 {
+    bytes
+        .iter()
+        .fold(hash, |hash, b| (hash ^ *b as u64).wrapping_mul(FNV_PRIME))
+}
+
+/// The .osu file a snapshot was made from, stored at the start of the snapshot:
+/// a modified file (or another path with the same file name hash) does not match
+#[derive(Debug, PartialEq, Eq)]
+pub struct SnapshotKey {
+    pub path: String,
+    pub mtime: u128,
+    pub size: u64,
+}
+
+impl SnapshotKey {
+    pub fn new(path: &Path) -> io::Result<Self> {
+        let meta = fs::metadata(path)?;
+        let mtime = meta
+            .modified()?
+            .duration_since(UNIX_EPOCH)
+            .map_or(0, |d| d.as_nanos());
+        let path = fs::canonicalize(path).unwrap_or_else(|_| path.to_path_buf());
+        Ok(Self {
+            path: path.to_string_lossy().into_owned(),
+            mtime,
+            size: meta.len(),
+        })
+    }
+
+    /// `path length (u32) | path | mtime (u128) | size (u64)`, little endian
+    pub fn encode(&self) -> Vec<u8> {
+        let mut buf = Vec::with_capacity(4 + self.path.len() + 16 + 8);
+        buf.extend_from_slice(&(self.path.len() as u32).to_le_bytes());
+        buf.extend_from_slice(self.path.as_bytes());
+        buf.extend_from_slice(&self.mtime.to_le_bytes());
+        buf.extend_from_slice(&self.size.to_le_bytes());
+        buf
+    }
+
+    /// Returns the serialized beatmap of the snapshot if it was made from this key
+    pub fn strip<'a>(&self, snapshot: &'a [u8]) -> Option<&'a [u8]> {
+        let key = self.encode();
+        snapshot.strip_prefix(key.as_slice())
+    }
+
+    /// Snapshot file in the cache directory, named after the path only:
+    /// the snapshot of a modified .osu file replaces the old one
+    pub fn snapshot_path(&self, cache_dir: &Path) -> PathBuf {
+        let hash = fnv1a(FNV_OFFSET, self.path.as_bytes());
+        cache_dir.join(format!("{:016x}.{}", hash, SNAPSHOT_EXTENSION))
+    }
+}
+
+/// Write the snapshot to a temporary file then rename it,
+/// so concurrent readers (threads, processes) never see a partial snapshot
+pub fn write_snapshot(
+    snapshot: &Path,
+    key: &SnapshotKey,
+    beatmap: &RawBeatmap,
+    hash: Option<&ContentHash>,
+) -> io::Result<()> {
+    if let Some(dir) = snapshot.parent() {
+        fs::create_dir_all(dir)?;
+    }
+    let tmp = snapshot.with_extension(format!(
+        "{}.{}.tmp",
+        std::process::id(),
+        TMP_COUNTER.fetch_add(1, Ordering::Relaxed)
+    ));
+    let mut bytes = key.encode();
+    bytes.extend_from_slice(&serialize::serialize(beatmap, hash));
+    fs::write(&tmp, bytes)?;
+    fs::rename(&tmp, snapshot).map_err(|err| {
+        let _ = fs::remove_file(&tmp);
+        err
+    })
+}
+
+/// Read and parse a beatmap, with the hashes of its content (computed over the same bytes) if `hash`
+#[inline(always)]
+pub fn read_beatmap_source(
+    path: PathBuf,
+    mmap: bool,
+    hash: bool,
+) -> Result<(RawBeatmap, Option<ContentHash>), PyErr> {
+    if hash {
+        let (beatmap, hash) = hash::read_beatmap_file(path, mmap)?;
+        return Ok((beatmap, Some(hash)));
+    }
+    Ok((common::read_beatmap_file(path, mmap)?, None))
+}
+
+/// Read and parse a beatmap through the on-disk cache of parsed beatmaps:
+/// load the snapshot on a hit, parse and write the snapshot on a miss.
+///
+/// The cache is best-effort, any cache io error falls back to parsing the .osu file.
+pub fn read_beatmap(
+    path: PathBuf,
+    mmap: bool,
+    cache_dir: &Path,
+    hash: bool,
+) -> Result<(RawBeatmap, Option<ContentHash>), PyErr> {
+    let key = match SnapshotKey::new(&path) {
+        Ok(key) => key,
+        Err(_) => return read_beatmap_source(path, mmap, hash),
+    };
+    let snapshot = key.snapshot_path(cache_dir);
+    // Outdated, colliding or corrupted snapshots (or without the requested hashes) are simply replaced
+    if let Ok(bytes) = fs::read(&snapshot) {
+        if let Some(Ok((beatmap, content_hash))) = key.strip(&bytes).map(serialize::deserialize) {
+            if !hash || content_hash.is_some() {
+                return Ok((beatmap, content_hash));
+            }
+        }
+    }
+
+    let (beatmap, content_hash) = read_beatmap_source(path, mmap, hash)?;
+    let _ = write_snapshot(&snapshot, &key, &beatmap, content_hash.as_ref());
+    Ok((beatmap, content_hash))
+}
+
+/// Read and parse a beatmap, through the on-disk cache if `cache_dir` is given,
+/// with the hashes of its content if `hash`
+#[inline(always)]
+pub fn read_beatmap_file(
+    path: PathBuf,
+    mmap: bool,
+    cache_dir: Option<&Path>,
+    hash: bool,
+) -> Result<(RawBeatmap, Option<ContentHash>), PyErr> {
+    match cache_dir {
+        Some(cache_dir) => read_beatmap(path, mmap, cache_dir, hash),
+        None => read_beatmap_source(path, mmap, hash),
+    }
+}
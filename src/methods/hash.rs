@@ -0,0 +1,54 @@
+use std::{fs, path::PathBuf};
+
+use pyo3::PyErr;
+use rosu_pp::Beatmap as RawBeatmap;
+use xxhash_rust::xxh3::xxh3_64;
+
+use super::common;
+use crate::python::exceptions::ReadFileError;
+
+/// Hashes of the content of a .osu file, computed over the same bytes as the parse
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct ContentHash {
+    pub md5: [u8; 16],
+    /// xxh3 (64 bits), much faster than md5 (not for the osu! api)
+    pub fast: u64,
+}
+
+impl ContentHash {
+    #[inline(always)]
+    pub fn new(bytes: &[u8]) -> Self {
+        Self {
+            md5: md5::compute(bytes).0,
+            fast: xxh3_64(bytes),
+        }
+    }
+
+    /// Lowercase hex md5, like the osu! api
+    #[inline(always)]
+    pub fn md5_hex(&self) -> String {
+        self.md5.iter().map(|b| format!("{:02x}", b)).collect()
+    }
+}
+
+/// Hash then parse a beatmap from bytes (one pass over the content)
+#[inline(always)]
+pub fn parse_beatmap_bytes(bytes: &[u8]) -> Result<(RawBeatmap, ContentHash), PyErr> {
+    let hash = ContentHash::new(bytes);
+    Ok((common::parse_beatmap_bytes(bytes)?, hash))
+}
+
+/// Read a .osu file once (memory-mapped or into memory), then hash and parse its content
+pub fn read_beatmap_file(path: PathBuf, mmap: bool) -> Result<(RawBeatmap, ContentHash), PyErr> {
+    if mmap {
+        let file = fs::File::open(path)
+            .map_err(|err| ReadFileError::new_err(format!("Could not read file: {}", err)))?;
+        // Safety: same as `common::read_beatmap_mmap`
+        let mmap = unsafe { memmap2::Mmap::map(&file) }
+            .map_err(|err| ReadFileError::new_err(format!("Could not map file: {}", err)))?;
+        return parse_beatmap_bytes(&mmap);
+    }
+    let bytes = fs::read(path)
+        .map_err(|err| ReadFileError::new_err(format!("Could not read file: {}", err)))?;
+    parse_beatmap_bytes(&bytes)
+}
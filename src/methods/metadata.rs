@@ -0,0 +1,177 @@
+use std::{fs, path::Path, str};
+
+use pyo3::PyErr;
+use rosu_pp::GameMode;
+
+use super::common::int_into_osu_mode;
+use crate::python::exceptions::{ParseBeatmapError, ReadFileError};
+
+const FILE_HEADER: &str = "osu file format v";
+const UTF8_BOM: &[u8] = b"\xef\xbb\xbf";
+
+const CIRCLE_FLAG: u32 = 1 << 0;
+const SLIDER_FLAG: u32 = 1 << 1;
+const SPINNER_FLAG: u32 = 1 << 3;
+const HOLD_FLAG: u32 = 1 << 7;
+
+/// Beatmap metadata (the `Beatmap.as_dict` attrs), without the objects
+#[derive(Clone, Debug)]
+pub struct RawMetadata {
+    pub mode: GameMode,
+    pub version: u8,
+    pub n_circles: u32,
+    pub n_sliders: u32,
+    pub n_spinners: u32,
+    pub ar: f32,
+    pub od: f32,
+    pub cs: f32,
+    pub hp: f32,
+    pub slider_mult: f64,
+    pub tick_rate: f64,
+    pub stack_leniency: f32,
+}
+
+impl Default for RawMetadata {
+    fn default() -> Self {
+        Self {
+            mode: GameMode::Osu,
+            version: 0,
+            n_circles: 0,
+            n_sliders: 0,
+            n_spinners: 0,
+            ar: 5.0,
+            od: 5.0,
+            cs: 5.0,
+            hp: 5.0,
+            slider_mult: 1.0,
+            tick_rate: 1.0,
+            stack_leniency: 0.7,
+        }
+    }
+}
+
+#[derive(Clone, Copy, PartialEq)]
+enum Section {
+    General,
+    Difficulty,
+    HitObjects,
+    Other,
+}
+
+#[inline(always)]
+fn parse_err(what: &str) -> PyErr {
+    ParseBeatmapError::new_err(format!("Could not scan beatmap: {}", what))
+}
+
+/// Trim the ASCII whitespaces (and the `\r` of CRLF line endings)
+#[inline(always)]
+fn trim(mut bytes: &[u8]) -> &[u8] {
+    while let [first, rest @ ..] = bytes {
+        if !first.is_ascii_whitespace() {
+            break;
+        }
+        bytes = rest;
+    }
+    while let [rest @ .., last] = bytes {
+        if !last.is_ascii_whitespace() {
+            break;
+        }
+        bytes = rest;
+    }
+    bytes
+}
+
+/// Split a `key: value` line, only the value is decoded (keys are compared as bytes)
+#[inline(always)]
+fn key_value(line: &[u8]) -> Option<(&[u8], &[u8])> {
+    let colon = line.iter().position(|&b| b == b':')?;
+    Some((trim(&line[..colon]), trim(&line[colon + 1..])))
+}
+
+#[inline(always)]
+fn value<T: str::FromStr>(value: &[u8], key: &str) -> Result<T, PyErr> {
+    str::from_utf8(value)
+        .ok()
+        .and_then(|value| value.parse().ok())
+        .ok_or_else(|| parse_err(&format!("invalid value of {}", key)))
+}
+
+/// Type of a hit object line (`x,y,time,type,...`), without decoding the other fields
+#[inline(always)]
+fn hit_object_type(line: &[u8]) -> Option<u32> {
+    let field = line.split(|&b| b == b',').nth(3)?;
+    str::from_utf8(trim(field)).ok()?.parse().ok()
+}
+
+/// Scan the content of a .osu file: the header, the `[General]` and `[Difficulty]` sections
+/// and a lightweight count of the hit object types (no curve, timing point... parsing).
+///
+/// Works on the raw lines, only the values of the scanned keys are decoded
+pub fn scan(bytes: &[u8]) -> Result<RawMetadata, PyErr> {
+    let bytes = bytes.strip_prefix(UTF8_BOM).unwrap_or(bytes);
+    let mut lines = bytes.split(|&b| b == b'\n').map(trim);
+
+    let version = lines
+        .find(|line| !line.is_empty())
+        .and_then(|line| line.strip_prefix(FILE_HEADER.as_bytes()))
+        .ok_or_else(|| parse_err("incorrect file header"))?;
+    let mut metadata = RawMetadata {
+        version: value(version, "file format version")?,
+        ..Default::default()
+    };
+
+    let mut ar = None;
+    let mut section = Section::Other;
+    for line in lines {
+        if line.is_empty() || line.starts_with(b"//") {
+            continue;
+        }
+        if line.starts_with(b"[") && line.ends_with(b"]") {
+            section = match &line[1..line.len() - 1] {
+                b"General" => Section::General,
+                b"Difficulty" => Section::Difficulty,
+                b"HitObjects" => Section::HitObjects,
+                _ => Section::Other,
+            };
+            continue;
+        }
+        match section {
+            Section::General => match key_value(line) {
+                Some((b"Mode", v)) => metadata.mode = int_into_osu_mode(value(v, "Mode")?)?,
+                Some((b"StackLeniency", v)) => metadata.stack_leniency = value(v, "StackLeniency")?,
+                _ => {}
+            },
+            Section::Difficulty => match key_value(line) {
+                Some((b"HPDrainRate", v)) => metadata.hp = value(v, "HPDrainRate")?,
+                Some((b"CircleSize", v)) => metadata.cs = value(v, "CircleSize")?,
+                Some((b"OverallDifficulty", v)) => metadata.od = value(v, "OverallDifficulty")?,
+                Some((b"ApproachRate", v)) => ar = Some(value(v, "ApproachRate")?),
+                Some((b"SliderMultiplier", v)) => {
+                    metadata.slider_mult = value(v, "SliderMultiplier")?
+                }
+                Some((b"SliderTickRate", v)) => metadata.tick_rate = value(v, "SliderTickRate")?,
+                _ => {}
+            },
+            Section::HitObjects => match hit_object_type(line) {
+                Some(kind) if kind & CIRCLE_FLAG > 0 => metadata.n_circles += 1,
+                Some(kind) if kind & SLIDER_FLAG > 0 => metadata.n_sliders += 1,
+                Some(kind) if kind & SPINNER_FLAG > 0 => metadata.n_spinners += 1,
+                // Counted like the full parser (with the sliders)
+                Some(kind) if kind & HOLD_FLAG > 0 => metadata.n_sliders += 1,
+                _ => {}
+            },
+            Section::Other => {}
+        }
+    }
+    // Old beatmaps without AR use the OD
+    metadata.ar = ar.unwrap_or(metadata.od);
+    Ok(metadata)
+}
+
+/// Read and scan a .osu file
+#[inline(always)]
+pub fn scan_file(path: &Path) -> Result<RawMetadata, PyErr> {
+    let bytes = fs::read(path)
+        .map_err(|err| ReadFileError::new_err(format!("Could not read file: {}", err)))?;
+    scan(&bytes)
+}
@@ -1,2 +1,9 @@
+pub mod cache;
+pub mod columns;
 pub mod common;
+pub mod disk_cache;
+pub mod hash;
+pub mod metadata;
+pub mod parallel;
 pub mod pp;
+pub mod serialize;
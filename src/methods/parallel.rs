@@ -0,0 +1,54 @@
+use std::{
+    sync::atomic::{AtomicUsize, Ordering},
+    thread,
+};
+
+/// Amount of native worker threads: `workers` or the available parallelism, at most `len`
+#[inline(always)]
+pub fn workers(workers: Option<usize>, len: usize) -> usize {
+    workers
+        .unwrap_or_else(|| thread::available_parallelism().map_or(1, |n| n.get()))
+        .min(len)
+        .max(1)
+}
+
+/// Map the items on scoped native threads, the results keep the order of the items
+pub fn parallel_map<T, R, F>(items: &[T], workers: Option<usize>, f: F) -> Vec<R>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&T) -> R + Sync,
+{
+    let workers = self::workers(workers, items.len());
+    if workers == 1 {
+        return items.iter().map(f).collect();
+    }
+
+    let next = AtomicUsize::new(0);
+    let chunks: Vec<Vec<(usize, R)>> = thread::scope(|s| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                s.spawn(|| {
+                    let mut results = Vec::new();
+                    loop {
+                        let i = next.fetch_add(1, Ordering::Relaxed);
+                        match items.get(i) {
+                            Some(item) => results.push((i, f(item))),
+                            None => break results,
+                        }
+                    }
+                })
+            })
+            .collect();
+        handles
+            .into_iter()
+            .map(|handle| handle.join().unwrap())
+            .collect()
+    });
+
+    let mut results: Vec<Option<R>> = (0..items.len()).map(|_| None).collect();
+    for (i, result) in chunks.into_iter().flatten() {
+        results[i] = Some(result);
+    }
+    results.into_iter().flatten().collect()
+}
@@ -1,7 +1,33 @@
 use rosu_pp::{
-    AnyPP, Beatmap as RawBeatmap, CatchPP, ManiaPP, OsuPP, PerformanceAttributes, TaikoPP,
+    catch::CatchStars, mania::ManiaStars, osu::OsuStars, taiko::TaikoStars, AnyPP, AnyStars,
+    Beatmap as RawBeatmap, CatchPP, DifficultyAttributes, ManiaPP, OsuPP, PerformanceAttributes,
+    TaikoPP,
 };
 
+const NO_FAIL: u32 = 1 << 0;
+const HIDDEN: u32 = 1 << 3;
+const SUDDEN_DEATH: u32 = 1 << 5;
+const NIGHTCORE: u32 = 1 << 9;
+const FLASHLIGHT: u32 = 1 << 10;
+const SPUN_OUT: u32 = 1 << 12;
+const PERFECT: u32 = 1 << 14;
+
+/// Mods which never change the difficulty attributes
+const NON_DIFFICULTY_MODS: u32 = NO_FAIL | SUDDEN_DEATH | SPUN_OUT | PERFECT;
+
+/// The part of the mods which affects the difficulty attributes,
+/// mods with the same difficulty mods share the same difficulty attributes.
+#[inline(always)]
+pub fn difficulty_mods(mods: u32) -> u32 {
+    // The clock rate only comes from the DT bit (NC is always sent with DT)
+    let mut mods = mods & !NON_DIFFICULTY_MODS & !NIGHTCORE;
+    // Hidden only affects the flashlight skill
+    if mods & FLASHLIGHT == 0 {
+        mods &= !HIDDEN;
+    }
+    mods
+}
+
 #[derive(Clone, Debug)]
 pub struct PpRaw {
     pub aim: Option<f64>,
@@ -41,6 +67,41 @@ pub struct PpResult {
 }
 
 impl PpResult {
+    /// Build the result with the performance attributes returned by rosu-pp
+    #[inline]
+    pub fn new(attributes: PerformanceAttributes, mods: u32) -> Self {
+        let (mode, raw) = match &attributes {
+            PerformanceAttributes::Osu(attr) => (
+                0,
+                PpRaw::new(
+                    Some(attr.pp_aim),
+                    Some(attr.pp_speed),
+                    None,
+                    Some(attr.pp_acc),
+                    attr.pp,
+                ),
+            ),
+            PerformanceAttributes::Taiko(attr) => (
+                1,
+                PpRaw::new(None, None, Some(attr.pp_strain), Some(attr.pp_acc), attr.pp),
+            ),
+            PerformanceAttributes::Catch(attr) => {
+                (2, PpRaw::new(Some(attr.pp), None, None, None, attr.pp))
+            }
+            PerformanceAttributes::Mania(attr) => (
+                3,
+                PpRaw::new(None, None, Some(attr.pp_strain), Some(attr.pp_acc), attr.pp),
+            ),
+        };
+        Self {
+            mode,
+            mods,
+            pp: attributes.pp(),
+            raw,
+            attributes,
+        }
+    }
+
     /// The final pp value.
     #[inline]
     pub fn pp(&self) -> f64 {
@@ -52,6 +113,16 @@ impl PpResult {
     pub fn stars(&self) -> f64 {
         self.attributes.stars()
     }
+
+    /// The max combo of the map (osu!standard and osu!ctb only).
+    #[inline]
+    pub fn max_combo(&self) -> Option<usize> {
+        match &self.attributes {
+            PerformanceAttributes::Osu(attr) => Some(attr.difficulty.max_combo),
+            PerformanceAttributes::Catch(attr) => Some(attr.max_combo()),
+            _ => None,
+        }
+    }
 }
 
 #[inline(always)]
@@ -67,3 +138,50 @@ pub fn mode_any_pp(mode: Option<u8>, beatmap: &RawBeatmap) -> AnyPP {
         None => AnyPP::new(beatmap),
     }
 }
+
+#[inline(always)]
+pub fn mode_any_stars(mode: Option<u8>, beatmap: &RawBeatmap) -> AnyStars {
+    match mode {
+        Some(m) => match m {
+            0 => AnyStars::Osu(OsuStars::new(beatmap)),
+            1 => AnyStars::Taiko(TaikoStars::new(beatmap)),
+            2 => AnyStars::Catch(CatchStars::new(beatmap)),
+            3 => AnyStars::Mania(ManiaStars::new(beatmap)),
+            _ => AnyStars::new(beatmap),
+        },
+        None => AnyStars::new(beatmap),
+    }
+}
+
+/// Max combo of the (processed) objects, slider ticks and ends included (`None`: mania)
+#[inline(always)]
+pub fn difficulty_max_combo(attributes: &DifficultyAttributes) -> Option<usize> {
+    match attributes {
+        DifficultyAttributes::Osu(attr) => Some(attr.max_combo),
+        DifficultyAttributes::Taiko(attr) => Some(attr.max_combo),
+        DifficultyAttributes::Catch(attr) => Some(attr.max_combo()),
+        DifficultyAttributes::Mania(_) => None,
+    }
+}
+
+/// Amount of (processed) objects counted by the difficulty attributes,
+/// catch counts its fruits and droplets (`None`: taiko, mania)
+#[inline(always)]
+pub fn difficulty_passed_objects(attributes: &DifficultyAttributes) -> Option<usize> {
+    match attributes {
+        DifficultyAttributes::Osu(attr) => Some(attr.n_circles + attr.n_sliders + attr.n_spinners),
+        DifficultyAttributes::Catch(attr) => Some(attr.n_fruits + attr.n_droplets),
+        DifficultyAttributes::Taiko(_) | DifficultyAttributes::Mania(_) => None,
+    }
+}
+
+/// Take the difficulty attributes out of the performance attributes
+#[inline(always)]
+pub fn difficulty_attributes(attributes: &PerformanceAttributes) -> DifficultyAttributes {
+    match attributes {
+        PerformanceAttributes::Osu(attr) => DifficultyAttributes::Osu(attr.difficulty.clone()),
+        PerformanceAttributes::Taiko(attr) => DifficultyAttributes::Taiko(attr.difficulty.clone()),
+        PerformanceAttributes::Catch(attr) => DifficultyAttributes::Catch(attr.difficulty.clone()),
+        PerformanceAttributes::Mania(attr) => DifficultyAttributes::Mania(attr.difficulty.clone()),
+    }
+}
@@ -0,0 +1,355 @@
+use std::convert::TryInto;
+
+use pyo3::PyErr;
+use rosu_pp::{
+    beatmap::{DifficultyPoint as RawDifficultyPoint, TimingPoint as RawTimingPoint},
+    parse::{
+        HitObject as RawHitObject, HitObjectKind as RawHitObjectKind, PathControlPoint, PathType,
+        Pos2 as RawPos2,
+    },
+    Beatmap as RawBeatmap,
+};
+
+use super::{common::int_into_osu_mode, hash::ContentHash};
+use crate::python::exceptions::ParseBeatmapError;
+
+/// Magic header of the serialized beatmaps
+pub const SERIALIZE_MAGIC: &[u8; 4] = b"PPYB";
+/// Bumped on every change of the layout, older snapshots are rejected
+pub const SERIALIZE_VERSION: u16 = 2;
+
+const KIND_CIRCLE: u8 = 0;
+const KIND_SLIDER: u8 = 1;
+const KIND_SPINNER: u8 = 2;
+const KIND_HOLD: u8 = 3;
+
+const PATH_NONE: u8 = u8::MAX;
+
+#[inline(always)]
+fn path_type_u8(path_type: &Option<PathType>) -> u8 {
+    match path_type {
+        Some(PathType::Catmull) => 0,
+        Some(PathType::Bezier) => 1,
+        Some(PathType::Linear) => 2,
+        Some(PathType::PerfectCurve) => 3,
+        None => PATH_NONE,
+    }
+}
+
+#[inline(always)]
+fn u8_path_type(value: u8) -> Result<Option<PathType>, PyErr> {
+    Ok(match value {
+        0 => Some(PathType::Catmull),
+        1 => Some(PathType::Bezier),
+        2 => Some(PathType::Linear),
+        3 => Some(PathType::PerfectCurve),
+        PATH_NONE => None,
+        _ => return Err(invalid_err("path type")),
+    })
+}
+
+#[inline(always)]
+fn invalid_err(what: &str) -> PyErr {
+    ParseBeatmapError::new_err(format!("Invalid serialized beatmap: {}", what))
+}
+
+/// Little-endian writer
+struct Writer(Vec<u8>);
+
+impl Writer {
+    #[inline(always)]
+    fn u8(&mut self, v: u8) {
+        self.0.push(v)
+    }
+
+    #[inline(always)]
+    fn u16(&mut self, v: u16) {
+        self.0.extend_from_slice(&v.to_le_bytes())
+    }
+
+    #[inline(always)]
+    fn u32(&mut self, v: u32) {
+        self.0.extend_from_slice(&v.to_le_bytes())
+    }
+
+    #[inline(always)]
+    fn f32(&mut self, v: f32) {
+        self.0.extend_from_slice(&v.to_le_bytes())
+    }
+
+    #[inline(always)]
+    fn f64(&mut self, v: f64) {
+        self.0.extend_from_slice(&v.to_le_bytes())
+    }
+
+    #[inline(always)]
+    fn u64(&mut self, v: u64) {
+        self.0.extend_from_slice(&v.to_le_bytes())
+    }
+
+    #[inline(always)]
+    fn len(&mut self, len: usize) {
+        self.u32(len as u32)
+    }
+
+    #[inline(always)]
+    fn bytes(&mut self, v: &[u8]) {
+        self.len(v.len());
+        self.0.extend_from_slice(v)
+    }
+}
+
+/// Little-endian reader
+struct Reader<'a>(&'a [u8]);
+
+impl<'a> Reader<'a> {
+    #[inline(always)]
+    fn take(&mut self, n: usize) -> Result<&'a [u8], PyErr> {
+        if self.0.len() < n {
+            return Err(invalid_err("unexpected end of data"));
+        }
+        let (head, tail) = self.0.split_at(n);
+        self.0 = tail;
+        Ok(head)
+    }
+
+    #[inline(always)]
+    fn u8(&mut self) -> Result<u8, PyErr> {
+        Ok(self.take(1)?[0])
+    }
+
+    #[inline(always)]
+    fn u16(&mut self) -> Result<u16, PyErr> {
+        Ok(u16::from_le_bytes(self.take(2)?.try_into().unwrap()))
+    }
+
+    #[inline(always)]
+    fn u32(&mut self) -> Result<u32, PyErr> {
+        Ok(u32::from_le_bytes(self.take(4)?.try_into().unwrap()))
+    }
+
+    #[inline(always)]
+    fn f32(&mut self) -> Result<f32, PyErr> {
+        Ok(f32::from_le_bytes(self.take(4)?.try_into().unwrap()))
+    }
+
+    #[inline(always)]
+    fn f64(&mut self) -> Result<f64, PyErr> {
+        Ok(f64::from_le_bytes(self.take(8)?.try_into().unwrap()))
+    }
+
+    #[inline(always)]
+    fn u64(&mut self) -> Result<u64, PyErr> {
+        Ok(u64::from_le_bytes(self.take(8)?.try_into().unwrap()))
+    }
+
+    /// Length prefix, checked against the remaining data so a corrupted one can't over-allocate
+    #[inline(always)]
+    fn len(&mut self, min_item_size: usize) -> Result<usize, PyErr> {
+        let len = self.u32()? as usize;
+        if len.saturating_mul(min_item_size) > self.0.len() {
+            return Err(invalid_err("unexpected end of data"));
+        }
+        Ok(len)
+    }
+
+    #[inline(always)]
+    fn bytes(&mut self) -> Result<Vec<u8>, PyErr> {
+        let len = self.len(1)?;
+        Ok(self.take(len)?.to_vec())
+    }
+}
+
+/// Serialize a parsed beatmap (and the hashes of its content) into the compact (versioned) binary format
+pub fn serialize(beatmap: &RawBeatmap, hash: Option<&ContentHash>) -> Vec<u8> {
+    let mut w = Writer(Vec::with_capacity(64 + beatmap.hit_objects.len() * 24));
+    w.0.extend_from_slice(SERIALIZE_MAGIC);
+    w.u16(SERIALIZE_VERSION);
+
+    match hash {
+        Some(hash) => {
+            w.u8(1);
+            w.0.extend_from_slice(&hash.md5);
+            w.u64(hash.fast);
+        }
+        None => w.u8(0),
+    }
+
+    w.u8(beatmap.mode as u8);
+    w.u8(beatmap.version);
+    w.u32(beatmap.n_circles);
+    w.u32(beatmap.n_sliders);
+    w.u32(beatmap.n_spinners);
+    w.f32(beatmap.ar);
+    w.f32(beatmap.od);
+    w.f32(beatmap.cs);
+    w.f32(beatmap.hp);
+    w.f64(beatmap.slider_mult);
+    w.f64(beatmap.tick_rate);
+    w.f32(beatmap.stack_leniency);
+
+    w.len(beatmap.hit_objects.len());
+    for obj in beatmap.hit_objects.iter() {
+        w.f32(obj.pos.x);
+        w.f32(obj.pos.y);
+        w.f64(obj.start_time);
+        match &obj.kind {
+            RawHitObjectKind::Circle => w.u8(KIND_CIRCLE),
+            RawHitObjectKind::Slider {
+                pixel_len,
+                repeats,
+                control_points,
+                edge_sounds,
+            } => {
+                w.u8(KIND_SLIDER);
+                w.f64(*pixel_len);
+                w.u32(*repeats as u32);
+                w.len(control_points.len());
+                for point in control_points.iter() {
+                    w.f32(point.pos.x);
+                    w.f32(point.pos.y);
+                    w.u8(path_type_u8(&point.kind));
+                }
+                w.bytes(edge_sounds);
+            }
+            RawHitObjectKind::Spinner { end_time } => {
+                w.u8(KIND_SPINNER);
+                w.f64(*end_time);
+            }
+            RawHitObjectKind::Hold { end_time } => {
+                w.u8(KIND_HOLD);
+                w.f64(*end_time);
+            }
+        }
+    }
+    w.bytes(&beatmap.sounds);
+
+    w.len(beatmap.timing_points.len());
+    for point in beatmap.timing_points.iter() {
+        w.f64(point.time);
+        w.f64(point.beat_len);
+    }
+    w.len(beatmap.difficulty_points.len());
+    for point in beatmap.difficulty_points.iter() {
+        w.f64(point.time);
+        w.f64(point.speed_multiplier);
+    }
+    w.0
+}
+
+/// Deserialize a beatmap (and the hashes of its content) serialized with [`serialize`]
+pub fn deserialize(bytes: &[u8]) -> Result<(RawBeatmap, Option<ContentHash>), PyErr> {
+    let mut r = Reader(bytes);
+    if r.take(SERIALIZE_MAGIC.len())? != SERIALIZE_MAGIC {
+        return Err(invalid_err("bad magic header"));
+    }
+    let version = r.u16()?;
+    if version != SERIALIZE_VERSION {
+        return Err(invalid_err(&format!(
+            "unsupported version {} (expected {})",
+            version, SERIALIZE_VERSION
+        )));
+    }
+
+    let hash = match r.u8()? {
+        0 => None,
+        1 => Some(ContentHash {
+            md5: r.take(16)?.try_into().unwrap(),
+            fast: r.u64()?,
+        }),
+        _ => return Err(invalid_err("hash flag")),
+    };
+
+    let mode = int_into_osu_mode(r.u8()?)?;
+    let version = r.u8()?;
+    let n_circles = r.u32()?;
+    let n_sliders = r.u32()?;
+    let n_spinners = r.u32()?;
+    let ar = r.f32()?;
+    let od = r.f32()?;
+    let cs = r.f32()?;
+    let hp = r.f32()?;
+    let slider_mult = r.f64()?;
+    let tick_rate = r.f64()?;
+    let stack_leniency = r.f32()?;
+
+    let len = r.len(17)?;
+    let mut hit_objects = Vec::with_capacity(len);
+    for _ in 0..len {
+        let pos = RawPos2 {
+            x: r.f32()?,
+            y: r.f32()?,
+        };
+        let start_time = r.f64()?;
+        let kind = match r.u8()? {
+            KIND_CIRCLE => RawHitObjectKind::Circle,
+            KIND_SLIDER => {
+                let pixel_len = r.f64()?;
+                let repeats = r.u32()? as usize;
+                let len = r.len(9)?;
+                let mut control_points = Vec::with_capacity(len);
+                for _ in 0..len {
+                    let pos = RawPos2 {
+                        x: r.f32()?,
+                        y: r.f32()?,
+                    };
+                    let kind = u8_path_type(r.u8()?)?;
+                    control_points.push(PathControlPoint { pos, kind });
+                }
+                RawHitObjectKind::Slider {
+                    pixel_len,
+                    repeats,
+                    control_points,
+                    edge_sounds: r.bytes()?,
+                }
+            }
+            KIND_SPINNER => RawHitObjectKind::Spinner { end_time: r.f64()? },
+            KIND_HOLD => RawHitObjectKind::Hold { end_time: r.f64()? },
+            _ => return Err(invalid_err("hit object kind")),
+        };
+        hit_objects.push(RawHitObject {
+            pos,
+            start_time,
+            kind,
+        });
+    }
+    let sounds = r.bytes()?;
+
+    let len = r.len(16)?;
+    let mut timing_points = Vec::with_capacity(len);
+    for _ in 0..len {
+        timing_points.push(RawTimingPoint {
+            time: r.f64()?,
+            beat_len: r.f64()?,
+        });
+    }
+    let len = r.len(16)?;
+    let mut difficulty_points = Vec::with_capacity(len);
+    for _ in 0..len {
+        difficulty_points.push(RawDifficultyPoint {
+            time: r.f64()?,
+            speed_multiplier: r.f64()?,
+        });
+    }
+
+    // No `..Default::default()`: a new rosu-pp field must not be silently defaulted
+    let beatmap = RawBeatmap {
+        mode,
+        version,
+        n_circles,
+        n_sliders,
+        n_spinners,
+        ar,
+        od,
+        cs,
+        hp,
+        slider_mult,
+        tick_rate,
+        hit_objects,
+        sounds,
+        timing_points,
+        difficulty_points,
+        stack_leniency,
+    };
+    Ok((beatmap, hash))
+}
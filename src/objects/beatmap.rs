@@ -1,9 +1,12 @@
-use std::ops::{Add, AddAssign, Div, Mul, Sub};
+use std::{
+    ops::{Add, AddAssign, Div, Mul, Sub},
+    sync::Arc,
+};
 
 use pyo3::{
     prelude::{pyclass, pymethods},
-    types::PyDict,
-    PyResult, Python,
+    types::{PyBytes, PyDict, PyTuple},
+    IntoPy, PyAny, PyObject, PyResult, Python,
 };
 use rosu_pp::{
     beatmap::{DifficultyPoint as RawDifficultyPoint, TimingPoint as RawTimingPoint},
@@ -11,11 +14,39 @@ use rosu_pp::{
     Beatmap as RawBeatmap,
 };
 
-use crate::methods::common::osu_mode_str;
+use crate::{
+    methods::{
+        cache::DifficultyCache,
+        columns::{DifficultyPointColumns, HitObjectColumns, StrainColumns, TimingPointColumns},
+        common::{osu_mode_str, py_any_into_osu_mode, BytesBuffer},
+        hash::ContentHash,
+        pp, serialize,
+    },
+    objects::{CalcResult, Calculator, DifficultyPointView, HitObjectView, TimingPointView},
+};
 
-#[pyclass]
+#[pyclass(module = "peace_performance_python._peace_performance.beatmap")]
 #[derive(Clone, Default, Debug)]
-pub struct Beatmap(pub RawBeatmap);
+pub struct Beatmap(
+    pub Arc<RawBeatmap>,
+    pub Arc<DifficultyCache>,
+    pub Option<ContentHash>,
+);
+
+impl From<RawBeatmap> for Beatmap {
+    #[inline(always)]
+    fn from(beatmap: RawBeatmap) -> Self {
+        Self(Arc::new(beatmap), Default::default(), None)
+    }
+}
+
+impl From<(RawBeatmap, Option<ContentHash>)> for Beatmap {
+    #[inline(always)]
+    fn from((beatmap, hash): (RawBeatmap, Option<ContentHash>)) -> Self {
+        Self(Arc::new(beatmap), Default::default(), hash)
+    }
+}
+
 crate::py_impl!(
     for Beatmap, @attrs {
         version: u8,
@@ -28,6 +59,44 @@ crate::py_impl!(
         hp: f32,
         tick_rate: f64
     }; @getters {}; @methods {
+        /// Empty beatmap, only used by pickle (then `__setstate__`)
+        #[new]
+        pub fn new() -> Self {
+            Self::default()
+        }
+
+        /// Serialize into the compact (versioned) binary format,
+        /// much faster to load than parsing the .osu files again
+        pub fn to_bytes<'a>(&self, py: Python<'a>) -> &'a PyBytes {
+            let bytes = py.allow_threads(|| serialize::serialize(&self.0, self.2.as_ref()));
+            PyBytes::new(py, &bytes)
+        }
+
+        /// Load a beatmap serialized with `to_bytes` (any buffer protocol object, not copied)
+        #[staticmethod]
+        pub fn from_bytes_serialized(py: Python, buf: &PyAny) -> PyResult<Self> {
+            let buf = BytesBuffer::get(buf)?;
+            Ok(py.allow_threads(|| serialize::deserialize(buf.as_slice()))?.into())
+        }
+
+        pub fn __getstate__<'a>(&self, py: Python<'a>) -> &'a PyBytes {
+            self.to_bytes(py)
+        }
+
+        pub fn __setstate__(&mut self, py: Python, state: &PyAny) -> PyResult<()> {
+            *self = Self::from_bytes_serialized(py, state)?;
+            Ok(())
+        }
+
+        /// Pickle support: `(Beatmap, (), serialized bytes)`
+        pub fn __reduce__(&self, py: Python) -> (PyObject, PyObject, PyObject) {
+            (
+                py.get_type::<Self>().into_py(py),
+                PyTuple::empty(py).into_py(py),
+                self.to_bytes(py).into_py(py),
+            )
+        }
+
         #[getter]
         pub fn mode(&self) -> u8 {
             self.0.mode as u8
@@ -44,22 +113,89 @@ crate::py_impl!(
         }
 
         #[getter]
-        pub fn hit_objects(&self) -> Option<Vec<HitObject>> {
-            Some(self.0
-                .hit_objects
-                .iter()
-                .map(|obj| HitObject(obj.clone()))
-                .collect())
+        pub fn difficulty_cache_hits(&self) -> usize {
+            self.1.hits()
+        }
+
+        #[getter]
+        pub fn difficulty_cache_misses(&self) -> usize {
+            self.1.misses()
+        }
+
+        #[getter]
+        pub fn difficulty_cache_size(&self) -> usize {
+            self.1.len()
+        }
+
+        /// Max amount of memoized difficulty attributes (and strains)
+        #[getter]
+        pub fn difficulty_cache_limit(&self) -> usize {
+            self.1.limit()
+        }
+
+        /// Set the max amount of memoized difficulty attributes (and strains), `0` disables the cache.
+        /// The least recently used entries are evicted first
+        pub fn set_difficulty_cache_limit(&self, limit: usize) {
+            self.1.set_limit(limit)
+        }
+
+        pub fn clear_difficulty_cache(&self) {
+            self.1.clear()
+        }
+
+        /// md5 (lowercase hex) of the .osu file content,
+        /// only if it was computed during the parse (`hash=True`)
+        #[getter]
+        pub fn md5(&self) -> Option<String> {
+            self.2.as_ref().map(ContentHash::md5_hex)
+        }
+
+        /// Fast (xxh3, 64 bits) hash of the .osu file content,
+        /// only if it was computed during the parse (`hash=True`)
+        #[getter]
+        pub fn fast_hash(&self) -> Option<u64> {
+            self.2.map(|hash| hash.fast)
+        }
+
+        #[getter]
+        pub fn hit_objects(&self, py: Python) -> Option<Vec<HitObject>> {
+            Some(py.allow_threads(|| {
+                self.0
+                    .hit_objects
+                    .iter()
+                    .map(|obj| HitObject(obj.clone()))
+                    .collect()
+            }))
+        }
+
+        /// Sequence view over the hit objects, the objects are only created on access
+        #[getter]
+        pub fn hit_objects_view(&self) -> HitObjectView {
+            HitObjectView::new(self.0.clone())
+        }
+
+        /// Sequence view over the timing points, with `at_time` lookups
+        #[getter]
+        pub fn timing_points_view(&self) -> TimingPointView {
+            TimingPointView::new(self.0.clone())
+        }
+
+        /// Sequence view over the difficulty points, with `at_time` lookups
+        #[getter]
+        pub fn difficulty_points_view(&self) -> DifficultyPointView {
+            DifficultyPointView::new(self.0.clone())
         }
 
         #[cfg(any(feature = "osu", feature = "fruits"))]
         #[getter]
-        pub fn timing_points(&self) -> Option<Vec<TimingPoint>> {
-            Some(self.0
-                .timing_points
-                .iter()
-                .map(|obj| TimingPoint(obj.clone()))
-                .collect())
+        pub fn timing_points(&self, py: Python) -> Option<Vec<TimingPoint>> {
+            Some(py.allow_threads(|| {
+                self.0
+                    .timing_points
+                    .iter()
+                    .map(|obj| TimingPoint(obj.clone()))
+                    .collect()
+            }))
         }
 
         #[cfg(not(any(feature = "osu", feature = "fruits")))]
@@ -70,12 +206,14 @@ crate::py_impl!(
 
         #[cfg(any(feature = "osu", feature = "fruits"))]
         #[getter]
-        pub fn difficulty_points(&self) -> Option<Vec<DifficultyPoint>> {
-            Some(self.0
-                .difficulty_points
-                .iter()
-                .map(|obj| DifficultyPoint(obj.clone()))
-                .collect())
+        pub fn difficulty_points(&self, py: Python) -> Option<Vec<DifficultyPoint>> {
+            Some(py.allow_threads(|| {
+                self.0
+                    .difficulty_points
+                    .iter()
+                    .map(|obj| DifficultyPoint(obj.clone()))
+                    .collect()
+            }))
         }
 
         #[cfg(not(any(feature = "osu", feature = "fruits")))]
@@ -84,6 +222,115 @@ crate::py_impl!(
             None
         }
 
+        /// Hit objects as struct-of-arrays (numpy arrays):
+        /// start_time, end_time, x, y, kind, repeats, pixel_len
+        #[cfg(feature = "numpy")]
+        pub fn hit_objects_array<'a>(&self, py: Python<'a>) -> PyResult<&'a PyDict> {
+            let columns = py.allow_threads(|| HitObjectColumns::new(&self.0.hit_objects));
+            Ok(crate::pyo3_numpy_dict!(py, columns; {
+                start_time, end_time, x, y, kind, repeats, pixel_len
+            }))
+        }
+
+        /// Timing points as struct-of-arrays (numpy arrays): time, beat_len
+        #[cfg(feature = "numpy")]
+        pub fn timing_points_array<'a>(&self, py: Python<'a>) -> PyResult<&'a PyDict> {
+            let columns = py.allow_threads(|| TimingPointColumns::new(&self.0.timing_points));
+            Ok(crate::pyo3_numpy_dict!(py, columns; {time, beat_len}))
+        }
+
+        /// Difficulty points as struct-of-arrays (numpy arrays): time, speed_multiplier
+        #[cfg(feature = "numpy")]
+        pub fn difficulty_points_array<'a>(&self, py: Python<'a>) -> PyResult<&'a PyDict> {
+            let columns = py.allow_threads(|| DifficultyPointColumns::new(&self.0.difficulty_points));
+            Ok(crate::pyo3_numpy_dict!(py, columns; {time, speed_multiplier}))
+        }
+
+        /// Section strain peaks of each skill (numpy arrays), computed in one pass
+        /// and memoized per (mode, mods) on this beatmap.
+        ///
+        /// `section_len` is the length (ms) of each section,
+        /// skills: aim, aim_no_sliders, speed, flashlight (std), color, rhythm, stamina (taiko),
+        /// movement (ctb), strains (mania)
+        #[cfg(feature = "numpy")]
+        #[args(mode = "None", mods = "0")]
+        pub fn strains<'a>(
+            &self,
+            py: Python<'a>,
+            mode: Option<&PyAny>,
+            mods: u32,
+        ) -> PyResult<&'a PyDict> {
+            let mode = match mode {
+                Some(mode) => Some(py_any_into_osu_mode(mode)? as u8),
+                None => None,
+            };
+            let strains = py.allow_threads(|| {
+                self.1.strains_or_insert_with((mode, mods), || {
+                    StrainColumns::from(pp::mode_any_stars(mode, &self.0).mods(mods).strains())
+                })
+            });
+            let d = PyDict::new(py);
+            d.set_item("mode", strains.mode)?;
+            d.set_item("section_len", strains.section_len)?;
+            for (skill, values) in strains.skills.iter() {
+                d.set_item(*skill, numpy::PyArray1::from_slice(py, values))?;
+            }
+            Ok(d)
+        }
+
+        #[cfg(not(feature = "numpy"))]
+        #[args(mode = "None", mods = "0")]
+        pub fn strains<'a>(
+            &self,
+            _py: Python<'a>,
+            _mode: Option<&PyAny>,
+            _mods: u32,
+        ) -> PyResult<&'a PyDict> {
+            Err(crate::numpy_not_enabled_err!())
+        }
+
+        /// SS results (stars, max combo, pp) of each mods in one native call,
+        /// the mods which share the same difficulty reuse the difficulty attributes
+        /// and the distinct ones are calculated on `workers` native threads.
+        #[args(mode = "None", workers = "None")]
+        pub fn difficulty_table(
+            &self,
+            py: Python,
+            mods_list: Vec<u32>,
+            mode: Option<&PyAny>,
+            workers: Option<usize>,
+        ) -> PyResult<Vec<CalcResult>> {
+            let mode = match mode {
+                Some(mode) => Some(py_any_into_osu_mode(mode)? as u8),
+                None => None,
+            };
+            Ok(py
+                .allow_threads(|| Calculator::difficulty_table(self, mode, &mods_list, workers))
+                .into_iter()
+                .map(CalcResult)
+                .collect())
+        }
+
+        #[getter]
+        pub fn strains_cache_size(&self) -> usize {
+            self.1.strains_len()
+        }
+
+        #[cfg(not(feature = "numpy"))]
+        pub fn hit_objects_array<'a>(&self, _py: Python<'a>) -> PyResult<&'a PyDict> {
+            Err(crate::numpy_not_enabled_err!())
+        }
+
+        #[cfg(not(feature = "numpy"))]
+        pub fn timing_points_array<'a>(&self, _py: Python<'a>) -> PyResult<&'a PyDict> {
+            Err(crate::numpy_not_enabled_err!())
+        }
+
+        #[cfg(not(feature = "numpy"))]
+        pub fn difficulty_points_array<'a>(&self, _py: Python<'a>) -> PyResult<&'a PyDict> {
+            Err(crate::numpy_not_enabled_err!())
+        }
+
         #[cfg(all(feature = "osu", feature = "all_included"))]
         #[getter]
         pub fn stack_leniency(&self) -> Option<f32> {
@@ -1,13 +1,23 @@
+use std::{collections::HashMap, sync::Arc};
+
 use pyo3::{
+    exceptions::PyValueError,
     prelude::{pyclass, pymethods},
     types::PyDict,
-    PyAny, PyCell, PyResult, Python,
+    PyAny, PyCell, PyRef, PyResult, Python,
+};
+
+use rosu_pp::{
+    Beatmap as RawBeatmap, DifficultyAttributes, GradualDifficultyAttributes,
+    PerformanceAttributes, ScoreState,
 };
-use rosu_pp::PerformanceAttributes;
 
 use super::CalcResult;
 use crate::{
-    methods::pp::{self, PpRaw, PpResult},
+    methods::{
+        common, parallel,
+        pp::{self, PpResult},
+    },
     objects::Beatmap,
     set_calculator,
 };
@@ -109,8 +119,87 @@ create_py_methods!(
         }
 
         #[inline(always)]
-        pub fn calculate_raw(&self, beatmap: &Beatmap) -> CalcResult {
-            CalcResult(self.calc(beatmap))
+        pub fn calculate_raw(&self, py: Python, beatmap: &Beatmap) -> CalcResult {
+            CalcResult(py.allow_threads(|| self.calc(beatmap)))
+        }
+
+        /// Fast path: only the pp, without building any result object
+        #[inline(always)]
+        pub fn calculate_pp_only_raw(&self, py: Python, beatmap: &Beatmap) -> f64 {
+            py.allow_threads(|| self.calc(beatmap).pp)
+        }
+
+        /// Fast path: (pp, stars, max_combo), without building any result object
+        #[inline(always)]
+        pub fn calculate_tuple_raw(
+            &self,
+            py: Python,
+            beatmap: &Beatmap,
+        ) -> (f64, f64, Option<usize>) {
+            py.allow_threads(|| {
+                let result = self.calc(beatmap);
+                (result.pp, result.stars(), result.max_combo())
+            })
+        }
+
+        /// Calculate many score configs against one beatmap in a single native call.
+        /// The attrs of this calculator are used as the defaults of each config.
+        pub fn calculate_many_raw(
+            &self,
+            py: Python,
+            beatmap: &Beatmap,
+            configs: &PyAny,
+        ) -> PyResult<Vec<CalcResult>> {
+            let calculators = self.batch_from_py(configs)?;
+            Ok(py
+                .allow_threads(|| Self::calc_batch(beatmap, &calculators))
+                .into_iter()
+                .map(CalcResult)
+                .collect())
+        }
+
+        /// Calculate on the blocking thread pool of the async runtime,
+        /// returns a python awaitable of the CalcResult (the event loop is never blocked)
+        #[cfg(any(feature = "async_tokio", feature = "async_std"))]
+        pub fn calculate_async_raw<'a>(&self, py: Python<'a>, beatmap: &Beatmap) -> PyResult<&'a PyAny> {
+            let (calculator, beatmap) = (self.clone(), beatmap.clone());
+            common::blocking_into_py(py, move || Ok(CalcResult(calculator.calc(&beatmap))))
+        }
+
+        #[cfg(not(any(feature = "async_tokio", feature = "async_std")))]
+        pub fn calculate_async_raw<'a>(&self, _py: Python<'a>, _beatmap: &Beatmap) -> PyResult<&'a PyAny> {
+            Err(crate::async_not_enabled_err!())
+        }
+
+        /// pp of each accuracy (and misses, aligned with `accs`) in one native call,
+        /// the difficulty attributes are calculated once.
+        #[cfg(feature = "numpy")]
+        #[args(misses = "None")]
+        pub fn pp_curve_raw<'a>(
+            &self,
+            py: Python<'a>,
+            beatmap: &Beatmap,
+            accs: Vec<f64>,
+            misses: Option<Vec<usize>>,
+        ) -> PyResult<&'a numpy::PyArray1<f64>> {
+            Self::check_curve_len(&accs, &misses)?;
+            let curve = py.allow_threads(|| self.pp_curve(beatmap, &accs, misses.as_deref()));
+            Ok(numpy::IntoPyArray::into_pyarray(curve, py))
+        }
+
+        /// pp of each accuracy (and misses, aligned with `accs`) in one native call,
+        /// the difficulty attributes are calculated once.
+        #[cfg(not(feature = "numpy"))]
+        #[args(misses = "None")]
+        pub fn pp_curve_raw(
+            &self,
+            py: Python,
+            beatmap: &Beatmap,
+            accs: Vec<f64>,
+            misses: Option<Vec<usize>>,
+        ) -> PyResult<Vec<f64>> {
+            Self::check_curve_len(&accs, &misses)?;
+            Ok(py.allow_threads(|| self.pp_curve(beatmap, &accs, misses.as_deref())))
         }
 
         #[inline(always)]
@@ -190,10 +279,158 @@ create_py_methods!(
 );
 
 impl Calculator {
+    #[inline(always)]
+    fn check_curve_len(accs: &[f64], misses: &Option<Vec<usize>>) -> PyResult<()> {
+        match misses {
+            Some(misses) if misses.len() != accs.len() => Err(PyValueError::new_err(
+                "`misses` must have the same length as `accs`",
+            )),
+            _ => Ok(()),
+        }
+    }
+
+    /// Build calculators with a sequence of score dicts (or Calculators),
+    /// or a dict of parallel arrays, based on this calculator.
+    pub fn batch_from_py(&self, configs: &PyAny) -> PyResult<Vec<Calculator>> {
+        if let Ok(arrays) = configs.downcast::<PyDict>() {
+            let columns = arrays
+                .iter()
+                .map(|(k, v)| Ok((k.extract::<String>()?, v.extract::<Vec<&PyAny>>()?)))
+                .collect::<PyResult<Vec<(String, Vec<&PyAny>)>>>()?;
+            let len = columns.first().map_or(0, |(_, values)| values.len());
+            if columns.iter().any(|(_, values)| values.len() != len) {
+                return Err(PyValueError::new_err(
+                    "All the arrays must have the same length",
+                ));
+            }
+            return (0..len)
+                .map(|i| {
+                    let mut c = self.clone();
+                    for (attr, values) in columns.iter() {
+                        c.set_with_str(attr, values[i])?;
+                    }
+                    Ok(c)
+                })
+                .collect();
+        }
+
+        configs
+            .iter()?
+            .map(|item| {
+                let item = item?;
+                if let Ok(c) = item.extract::<PyRef<Calculator>>() {
+                    return Ok(Calculator::clone(&c));
+                }
+                let mut c = self.clone();
+                c.set_with_dict(item.downcast::<PyDict>()?)?;
+                Ok(c)
+            })
+            .collect()
+    }
+
+    /// The difficulty attributes are calculated once per distinct (mode, mods, passed_obj),
+    /// then reused through the beatmap's difficulty cache.
+    #[inline(always)]
+    pub fn calc_batch(beatmap: &Beatmap, calculators: &[Calculator]) -> Vec<PpResult> {
+        calculators.iter().map(|c| c.calc(beatmap)).collect()
+    }
+
+    /// SS results (stars, max combo, pp) of each mods, calculated on `workers` native threads.
+    ///
+    /// The difficulty attributes are calculated once per distinct difficulty mods
+    /// (e.g. `HD`, `NF`, `SO` share the ones of `NM`, `NC` share the ones of `DT`),
+    /// then reused through the beatmap's difficulty cache.
+    pub fn difficulty_table(
+        beatmap: &Beatmap,
+        mode: Option<u8>,
+        mods_list: &[u32],
+        workers: Option<usize>,
+    ) -> Vec<PpResult> {
+        // One representative mods per distinct difficulty mods
+        let mut groups: Vec<u32> = Vec::new();
+        for mods in mods_list {
+            let diff_mods = pp::difficulty_mods(*mods);
+            if !groups.iter().any(|m| pp::difficulty_mods(*m) == diff_mods) {
+                groups.push(*mods);
+            }
+        }
+        let results = parallel::parallel_map(&groups, workers, |mods| {
+            Calculator {
+                mode,
+                mods: Some(*mods),
+                ..Default::default()
+            }
+            .calc(beatmap)
+        });
+        let attributes: HashMap<u32, DifficultyAttributes> = groups
+            .iter()
+            .zip(results.iter())
+            .map(|(mods, result)| {
+                (
+                    pp::difficulty_mods(*mods),
+                    pp::difficulty_attributes(&result.attributes),
+                )
+            })
+            .collect();
+
+        // Only the (cheap) performance calculation is left for the other mods of the groups
+        mods_list
+            .iter()
+            .map(|mods| {
+                let key = (mode, *mods, None);
+                if beatmap.1.get_quiet(&key).is_none() {
+                    beatmap
+                        .1
+                        .insert(key, attributes[&pp::difficulty_mods(*mods)].clone());
+                }
+                Calculator {
+                    mode,
+                    mods: Some(*mods),
+                    ..Default::default()
+                }
+                .calc(beatmap)
+            })
+            .collect()
+    }
+
     #[inline(always)]
     #[cfg_attr(feature = "rust_logger", timed::timed(duration(printer = "trace!")))]
     pub fn calc(&self, beatmap: &Beatmap) -> PpResult {
+        let key = (self.mode, self.mods.unwrap_or(0), self.passed_obj);
+        let cached = beatmap.1.get(&key);
+        let is_cached = cached.is_some();
+
+        let attributes = self.calc_with(beatmap, cached);
+        if !is_cached {
+            beatmap
+                .1
+                .insert(key, pp::difficulty_attributes(&attributes));
+        }
+
+        PpResult::new(attributes, self.mods.unwrap_or(0))
+    }
+
+    /// Calculate (beatmap, calculator) jobs on at most `workers` native threads,
+    /// the results keep the order of the jobs
+    #[inline(always)]
+    pub fn calc_jobs(jobs: &[(Beatmap, Calculator)], workers: Option<usize>) -> Vec<PpResult> {
+        parallel::parallel_map(jobs, workers, |(beatmap, calculator)| {
+            calculator.calc(beatmap)
+        })
+    }
+
+    /// Calculate the performance, skip the difficulty calculation if we already have the attributes
+    #[inline(always)]
+    pub fn calc_with(
+        &self,
+        beatmap: &Beatmap,
+        attributes: Option<DifficultyAttributes>,
+    ) -> PerformanceAttributes {
         let c = pp::mode_any_pp(self.mode, &beatmap.0);
+        let c = match attributes {
+            Some(attributes) => c.attributes(attributes),
+            None => c,
+        };
 
         let c = set_calculator!(c, self.mods, self.combo, self.n50, self.n100, self.n300, {
             self.katu: n_katu,
@@ -201,37 +438,250 @@ impl Calculator {
             self.passed_obj: passed_objects
         });
         let c = set_calculator!(c, self.score, { self.acc: accuracy });
+        c.calculate()
+    }
 
-        let attributes = c.calculate();
-        let (mode, raw) = match &attributes {
-            PerformanceAttributes::Osu(attr) => (
-                0,
-                PpRaw::new(
-                    Some(attr.pp_aim),
-                    Some(attr.pp_speed),
-                    None,
-                    Some(attr.pp_acc),
-                    attr.pp,
-                ),
-            ),
-            PerformanceAttributes::Taiko(attr) => (
-                1,
-                PpRaw::new(None, None, Some(attr.pp_strain), Some(attr.pp_acc), attr.pp),
-            ),
-            PerformanceAttributes::Catch(attr) => {
-                (2, PpRaw::new(Some(attr.pp), None, None, None, attr.pp))
-            }
-            PerformanceAttributes::Mania(attr) => (
-                3,
-                PpRaw::new(None, None, Some(attr.pp_strain), Some(attr.pp_acc), attr.pp),
-            ),
+    /// pp of each accuracy (and misses), the difficulty attributes are calculated once
+    /// and only the performance formula is evaluated for each point.
+    pub fn pp_curve(&self, beatmap: &Beatmap, accs: &[f64], misses: Option<&[usize]>) -> Vec<f64> {
+        let mut c = self.clone();
+        let mut attributes: Option<DifficultyAttributes> = None;
+        accs.iter()
+            .enumerate()
+            .map(|(i, acc)| {
+                c.acc = Some(*acc);
+                if let Some(misses) = misses {
+                    c.miss = Some(misses[i]);
+                }
+                match &attributes {
+                    Some(attributes) => c.calc_with(beatmap, Some(attributes.clone())).pp(),
+                    None => {
+                        let result = c.calc(beatmap);
+                        attributes = Some(pp::difficulty_attributes(&result.attributes));
+                        result.pp
+                    }
+                }
+            })
+            .collect()
+    }
+}
+
+/// Stateful pp calculator for a score in progress (live spectating, replays).
+///
+/// Hit results are fed object by object, the difficulty and performance are
+/// updated incrementally instead of recalculating the whole map each time.
+#[pyclass(unsendable, subclass)]
+pub struct GradualCalculator {
+    // Borrows the map owned by `beatmap`, so it must be dropped first
+    difficulty: GradualDifficultyAttributes<'static>,
+    state: ScoreState,
+    current_combo: usize,
+    /// Max combo of the objects processed so far
+    map_combo: usize,
+    processed: usize,
+    finished: bool,
+    mods: u32,
+    beatmap: Beatmap,
+}
+
+impl GradualCalculator {
+    pub fn create(beatmap: Beatmap, mods: u32) -> Self {
+        // Safety: the map is immutable and kept alive by the Arc stored in `beatmap`,
+        // which is dropped after `difficulty` (fields are dropped in declaration order)
+        let map: &'static RawBeatmap = unsafe { &*Arc::as_ptr(&beatmap.0) };
+        Self {
+            difficulty: GradualDifficultyAttributes::new(map, mods),
+            state: ScoreState::new(),
+            current_combo: 0,
+            map_combo: 0,
+            processed: 0,
+            finished: false,
+            mods,
+            beatmap,
+        }
+    }
+
+    /// Process the next `n` steps (at most the remaining ones),
+    /// returns the difficulty attributes after the last one and the amount of processed steps
+    fn advance(&mut self, n: usize) -> Option<(DifficultyAttributes, usize)> {
+        let mut last = None;
+        let mut count = 0;
+        for attributes in self.difficulty.by_ref().take(n) {
+            last = Some(attributes);
+            count += 1;
+        }
+        if count < n {
+            self.finished = true;
+        }
+        last.map(|attributes| (attributes, count))
+    }
+
+    /// Process a step, the misses of the step are processed before its hits.
+    /// Returns the difficulty attributes, the amount of processed steps,
+    /// and the max combo of the map before the hits of the step (after its misses)
+    fn advance_step(
+        &mut self,
+        n_objects: usize,
+        miss: usize,
+    ) -> Option<(DifficultyAttributes, usize, usize)> {
+        if miss == 0 || miss >= n_objects {
+            let (attributes, count) = self.advance(n_objects)?;
+            let before_hits = match miss {
+                0 => self.map_combo,
+                _ => pp::difficulty_max_combo(&attributes).unwrap_or(0),
+            };
+            return Some((attributes, count, before_hits));
+        }
+        let (missed, missed_count) = self.advance(miss)?;
+        let before_hits = pp::difficulty_max_combo(&missed).unwrap_or(0);
+        Some(match self.advance(n_objects - miss) {
+            Some((attributes, count)) => (attributes, missed_count + count, before_hits),
+            None => (missed, missed_count, before_hits),
+        })
+    }
+
+    /// Track the current combo with the max combo of the processed objects:
+    /// the combo restarts after the misses of the step, at `before_hits`.
+    /// Returns the max combo of the score
+    fn track_combo(
+        &mut self,
+        attributes: &DifficultyAttributes,
+        before_hits: usize,
+        miss: usize,
+        count: usize,
+    ) -> usize {
+        let map_combo = match pp::difficulty_max_combo(attributes) {
+            Some(map_combo) => map_combo,
+            // Mania: the combo is not used by the performance, only counted for the state
+            None => return self.state.max_combo + count.saturating_sub(miss),
         };
-        PpResult {
-            mode,
-            mods: self.mods.unwrap_or(0),
-            pp: attributes.pp(),
-            raw,
-            attributes,
+        let hits_combo = map_combo.saturating_sub(before_hits);
+        self.current_combo = match miss {
+            0 => self.current_combo + hits_combo,
+            _ => hits_combo,
+        };
+        self.map_combo = map_combo;
+        self.state.max_combo.max(self.current_combo)
+    }
+}
+
+#[pymethods]
+impl GradualCalculator {
+    #[new]
+    #[args(mods = "0")]
+    pub fn new(beatmap: &Beatmap, mods: u32) -> Self {
+        Self::create(beatmap.clone(), mods)
+    }
+
+    #[getter]
+    pub fn mods(&self) -> u32 {
+        self.mods
+    }
+
+    #[getter]
+    pub fn processed(&self) -> usize {
+        self.processed
+    }
+
+    /// Amount of hit objects of the map (catch maps have more steps, see `process_next`)
+    #[getter]
+    pub fn n_objects(&self) -> usize {
+        self.beatmap.0.hit_objects.len()
+    }
+
+    /// Whether there are no more objects to process
+    #[getter]
+    pub fn finished(&self) -> bool {
+        self.finished
+    }
+
+    /// Process the next `n_objects` hit objects with the hit results judged since the last call.
+    ///
+    /// A step is a hit object (osu!, taiko, mania) or a fruit / droplet (catch),
+    /// so catch maps have more steps than `n_objects`.
+    ///
+    /// The hit counts are increments, `combo` is the current max combo of the score
+    /// (if omitted it is derived from the max combo of the processed objects, slider ticks included,
+    /// the misses of a step are assumed before its hits).
+    /// Returns `None` if there are no more objects to process.
+    #[args(
+        n300 = "0",
+        n100 = "0",
+        n50 = "0",
+        katu = "0",
+        miss = "0",
+        combo = "None",
+        score = "None",
+        n_objects = "1"
+    )]
+    pub fn process_next(
+        &mut self,
+        n300: usize,
+        n100: usize,
+        n50: usize,
+        katu: usize,
+        miss: usize,
+        combo: Option<usize>,
+        score: Option<u32>,
+        n_objects: usize,
+    ) -> Option<CalcResult> {
+        if n_objects == 0 || self.finished {
+            return None;
+        }
+        // The gradual iterator knows its own amount of steps (catch: fruits and droplets)
+        let (difficulty, count, before_hits) = self.advance_step(n_objects, miss)?;
+        self.processed += count;
+
+        self.state.n300 += n300;
+        self.state.n100 += n100;
+        self.state.n50 += n50;
+        self.state.n_katu += katu;
+        self.state.misses += miss;
+        if let Some(score) = score {
+            self.state.score = score;
+        }
+        self.state.max_combo = match combo {
+            Some(combo) => combo,
+            None => self.track_combo(&difficulty, before_hits, miss, count),
+        };
+
+        // One performance calculation per step, on the partial difficulty:
+        // only the processed objects are played
+        let passed_objects = pp::difficulty_passed_objects(&difficulty).unwrap_or(self.processed);
+        let attributes = Calculator {
+            mods: Some(self.mods),
+            n300: Some(self.state.n300),
+            n100: Some(self.state.n100),
+            n50: Some(self.state.n50),
+            katu: Some(self.state.n_katu),
+            miss: Some(self.state.misses),
+            combo: Some(self.state.max_combo),
+            score: Some(self.state.score),
+            passed_obj: Some(passed_objects),
+            ..Default::default()
         }
+        .calc_with(&self.beatmap, Some(difficulty));
+        Some(CalcResult(PpResult::new(attributes, self.mods)))
+    }
+
+    /// The current (cumulative) score state
+    #[getter]
+    pub fn state<'a>(&self, py: Python<'a>) -> PyResult<&'a PyDict> {
+        let d = PyDict::new(py);
+        d.set_item("n300", self.state.n300)?;
+        d.set_item("n100", self.state.n100)?;
+        d.set_item("n50", self.state.n50)?;
+        d.set_item("katu", self.state.n_katu)?;
+        d.set_item("miss", self.state.misses)?;
+        d.set_item("combo", self.state.max_combo)?;
+        d.set_item("score", self.state.score)?;
+        Ok(d)
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "<GradualCalculator (mods: {}, processed: {}, finished: {})>",
+            self.mods, self.processed, self.finished
+        )
     }
 }
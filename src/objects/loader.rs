@@ -0,0 +1,86 @@
+use std::{
+    path::PathBuf,
+    sync::{
+        atomic::{AtomicUsize, Ordering},
+        mpsc::{self, Receiver},
+        Arc, Mutex,
+    },
+    thread,
+};
+
+use pyo3::{
+    prelude::{pyclass, pymethods},
+    IntoPy, PyObject, PyRef, PyResult, Python,
+};
+use rosu_pp::Beatmap as RawBeatmap;
+
+use crate::{
+    methods::{disk_cache, hash::ContentHash, parallel},
+    objects::Beatmap,
+};
+
+/// Turn a parse result into a Beatmap object, or the exception object
+#[inline(always)]
+pub fn beatmap_or_err<B: Into<Beatmap>>(py: Python, result: PyResult<B>) -> PyObject {
+    match result {
+        Ok(beatmap) => Into::<Beatmap>::into(beatmap).into_py(py),
+        Err(err) => err.into_py(py),
+    }
+}
+
+/// Iterator of (path, Beatmap or exception), beatmaps are parsed on native threads
+/// and yielded in the completion order.
+#[pyclass]
+pub struct BeatmapLoader {
+    receiver: Mutex<Receiver<(PathBuf, PyResult<(RawBeatmap, Option<ContentHash>)>)>>,
+}
+
+impl BeatmapLoader {
+    pub fn spawn(
+        paths: Vec<PathBuf>,
+        workers: Option<usize>,
+        mmap: bool,
+        cache_dir: Option<PathBuf>,
+        hash: bool,
+    ) -> Self {
+        let workers = parallel::workers(workers, paths.len());
+        let paths = Arc::new(paths);
+        let next = Arc::new(AtomicUsize::new(0));
+        let cache_dir = Arc::new(cache_dir);
+        let (sender, receiver) = mpsc::channel();
+
+        for _ in 0..workers {
+            let (paths, next, sender) = (paths.clone(), next.clone(), sender.clone());
+            let cache_dir = cache_dir.clone();
+            thread::spawn(move || loop {
+                let path = match paths.get(next.fetch_add(1, Ordering::Relaxed)) {
+                    Some(path) => path.clone(),
+                    None => break,
+                };
+                let result =
+                    disk_cache::read_beatmap_file(path.clone(), mmap, cache_dir.as_deref(), hash);
+                // The loader has been dropped
+                if sender.send((path, result)).is_err() {
+                    break;
+                }
+            });
+        }
+
+        Self {
+            receiver: Mutex::new(receiver),
+        }
+    }
+}
+
+#[pymethods]
+impl BeatmapLoader {
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __next__(slf: PyRef<Self>, py: Python) -> Option<(PathBuf, PyObject)> {
+        let receiver = &slf.receiver;
+        let (path, result) = py.allow_threads(|| receiver.lock().unwrap().recv().ok())?;
+        Some((path, beatmap_or_err(py, result)))
+    }
+}
@@ -0,0 +1,78 @@
+use pyo3::{
+    prelude::{pyclass, pymethods},
+    types::PyDict,
+    PyResult, Python,
+};
+
+use crate::methods::{common::osu_mode_str, metadata::RawMetadata};
+
+/// Beatmap metadata scanned from the .osu file header (no hit object parsing)
+#[pyclass(module = "peace_performance_python._peace_performance.beatmap")]
+#[derive(Clone, Debug)]
+pub struct BeatmapMetadata(pub RawMetadata);
+
+crate::py_impl!(
+    for BeatmapMetadata, @attrs {
+        version: u8,
+        n_circles: u32,
+        n_sliders: u32,
+        n_spinners: u32,
+        ar: f32,
+        od: f32,
+        cs: f32,
+        hp: f32,
+        tick_rate: f64,
+        stack_leniency: f32
+    }; @getters {}; @methods {
+        #[getter]
+        pub fn mode(&self) -> u8 {
+            self.0.mode as u8
+        }
+
+        #[getter]
+        pub fn mode_str(&self) -> String {
+            osu_mode_str(&self.0.mode)
+        }
+
+        #[getter]
+        pub fn sv(&self) -> f64 {
+            self.0.slider_mult
+        }
+
+        /// Amount of hit objects
+        #[getter]
+        pub fn n_objects(&self) -> u32 {
+            self.0.n_circles + self.0.n_sliders + self.0.n_spinners
+        }
+
+        #[getter]
+        #[inline(always)]
+        pub fn as_string(&self) -> String {
+            format!(
+                "mode: {}, mode_str: {}, version: {}, n_circles: {}, n_sliders: {}, n_spinners: {}, ar: {}, od: {}, cs: {},  hp: {}, sv: {}, tick_rate: {}, stack_leniency: {}",
+                self.mode(),
+                self.mode_str(),
+                self.0.version,
+                self.0.n_circles,
+                self.0.n_sliders,
+                self.0.n_spinners,
+                self.0.ar,
+                self.0.od,
+                self.0.cs,
+                self.0.hp,
+                self.0.slider_mult,
+                self.0.tick_rate,
+                self.0.stack_leniency
+            )
+        }
+
+        #[getter]
+        #[inline(always)]
+        pub fn as_dict<'a>(&self, py: Python<'a>) -> PyResult<&'a PyDict> {
+            let d = crate::pyo3_py_dict!(py, self.0; {
+                version, n_circles, n_sliders, n_spinners, ar, od, cs, hp, tick_rate, stack_leniency
+            }; fn self {mode, mode_str, sv});
+            Ok(d)
+        }
+    }
+);
@@ -1,9 +1,15 @@
 mod beatmap;
 mod calculator;
+mod loader;
+mod metadata;
 mod pp_result;
-// mod store;
+mod store;
+mod views;
 
 pub use beatmap::*;
 pub use calculator::*;
+pub use loader::*;
+pub use metadata::*;
 pub use pp_result::*;
-// pub use store::*;
+pub use store::*;
+pub use views::*;
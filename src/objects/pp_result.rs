@@ -187,7 +187,7 @@ crate::py_impl!(
             match &self.0.attributes {
                 rosu_pp::PerformanceAttributes::Catch(attr) => RawStars {
                     stars: Some(attr.stars()),
-                    max_combo: Some(attr.max_combo()),
+                    max_combo: self.0.max_combo(),
                     ar: Some(attr.difficulty.ar),
                     n_fruits: Some(attr.difficulty.n_fruits),
                     n_droplets: Some(attr.difficulty.n_droplets),
@@ -201,7 +201,7 @@ crate::py_impl!(
                     od: Some(attr.difficulty.od),
                     speed_strain: Some(attr.difficulty.speed_strain),
                     aim_strain: Some(attr.difficulty.aim_strain),
-                    max_combo: Some(attr.difficulty.max_combo),
+                    max_combo: self.0.max_combo(),
                     n_circles: Some(attr.difficulty.n_circles),
                     n_spinners: Some(attr.difficulty.n_spinners),
                     ..Default::default()
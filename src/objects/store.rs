@@ -1,68 +1,434 @@
-// Experminal design
+use std::{
+    collections::{BTreeMap, HashMap},
+    mem::size_of,
+    path::{Path, PathBuf},
+    sync::{Mutex, MutexGuard},
+    time::{Duration, Instant},
+};
 
-#[pyclass]
-pub struct BeatmapCache {
+use pyo3::{
+    prelude::{pyclass, pymethods},
+    PyResult, Python,
+};
+use rosu_pp::{
+    beatmap::{DifficultyPoint as RawDifficultyPoint, TimingPoint as RawTimingPoint},
+    parse::HitObject as RawHitObject,
+    Beatmap as RawBeatmap,
+};
+
+use crate::{methods::hash, objects::Beatmap};
+
+/// Approximate heap + inline size of a parsed beatmap
+#[inline(always)]
+pub fn beatmap_bytes(beatmap: &RawBeatmap) -> usize {
+    size_of::<RawBeatmap>()
+        + beatmap.hit_objects.len() * size_of::<RawHitObject>()
+        + beatmap.timing_points.len() * size_of::<RawTimingPoint>()
+        + beatmap.difficulty_points.len() * size_of::<RawDifficultyPoint>()
+}
+
+#[derive(Debug)]
+pub struct StoreEntry {
     pub beatmap: Beatmap,
-    pub access: usize,
-    pub create_time: DateTime<Local>,
-    pub last_access: DateTime<Local>,
+    pub md5: Option<String>,
+    pub bid: Option<u32>,
+    pub path: Option<PathBuf>,
+    pub bytes: usize,
+    pub create_time: Instant,
+    pub tick: u64,
 }
 
-impl BeatmapCache {
-    pub fn new(beatmap: Beatmap) -> Self {
-        Self {
-            beatmap,
-            access: 0,
-            create_time: Local::now(),
-            last_access: Local::now(),
-        }
+/// Lru store space, entries can be indexed with md5, bid or path
+#[derive(Debug, Default)]
+pub struct StoreInner {
+    pub entries: HashMap<u64, StoreEntry>,
+    /// md5 -> entry ids (identical files stored at several paths), the latest last
+    pub md5: HashMap<String, Vec<u64>>,
+    pub bid: HashMap<u32, u64>,
+    pub path: HashMap<PathBuf, u64>,
+    /// access tick -> entry id (oldest first)
+    pub lru: BTreeMap<u64, u64>,
+    pub next_id: u64,
+    pub tick: u64,
+    pub bytes: usize,
+    pub hits: usize,
+    pub misses: usize,
+    pub evictions: usize,
+}
+
+impl StoreInner {
+    #[inline(always)]
+    fn next_tick(&mut self) -> u64 {
+        self.tick += 1;
+        self.tick
     }
 
     #[inline(always)]
-    pub fn get(&mut self) -> &Beatmap {
-        self.access += 1;
-        self.last_access = Local::now();
-        &self.beatmap
+    fn find_id(&self, md5: Option<&str>, bid: Option<u32>, path: Option<&Path>) -> Option<u64> {
+        md5.and_then(|md5| self.md5.get(md5).and_then(|ids| ids.last()))
+            .or_else(|| bid.and_then(|bid| self.bid.get(&bid)))
+            .or_else(|| path.and_then(|path| self.path.get(path)))
+            .copied()
+    }
+
+    pub fn get(
+        &mut self,
+        md5: Option<&str>,
+        bid: Option<u32>,
+        path: Option<&Path>,
+        ttl: Option<Duration>,
+    ) -> Option<(Beatmap, Option<PathBuf>)> {
+        let id = match self.find_id(md5, bid, path) {
+            Some(id) => id,
+            None => {
+                self.misses += 1;
+                return None;
+            }
+        };
+
+        let expired = match (ttl, self.entries.get(&id)) {
+            (Some(ttl), Some(entry)) => entry.create_time.elapsed() > ttl,
+            _ => false,
+        };
+        if expired {
+            self.remove_id(id);
+            self.evictions += 1;
+            self.misses += 1;
+            return None;
+        }
+
+        let tick = self.next_tick();
+        let entry = self.entries.get_mut(&id)?;
+        self.lru.remove(&entry.tick);
+        self.lru.insert(tick, id);
+        entry.tick = tick;
+        self.hits += 1;
+        Some((entry.beatmap.clone(), entry.path.clone()))
+    }
+
+    pub fn insert(
+        &mut self,
+        beatmap: Beatmap,
+        md5: Option<String>,
+        bid: Option<u32>,
+        path: Option<PathBuf>,
+        limit: usize,
+        max_bytes: Option<usize>,
+    ) {
+        // Replace the old entries which have the same keys
+        while let Some(id) = self.find_id(md5.as_deref(), bid, path.as_deref()) {
+            self.remove_id(id);
+        }
+        self.push(beatmap, md5, bid, path, limit, max_bytes);
+    }
+
+    /// Replace the entry stored at `path` only, the entries with the same md5
+    /// (identical files at other paths) are kept. Returns the replaced beatmap
+    pub fn swap(
+        &mut self,
+        beatmap: Beatmap,
+        md5: Option<String>,
+        path: PathBuf,
+        limit: usize,
+        max_bytes: Option<usize>,
+    ) -> Option<Beatmap> {
+        let replaced = self
+            .path
+            .get(&path)
+            .copied()
+            .and_then(|id| self.remove_id(id))
+            .map(|entry| entry.beatmap);
+        self.push(beatmap, md5, None, Some(path), limit, max_bytes);
+        replaced
     }
-}
 
-type StoreSpace<T> = HashMap<T, BeatmapRef>;
-type BeatmapRef = Rc<RefCell<BeatmapCache>>;
+    fn push(
+        &mut self,
+        beatmap: Beatmap,
+        md5: Option<String>,
+        bid: Option<u32>,
+        path: Option<PathBuf>,
+        limit: usize,
+        max_bytes: Option<usize>,
+    ) {
+        let id = self.next_id;
+        self.next_id += 1;
+        let tick = self.next_tick();
+        let bytes = beatmap_bytes(&beatmap.0);
 
-#[pyclass]
+        if let Some(md5) = &md5 {
+            self.md5.entry(md5.clone()).or_default().push(id);
+        }
+        if let Some(bid) = bid {
+            self.bid.insert(bid, id);
+        }
+        if let Some(path) = &path {
+            self.path.insert(path.clone(), id);
+        }
+        self.lru.insert(tick, id);
+        self.bytes += bytes;
+        self.entries.insert(
+            id,
+            StoreEntry {
+                beatmap,
+                md5,
+                bid,
+                path,
+                bytes,
+                create_time: Instant::now(),
+                tick,
+            },
+        );
+
+        self.evict(limit, max_bytes, id);
+    }
+
+    /// Evict the least recently used entries until the limits are satisfied (`keep` will never be evicted)
+    fn evict(&mut self, limit: usize, max_bytes: Option<usize>, keep: u64) {
+        while self.entries.len() > limit.max(1)
+            || max_bytes.map_or(false, |max| self.bytes > max && self.entries.len() > 1)
+        {
+            let oldest = self.lru.values().copied().find(|id| *id != keep);
+            match oldest {
+                Some(id) => {
+                    self.remove_id(id);
+                    self.evictions += 1;
+                }
+                None => break,
+            }
+        }
+    }
+
+    pub fn remove_id(&mut self, id: u64) -> Option<StoreEntry> {
+        let entry = self.entries.remove(&id)?;
+        if let Some(md5) = &entry.md5 {
+            if let Some(ids) = self.md5.get_mut(md5) {
+                ids.retain(|other| *other != id);
+                if ids.is_empty() {
+                    self.md5.remove(md5);
+                }
+            }
+        }
+        if let Some(bid) = &entry.bid {
+            if self.bid.get(bid) == Some(&id) {
+                self.bid.remove(bid);
+            }
+        }
+        if let Some(path) = &entry.path {
+            if self.path.get(path) == Some(&id) {
+                self.path.remove(path);
+            }
+        }
+        self.lru.remove(&entry.tick);
+        self.bytes -= entry.bytes;
+        Some(entry)
+    }
+
+    pub fn remove(&mut self, md5: Option<&str>, bid: Option<u32>, path: Option<&Path>) -> bool {
+        match self.find_id(md5, bid, path) {
+            Some(id) => self.remove_id(id).is_some(),
+            None => false,
+        }
+    }
+
+    pub fn clear(&mut self) {
+        self.entries.clear();
+        self.md5.clear();
+        self.bid.clear();
+        self.path.clear();
+        self.lru.clear();
+        self.bytes = 0;
+    }
+}
+
+/// Thread-safe Lru (+ optional ttl) beatmap store, indexed with md5, bid or path
+#[pyclass(subclass)]
+#[derive(Debug)]
 pub struct BeatmapStore {
-    pub md5: StoreSpace<String>,
-    pub bid: StoreSpace<u32>,
+    pub inner: Mutex<StoreInner>,
     pub limit: usize,
+    pub ttl: Option<Duration>,
+    pub max_bytes: Option<usize>,
+}
+
+impl BeatmapStore {
+    #[inline(always)]
+    pub fn lock(&self) -> MutexGuard<StoreInner> {
+        self.inner.lock().unwrap()
+    }
+
+    pub fn get_or_load(
+        &self,
+        path: PathBuf,
+        md5: Option<String>,
+        bid: Option<u32>,
+    ) -> PyResult<Beatmap> {
+        if let Some((beatmap, _)) = self.lock().get(md5.as_deref(), bid, Some(&path), self.ttl) {
+            return Ok(beatmap);
+        }
+        // Parse without holding the lock, the md5 is computed during the parse (one read of the file)
+        let (beatmap, hash) = hash::read_beatmap_file(path.clone(), false)?;
+        let beatmap = Beatmap::from((beatmap, Some(hash)));
+        let md5 = md5.or_else(|| beatmap.md5());
+        self.lock().insert(
+            beatmap.clone(),
+            md5,
+            bid,
+            Some(path),
+            self.limit,
+            self.max_bytes,
+        );
+        Ok(beatmap)
+    }
 }
 
+#[pymethods]
 impl BeatmapStore {
-    pub fn new(limit: usize) -> Self {
+    #[new]
+    #[args(limit = "1000", ttl = "None", max_bytes = "None")]
+    pub fn new(limit: usize, ttl: Option<f64>, max_bytes: Option<usize>) -> Self {
         Self {
-            md5: HashMap::with_capacity(limit),
-            bid: HashMap::with_capacity(limit),
+            inner: Mutex::new(StoreInner::default()),
             limit,
+            ttl: ttl.map(Duration::from_secs_f64),
+            max_bytes,
         }
     }
 
-    #[inline(always)]
-    pub fn store(&mut self, md5: Option<&str>, bid: Option<u32>, beatmap: BeatmapRef) {
-        if let Some(md5) = md5 {
-            self.store_with_md5(md5, beatmap)
-        }
+    #[getter]
+    pub fn limit(&self) -> usize {
+        self.limit
+    }
 
-        if let Some(bid) = bid {
-            self.store_with_bid(bid, beatmap)
-        }
+    #[getter]
+    pub fn ttl(&self) -> Option<f64> {
+        self.ttl.map(|ttl| ttl.as_secs_f64())
     }
 
-    #[inline(always)]
-    fn store_with_md5(&mut self, md5: &str, beatmap: BeatmapRef) {
-        self.md5.insert(md5.into(), beatmap);
+    #[getter]
+    pub fn max_bytes(&self) -> Option<usize> {
+        self.max_bytes
     }
 
+    #[getter]
+    pub fn bytes(&self) -> usize {
+        self.lock().bytes
+    }
+
+    #[getter]
+    pub fn hits(&self) -> usize {
+        self.lock().hits
+    }
+
+    #[getter]
+    pub fn misses(&self) -> usize {
+        self.lock().misses
+    }
+
+    #[getter]
+    pub fn evictions(&self) -> usize {
+        self.lock().evictions
+    }
+
+    pub fn __len__(&self) -> usize {
+        self.lock().entries.len()
+    }
+
+    #[args(md5 = "None", bid = "None", path = "None")]
+    pub fn insert_raw(
+        &self,
+        py: Python,
+        beatmap: &Beatmap,
+        md5: Option<String>,
+        bid: Option<u32>,
+        path: Option<PathBuf>,
+    ) {
+        let beatmap = beatmap.clone();
+        // Registered with the md5 computed during the parse if not given
+        let md5 = md5.or_else(|| beatmap.md5());
+        py.allow_threads(|| {
+            self.lock()
+                .insert(beatmap, md5, bid, path, self.limit, self.max_bytes);
+        })
+    }
+
+    /// Atomically replace the beatmap stored at `path` (e.g. a re-parsed .osu file),
+    /// the entries with the same md5 at other paths are kept.
+    /// The difficulty cache of the replaced beatmap is cleared. Returns whether a beatmap was replaced
+    #[args(md5 = "None")]
+    pub fn swap_raw(
+        &self,
+        py: Python,
+        beatmap: &Beatmap,
+        path: PathBuf,
+        md5: Option<String>,
+    ) -> bool {
+        let beatmap = beatmap.clone();
+        let md5 = md5.or_else(|| beatmap.md5());
+        py.allow_threads(|| {
+            let replaced = self
+                .lock()
+                .swap(beatmap, md5, path, self.limit, self.max_bytes);
+            // Outside of the lock, the old beatmap may still be used by other threads
+            replaced.map(|old| old.1.clear()).is_some()
+        })
+    }
+
+    #[args(md5 = "None", bid = "None", path = "None")]
+    pub fn get_raw(
+        &self,
+        py: Python,
+        md5: Option<&str>,
+        bid: Option<u32>,
+        path: Option<PathBuf>,
+    ) -> Option<(Beatmap, Option<PathBuf>)> {
+        py.allow_threads(|| self.lock().get(md5, bid, path.as_deref(), self.ttl))
+    }
+
+    #[args(md5 = "None", bid = "None")]
+    pub fn get_or_load_raw(
+        &self,
+        py: Python,
+        path: PathBuf,
+        md5: Option<String>,
+        bid: Option<u32>,
+    ) -> PyResult<Beatmap> {
+        py.allow_threads(|| self.get_or_load(path, md5, bid))
+    }
+
+    #[args(md5 = "None", bid = "None", path = "None")]
+    pub fn remove(
+        &self,
+        py: Python,
+        md5: Option<&str>,
+        bid: Option<u32>,
+        path: Option<PathBuf>,
+    ) -> bool {
+        py.allow_threads(|| self.lock().remove(md5, bid, path.as_deref()))
+    }
+
+    pub fn clear(&self, py: Python) {
+        py.allow_threads(|| self.lock().clear())
+    }
+
+    #[getter]
     #[inline(always)]
-    fn store_with_bid(&mut self, bid: u32, beatmap: BeatmapRef) {
-        self.bid.insert(bid, beatmap);
+    pub fn as_string(&self) -> String {
+        let inner = self.lock();
+        format!(
+            "len: {}, limit: {}, ttl: {:?}, max_bytes: {:?}, bytes: {}, hits: {}, misses: {}, evictions: {}",
+            inner.entries.len(),
+            self.limit,
+            self.ttl(),
+            self.max_bytes,
+            inner.bytes,
+            inner.hits,
+            inner.misses,
+            inner.evictions
+        )
+    }
+
+    fn __repr__(&self) -> PyResult<String> {
+        Ok(format!("<BeatmapStore ({})>", self.as_string()))
     }
 }
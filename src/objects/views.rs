@@ -0,0 +1,168 @@
+use std::{os::raw::c_long, sync::Arc};
+
+use pyo3::{
+    exceptions::PyIndexError,
+    prelude::{pyclass, pymethods},
+    types::PySlice,
+    IntoPy, PyAny, PyObject, PyRef, PyRefMut, PyResult, Python,
+};
+use rosu_pp::{
+    beatmap::{DifficultyPoint as RawDifficultyPoint, TimingPoint as RawTimingPoint},
+    parse::HitObject as RawHitObject,
+    Beatmap as RawBeatmap,
+};
+
+use super::{DifficultyPoint, HitObject, TimingPoint};
+
+/// Python index (negative from the end) into a position
+#[inline(always)]
+pub fn py_index(index: isize, len: usize) -> PyResult<usize> {
+    let i = if index < 0 {
+        index + len as isize
+    } else {
+        index
+    };
+    if i < 0 || i as usize >= len {
+        return Err(PyIndexError::new_err("index out of range"));
+    }
+    Ok(i as usize)
+}
+
+/// Sequence view (`$view`) over a range of a sorted (by `$time`) list of the beatmap,
+/// and its iterator (`$iter`). The `$item` objects are only created on access (no copy of the whole list).
+///
+/// Slices with a step of 1 return a view of the sub-range, other slices return a list.
+macro_rules! sequence_view {
+    ($view:ident, $iter:ident, $item:ident($raw:ty), $field:ident, $time:ident; @methods {$($others:tt)*}) => {
+        #[pyclass]
+        #[derive(Clone, Debug)]
+        pub struct $view {
+            pub beatmap: Arc<RawBeatmap>,
+            pub start: usize,
+            pub end: usize,
+        }
+
+        impl $view {
+            #[inline(always)]
+            pub fn new(beatmap: Arc<RawBeatmap>) -> Self {
+                let end = beatmap.$field.len();
+                Self { beatmap, start: 0, end }
+            }
+
+            #[inline(always)]
+            pub fn items(&self) -> &[$raw] {
+                &self.beatmap.$field[self.start..self.end]
+            }
+
+            #[inline(always)]
+            fn sub_view(&self, start: usize, end: usize) -> Self {
+                Self {
+                    beatmap: self.beatmap.clone(),
+                    start: self.start + start,
+                    end: self.start + end.max(start),
+                }
+            }
+
+            /// Position of the first item at or after `time` (binary search)
+            #[inline(always)]
+            fn position(&self, time: f64) -> usize {
+                self.items().partition_point(|item| item.$time < time)
+            }
+
+            /// Position after the last item at or before `time` (binary search)
+            #[inline(always)]
+            fn position_after(&self, time: f64) -> usize {
+                self.items().partition_point(|item| item.$time <= time)
+            }
+        }
+
+        #[pymethods]
+        impl $view {
+            fn __len__(&self) -> usize {
+                self.end - self.start
+            }
+
+            fn __getitem__(&self, py: Python, index: &PyAny) -> PyResult<PyObject> {
+                let items = self.items();
+                if let Ok(slice) = index.downcast::<PySlice>() {
+                    let indices = slice.indices(items.len() as c_long)?;
+                    if indices.step == 1 {
+                        let (start, stop) = (indices.start as usize, indices.stop as usize);
+                        return Ok(self.sub_view(start, stop).into_py(py));
+                    }
+                    let objs: Vec<$item> = (0..indices.slicelength)
+                        .map(|i| $item(items[(indices.start + i * indices.step) as usize].clone()))
+                        .collect();
+                    return Ok(objs.into_py(py));
+                }
+                let i = py_index(index.extract::<isize>()?, items.len())?;
+                Ok($item(items[i].clone()).into_py(py))
+            }
+
+            fn __iter__(slf: PyRef<Self>) -> $iter {
+                $iter {
+                    view: slf.clone(),
+                    index: 0,
+                }
+            }
+
+            fn __repr__(&self) -> String {
+                format!(concat!("<", stringify!($view), " (len: {})>"), self.end - self.start)
+            }
+
+            /// Materialize the whole view into a list
+            pub fn to_list(&self, py: Python) -> Vec<$item> {
+                py.allow_threads(|| self.items().iter().map(|item| $item(item.clone())).collect())
+            }
+
+            /// View of the items with `start_ms <= time < end_ms` (binary search)
+            pub fn between(&self, start_ms: f64, end_ms: f64) -> Self {
+                self.sub_view(self.position(start_ms), self.position(end_ms))
+            }
+
+            $($others)*
+        }
+
+        #[pyclass]
+        pub struct $iter {
+            view: $view,
+            index: usize,
+        }
+
+        #[pymethods]
+        impl $iter {
+            fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+                slf
+            }
+
+            fn __next__(mut slf: PyRefMut<Self>) -> Option<$item> {
+                let obj = slf.view.items().get(slf.index)?.clone();
+                slf.index += 1;
+                Some($item(obj))
+            }
+        }
+    };
+}
+
+sequence_view!(HitObjectView, HitObjectIter, HitObject(RawHitObject), hit_objects, start_time; @methods {
+    /// View of the hit objects with `start_ms <= start_time < end_ms` (binary search)
+    pub fn objects_between(&self, start_ms: f64, end_ms: f64) -> Self {
+        self.between(start_ms, end_ms)
+    }
+});
+
+sequence_view!(TimingPointView, TimingPointIter, TimingPoint(RawTimingPoint), timing_points, time; @methods {
+    /// The timing point in effect at `time_ms` (the last one at or before it), binary search
+    pub fn at_time(&self, time_ms: f64) -> Option<TimingPoint> {
+        let i = self.position_after(time_ms);
+        (i > 0).then(|| TimingPoint(self.items()[i - 1].clone()))
+    }
+});
+
+sequence_view!(DifficultyPointView, DifficultyPointIter, DifficultyPoint(RawDifficultyPoint), difficulty_points, time; @methods {
+    /// The difficulty point in effect at `time_ms` (the last one at or before it), binary search
+    pub fn at_time(&self, time_ms: f64) -> Option<DifficultyPoint> {
+        let i = self.position_after(time_ms);
+        (i > 0).then(|| DifficultyPoint(self.items()[i - 1].clone()))
+    }
+});
@@ -1,10 +1,9 @@
-use pyo3::{prelude::pyfunction, PyAny, PyResult, Python};
-use rosu_pp::Beatmap as RawBeatmap;
+use pyo3::{prelude::pyfunction, IntoPy, PyAny, PyObject, PyResult, Python};
 use std::path::PathBuf;
 
 use crate::{
-    methods::common,
-    objects::{Beatmap, Calculator},
+    methods::{common, disk_cache, hash, metadata, parallel},
+    objects::{beatmap_or_err, Beatmap, BeatmapLoader, BeatmapMetadata, CalcResult, Calculator},
 };
 
 crate::cfg_rust_logger! {
@@ -35,13 +34,12 @@ crate::cfg_not_rust_logger! {
 
 crate::cfg_not_async! {
     #[pyfunction]
-    pub fn read_beatmap_sync(_py: Python, path: PathBuf) -> PyResult<Beatmap> {
-        let file = common::sync_read_file(path)?;
-        Ok(Beatmap(RawBeatmap::parse(file).map_err(common::map_parse_err)?))
+    pub fn read_beatmap_async(_py: Python, _path: PathBuf) -> PyResult<&PyAny> {
+        Err(crate::async_not_enabled_err!())
     }
 
     #[pyfunction]
-    pub fn read_beatmap_async(_py: Python, _path: PathBuf) -> PyResult<&PyAny> {
+    pub fn read_beatmap_bytes_async<'a>(_py: Python<'a>, _buf: &PyAny) -> PyResult<&'a PyAny> {
         Err(crate::async_not_enabled_err!())
     }
 
@@ -49,10 +47,19 @@ crate::cfg_not_async! {
     pub fn rust_sleep(_py: Python, _secs: u64) -> PyResult<&PyAny> {
         Err(crate::async_not_enabled_err!())
     }
+
+    #[pyfunction(max_concurrency = "None")]
+    pub fn calculate_many_async(
+        _py: Python,
+        _jobs: Vec<(Beatmap, Calculator)>,
+        _max_concurrency: Option<usize>,
+    ) -> PyResult<&PyAny> {
+        Err(crate::async_not_enabled_err!())
+    }
 }
 
 crate::cfg_any_async! {
-    use pyo3::IntoPy;
+    use rosu_pp::Beatmap as RawBeatmap;
 
     crate::cfg_async_std! {
         use pyo3_asyncio::async_std as pyo3_async_runtime;
@@ -65,38 +72,178 @@ crate::cfg_any_async! {
     #[pyfunction]
     #[inline(always)]
     pub fn read_beatmap_async(py: Python, path: PathBuf) -> PyResult<&PyAny> {
+        common::runtime_started();
         pyo3_async_runtime::future_into_py(py, async {
             let file = common::async_read_file(path).await?;
             let beatmap = RawBeatmap::parse(file).await.map_err(common::map_parse_err)?;
-            Python::with_gil(|py| Ok(Beatmap(beatmap).into_py(py)))
+            Python::with_gil(|py| Ok(Beatmap::from(beatmap).into_py(py)))
         })
     }
 
     #[pyfunction]
     #[inline(always)]
-    pub fn rust_sleep(py: Python, secs: u64) -> PyResult<&PyAny> {
+    /// Parse a beatmap async from a buffer protocol object (bytes, bytearray, memoryview...) without copying
+    pub fn read_beatmap_bytes_async<'a>(py: Python<'a>, buf: &PyAny) -> PyResult<&'a PyAny> {
+        let buf = common::BytesBuffer::get(buf)?;
+        common::runtime_started();
         pyo3_async_runtime::future_into_py(py, async move {
-            common::sleep(secs).await;
-            Ok(Python::with_gil(|py| py.None()))
+            let beatmap = RawBeatmap::parse(buf.as_slice()).await.map_err(common::map_parse_err)?;
+            Python::with_gil(|py| Ok(Beatmap::from(beatmap).into_py(py)))
+        })
+    }
+
+    #[pyfunction(max_concurrency = "None")]
+    /// Calculate (beatmap, calculator) jobs on at most `max_concurrency` native threads
+    /// (default: the available parallelism), off the event loop.
+    /// Returns a python awaitable of the CalcResults, in the order of the jobs
+    pub fn calculate_many_async(
+        py: Python,
+        jobs: Vec<(Beatmap, Calculator)>,
+        max_concurrency: Option<usize>,
+    ) -> PyResult<&PyAny> {
+        common::blocking_into_py(py, move || {
+            Ok(Calculator::calc_jobs(&jobs, max_concurrency)
+                .into_iter()
+                .map(CalcResult)
+                .collect::<Vec<_>>())
         })
     }
 
     #[pyfunction]
     #[inline(always)]
-    pub fn read_beatmap_sync(path: PathBuf) -> PyResult<Beatmap> {
-        common::block_on(async {
-            let file = common::async_read_file(path).await?;
-            Ok(Beatmap(RawBeatmap::parse(file).await.map_err(common::map_parse_err)?))
+    pub fn rust_sleep(py: Python, secs: u64) -> PyResult<&PyAny> {
+        common::runtime_started();
+        pyo3_async_runtime::future_into_py(py, async move {
+            common::sleep(secs).await;
+            Ok(Python::with_gil(|py| py.None()))
         })
     }
 }
 
+#[pyfunction]
+/// Set the worker threads of the process-wide async runtime,
+/// must be called at startup (before any beatmap is read)
+pub fn set_runtime_threads(threads: usize) -> PyResult<()> {
+    common::set_runtime_threads(threads)
+}
+
+#[pyfunction(mmap = "false", cache_dir = "None", hash = "false")]
+#[inline(always)]
+/// Read and parse a beatmap (without holding the GIL),
+/// `mmap`: parse straight from a memory-mapped region of the file,
+/// `cache_dir`: load / write the parsed beatmap snapshots in this directory,
+/// `hash`: compute the md5 (and a fast hash) over the same bytes as the parse (one read of the file)
+pub fn read_beatmap_sync(
+    py: Python,
+    path: PathBuf,
+    mmap: bool,
+    cache_dir: Option<PathBuf>,
+    hash: bool,
+) -> PyResult<Beatmap> {
+    Ok(py
+        .allow_threads(|| disk_cache::read_beatmap_file(path, mmap, cache_dir.as_deref(), hash))?
+        .into())
+}
+
+#[pyfunction(hash = "false")]
+#[inline(always)]
+/// Parse a beatmap from a buffer protocol object (bytes, bytearray, memoryview...)
+/// without copying it (and without holding the GIL),
+/// `hash`: compute the md5 (and a fast hash) of the content
+pub fn read_beatmap_bytes(py: Python, buf: &PyAny, hash: bool) -> PyResult<Beatmap> {
+    let buf = common::BytesBuffer::get(buf)?;
+    py.allow_threads(|| -> PyResult<Beatmap> {
+        if hash {
+            let (beatmap, hash) = hash::parse_beatmap_bytes(buf.as_slice())?;
+            return Ok((beatmap, Some(hash)).into());
+        }
+        Ok(common::parse_beatmap_bytes(buf.as_slice())?.into())
+    })
+}
+
+#[pyfunction(workers = "None", mmap = "false", cache_dir = "None", hash = "false")]
+/// Read and parse beatmaps in parallel on native threads (without holding the GIL).
+/// Returns Beatmap objects in the order of the paths, or the exception objects if failed.
+pub fn read_beatmaps(
+    py: Python,
+    paths: Vec<PathBuf>,
+    workers: Option<usize>,
+    mmap: bool,
+    cache_dir: Option<PathBuf>,
+    hash: bool,
+) -> Vec<PyObject> {
+    py.allow_threads(|| {
+        parallel::parallel_map(&paths, workers, |path| {
+            disk_cache::read_beatmap_file(path.clone(), mmap, cache_dir.as_deref(), hash)
+        })
+    })
+    .into_iter()
+    .map(|result| beatmap_or_err(py, result))
+    .collect()
+}
+
+#[pyfunction(workers = "None", mmap = "false", cache_dir = "None", hash = "false")]
+/// Read and parse beatmaps in parallel on native threads,
+/// returns an iterator of (path, Beatmap or exception object) in the completion order.
+pub fn iter_beatmaps(
+    paths: Vec<PathBuf>,
+    workers: Option<usize>,
+    mmap: bool,
+    cache_dir: Option<PathBuf>,
+    hash: bool,
+) -> BeatmapLoader {
+    BeatmapLoader::spawn(paths, workers, mmap, cache_dir, hash)
+}
+
+#[pyfunction]
+/// Scan the metadata of a beatmap (a .osu file path, or a buffer protocol object with its content)
+/// without parsing the hit objects, timing points and slider curves (and without holding the GIL)
+pub fn scan_beatmap_metadata(py: Python, source: &PyAny) -> PyResult<BeatmapMetadata> {
+    let metadata = match common::BytesBuffer::get(source) {
+        Ok(buf) => py.allow_threads(|| metadata::scan(buf.as_slice())),
+        Err(_) => {
+            let path: PathBuf = source.extract()?;
+            py.allow_threads(|| metadata::scan_file(&path))
+        }
+    }?;
+    Ok(BeatmapMetadata(metadata))
+}
+
+#[pyfunction(workers = "None")]
+/// Scan the metadata of beatmaps in parallel on native threads (without holding the GIL).
+/// Returns BeatmapMetadata objects in the order of the paths,
+/// a failed path gets its exception object instead of raising.
+pub fn scan_beatmaps_metadata(
+    py: Python,
+    paths: Vec<PathBuf>,
+    workers: Option<usize>,
+) -> Vec<PyObject> {
+    py.allow_threads(|| parallel::parallel_map(&paths, workers, |path| metadata::scan_file(path)))
+        .into_iter()
+        .map(|result| match result {
+            Ok(metadata) => BeatmapMetadata(metadata).into_py(py),
+            Err(err) => err.into_py(py),
+        })
+        .collect()
+}
+
 #[pyfunction]
 #[inline(always)]
 pub fn new_calculator() -> Calculator {
     Calculator::new_empty()
 }
 
+#[pyfunction]
+#[inline(always)]
+/// Calculate many score configs (score dicts, or a dict of parallel arrays) against one beatmap
+pub fn calculate_batch(
+    py: Python,
+    beatmap: &Beatmap,
+    configs: &PyAny,
+) -> PyResult<Vec<CalcResult>> {
+    Calculator::new_empty().calculate_many_raw(py, beatmap, configs)
+}
+
 #[pyfunction]
 #[inline(always)]
 /// osu! mode int to string
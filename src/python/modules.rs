@@ -11,27 +11,45 @@ use crate::{
 
 #[pymodule]
 pub fn common(_py: Python, m: &PyModule) -> PyResult<()> {
-    pyo3_add_functions!(m; {rust_sleep, set_log_level, init_logger, osu_mode_int_str, osu_mode_str_int});
+    pyo3_add_functions!(m; {rust_sleep, set_log_level, init_logger, set_runtime_threads, osu_mode_int_str, osu_mode_str_int});
     Ok(())
 }
 
 #[pymodule]
 pub fn pp(_py: Python, m: &PyModule) -> PyResult<()> {
-    pyo3_add_functions!(m; {new_calculator});
-    pyo3_add_classes!(m; {Calculator, CalcResult, RawPP, RawStars});
+    pyo3_add_functions!(m; {new_calculator, calculate_batch, calculate_many_async});
+    pyo3_add_classes!(m; {Calculator, GradualCalculator, CalcResult, RawPP, RawStars});
     Ok(())
 }
 
 #[pymodule]
 pub fn beatmap(_py: Python, m: &PyModule) -> PyResult<()> {
-    pyo3_add_functions!(m; {read_beatmap_async, read_beatmap_sync});
+    pyo3_add_functions!(m; {
+        read_beatmap_async,
+        read_beatmap_sync,
+        read_beatmap_bytes,
+        read_beatmap_bytes_async,
+        read_beatmaps,
+        iter_beatmaps,
+        scan_beatmap_metadata,
+        scan_beatmaps_metadata
+    });
     pyo3_add_classes!(m; {
         Beatmap,
         DifficultyPoint,
         TimingPoint,
         Pos2,
         HitObject,
-        HitObjectKind
+        HitObjectKind,
+        HitObjectView,
+        HitObjectIter,
+        TimingPointView,
+        TimingPointIter,
+        DifficultyPointView,
+        DifficultyPointIter,
+        BeatmapStore,
+        BeatmapLoader,
+        BeatmapMetadata
     });
     Ok(())
 }
@@ -0,0 +1,59 @@
+import pytest
+
+from peace_performance_python.objects import Beatmap
+
+from peace_performance_python.objects.utils import Mods
+
+from . import join_beatmap, FREEDOM_DIVE, BLUE_ZENITH_MANIA, THE_BIG_BLACK_TAIKO
+
+np = pytest.importorskip('numpy')
+
+
+def test_hit_objects_array() -> None:
+    b = Beatmap(join_beatmap(FREEDOM_DIVE))
+    arrays = b.hit_objects_array()
+    hit_objects = b.hit_objects
+
+    assert set(arrays) == {'start_time', 'end_time', 'x', 'y', 'kind', 'repeats', 'pixel_len'}
+    assert all(len(arr) == len(hit_objects) for arr in arrays.values())
+    assert arrays['start_time'].dtype == np.float64
+    assert np.count_nonzero(arrays['kind'] == 1) == b.n_sliders
+    for i in (0, len(hit_objects) // 2, len(hit_objects) - 1):
+        assert arrays['start_time'][i] == hit_objects[i].start_time
+        assert arrays['end_time'][i] == hit_objects[i].end_time
+        assert arrays['x'][i] == hit_objects[i].pos.x
+
+
+def test_mania_hold_array() -> None:
+    arrays = Beatmap(join_beatmap(BLUE_ZENITH_MANIA)).hit_objects_array()
+    assert np.any(arrays['kind'] == 3)
+    assert np.all(arrays['end_time'] >= arrays['start_time'])
+
+
+def test_strains() -> None:
+    b = Beatmap(join_beatmap(FREEDOM_DIVE))
+    strains = b.strains()
+
+    assert strains['mode'] == 0
+    assert strains['section_len'] > 0
+    assert {'aim', 'aim_no_sliders', 'speed', 'flashlight'} <= set(strains)
+    assert strains['aim'].dtype == np.float64
+    assert len(strains['aim']) == len(strains['speed']) > 0
+    assert b.strains_cache_size == 1
+
+    # Memoized per mods
+    assert np.array_equal(b.strains()['aim'], strains['aim'])
+    assert b.strains_cache_size == 1
+    dt = b.strains(mods=Mods.DOUBLETIME)
+    assert b.strains_cache_size == 2
+    assert len(dt['aim']) < len(strains['aim'])
+
+    b.clear_difficulty_cache()
+    assert b.strains_cache_size == 0
+
+
+def test_strains_modes() -> None:
+    assert {'color', 'rhythm', 'stamina'} <= set(Beatmap(join_beatmap(THE_BIG_BLACK_TAIKO)).strains())
+    assert 'strains' in Beatmap(join_beatmap(BLUE_ZENITH_MANIA)).strains()
+    # Converted
+    assert 'stamina' in Beatmap(join_beatmap(FREEDOM_DIVE)).strains('taiko')
@@ -0,0 +1,88 @@
+import hashlib
+
+from peace_performance_python.prelude import Beatmap, BeatmapStore, Calculator
+
+from . import join_beatmap, HITORIGOTO, PADORU, FREEDOM_DIVE
+
+
+def test_store_get_or_load() -> None:
+    store = BeatmapStore(limit=10)
+    path = join_beatmap(HITORIGOTO)
+
+    b = store.get_or_load(path, md5='hitorigoto', bid=1)
+    assert store.misses == 1
+    assert len(store) == 1
+    assert store.bytes > 0
+
+    assert store.get(md5='hitorigoto') is not None
+    assert store.get(bid=1) is not None
+    assert store.get_or_load(path) is not None
+    assert store.hits == 3
+    assert store.get(bid=2) is None
+
+    # Shared native beatmap (and difficulty cache)
+    Calculator().calculate(b)
+    assert store.get(bid=1).difficulty_cache_size == 1
+
+    assert store.remove(bid=1)
+    assert len(store) == 0
+    assert store.bytes == 0
+
+
+def test_store_lru_eviction() -> None:
+    store = BeatmapStore(limit=2)
+    store.insert(Beatmap(join_beatmap(PADORU)), bid=1)
+    store.insert(Beatmap(join_beatmap(HITORIGOTO)), bid=2)
+    store.get(bid=1)
+    store.insert(Beatmap(join_beatmap(FREEDOM_DIVE)), bid=3)
+
+    assert len(store) == 2
+    assert store.evictions == 1
+    assert store.get(bid=2) is None
+    assert store.get(bid=1) is not None
+
+
+def test_store_ttl() -> None:
+    store = BeatmapStore(ttl=0)
+    store.insert(Beatmap(join_beatmap(PADORU)), bid=1)
+    assert store.get(bid=1) is None
+    assert len(store) == 0
+
+
+def test_store_md5_from_parse() -> None:
+    store = BeatmapStore(limit=10)
+    path = join_beatmap(PADORU)
+    with open(path, 'rb') as f:
+        md5 = hashlib.md5(f.read()).hexdigest()
+
+    # Registered with the md5 computed during the parse
+    b = store.get_or_load(path)
+    assert b.md5 == md5
+    assert store.get(md5=md5) is not None
+
+    store.insert(Beatmap(join_beatmap(HITORIGOTO), hash=True))
+    assert store.get(md5=Beatmap(join_beatmap(HITORIGOTO), hash=True).md5) is not None
+
+
+def test_store_swap() -> None:
+    store = BeatmapStore(limit=10)
+    path = join_beatmap(PADORU)
+    old = Beatmap(path, hash=True)
+    store.insert(old)
+    Calculator().calculate(old)
+    assert old.difficulty_cache_size == 1
+
+    # Replaced by path (new md5), the old difficulty cache is cleared
+    new = Beatmap(join_beatmap(HITORIGOTO), hash=True)
+    assert store.swap_raw(new._raw, path, new.md5)
+    assert old.difficulty_cache_size == 0
+    assert len(store) == 1
+    assert store.get(path=path).md5 == new.md5
+    assert store.get(md5=old.md5) is None
+
+    # Identical files at other paths are kept
+    assert not store.swap_raw(new._raw, 'copy/padoru.osu')
+    assert len(store) == 2
+    assert store.get(path=path) is not None
+    assert store.remove(path='copy/padoru.osu')
+    assert store.get(md5=new.md5) is not None
@@ -0,0 +1,118 @@
+import hashlib
+import shutil
+import sys
+import time
+import pytest
+
+from pathlib import Path
+
+from peace_performance_python.objects import BeatmapStore, BeatmapWatcher
+
+from . import join_beatmap, HITORIGOTO, PADORU, FREEDOM_DIVE
+
+
+def copy(beatmap: str, path: Path) -> str:
+    shutil.copyfile(join_beatmap(beatmap), path)
+    return str(path)
+
+
+def md5(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_watcher_poll_once(tmp_path: Path) -> None:
+    padoru = copy(PADORU, tmp_path / 'padoru.osu')
+    (tmp_path / 'notes.txt').write_text('not a beatmap')
+    watcher = BeatmapWatcher(tmp_path, use_inotify=False)
+
+    # Initial scan
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(path=padoru).md5 == md5(padoru)
+    assert watcher.poll_once() == 0
+
+    # Added, in a sub directory
+    (tmp_path / 'sub').mkdir()
+    hitorigoto = copy(HITORIGOTO, tmp_path / 'sub' / 'hitorigoto.osu')
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(md5=md5(hitorigoto)) is not None
+
+    # Modified: swapped, the old md5 is not stored anymore
+    old_md5 = md5(padoru)
+    copy(FREEDOM_DIVE, tmp_path / 'padoru.osu')
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(path=padoru).md5 == md5(padoru)
+    assert watcher.store.get(md5=old_md5) is None
+
+    # Failed: the old beatmap is kept
+    (tmp_path / 'sub' / 'hitorigoto.osu').write_text('not a beatmap')
+    assert watcher.poll_once() == 0
+    assert watcher.store.get(path=hitorigoto) is not None
+
+    # Removed
+    (tmp_path / 'padoru.osu').unlink()
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(path=padoru) is None
+
+    assert (watcher.added, watcher.modified, watcher.removed, watcher.failed) == (2, 1, 1, 1)
+    assert watcher.stats['reloads'] == 4
+    assert watcher.max_latency >= watcher.avg_latency > 0
+    assert len(watcher) == 1
+
+
+def test_watcher_identical_files(tmp_path: Path) -> None:
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    first = copy(PADORU, tmp_path / 'a' / 'padoru.osu')
+    watcher = BeatmapWatcher(tmp_path, use_inotify=False)
+    assert watcher.poll_once() == 1
+
+    # Byte-identical copy in another directory: both paths are stored
+    second = copy(PADORU, tmp_path / 'b' / 'padoru.osu')
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(path=first) is not None
+    assert watcher.store.get(path=second) is not None
+    assert len(watcher.store) == 2
+
+    # Modifying or removing one copy keeps the other
+    copy(HITORIGOTO, tmp_path / 'b' / 'padoru.osu')
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(path=first).md5 == md5(first)
+    (tmp_path / 'a' / 'padoru.osu').unlink()
+    assert watcher.poll_once() == 1
+    assert watcher.store.get(path=first) is None
+    assert watcher.store.get(path=second).md5 == md5(second)
+    assert (watcher.added, watcher.modified, watcher.removed) == (2, 1, 1)
+
+
+@pytest.mark.parametrize('use_inotify', [False, True])
+def test_watcher_background(tmp_path: Path, use_inotify: bool) -> None:
+    padoru = copy(PADORU, tmp_path / 'padoru.osu')
+    store = BeatmapStore(limit=10)
+    with BeatmapWatcher(tmp_path, store=store, interval=0.05, use_inotify=use_inotify) as watcher:
+        if use_inotify and sys.platform.startswith('linux'):
+            assert watcher.backend == 'inotify'
+        assert store.get(path=padoru) is not None
+
+        hitorigoto = copy(HITORIGOTO, tmp_path / 'hitorigoto.osu')
+        assert wait_for(lambda: store.get(path=hitorigoto) is not None)
+
+        copy(FREEDOM_DIVE, tmp_path / 'padoru.osu')
+        assert wait_for(lambda: store.get(md5=md5(padoru)) is not None)
+
+        (tmp_path / 'hitorigoto.osu').unlink()
+        assert wait_for(lambda: store.get(path=hitorigoto) is None)
+
+    assert not watcher.running
+    # A file caught mid-write may be reloaded twice
+    assert (watcher.added, watcher.removed) == (2, 1)
+    assert watcher.modified >= 1
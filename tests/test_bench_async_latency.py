@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+import pytest
+
+from typing import Awaitable, Callable, List, Tuple
+
+from peace_performance_python.objects import AsyncExecutor, Beatmap, Calculator
+from peace_performance_python.functions import calculate_many_async, raw_read_beatmap_sync
+
+from . import async_run, join_beatmap, UNFORGIVING
+
+path = join_beatmap(UNFORGIVING)
+PARSES = 8
+
+
+async def loop_latency(parse: Callable[[], Awaitable[None]]) -> Tuple[List[float], int]:
+    '''
+    Returns the delays of a 1ms ticker task, while `parse` runs on the same loop,
+    and the amount of ticks completed before `parse` returned
+    (a blocked loop only ticks once, after the parses)
+    '''
+    delays: List[float] = []
+    done = False
+
+    async def ticker() -> None:
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    delays.clear()
+    await parse()
+    ticks = len(delays)
+    done = True
+    await task
+    return delays, ticks
+
+
+def bench_latency(benchmark, parse: Callable[[], Awaitable[None]]) -> None:
+    delays: List[float] = []
+
+    def wrap() -> None:
+        delays.extend(async_run(loop_latency(parse))[0])
+    benchmark(wrap)
+    benchmark.extra_info['max_loop_latency_ms'] = max(delays, default=0.0) * 1000
+
+
+async def parse_inline() -> None:
+    # The old "Python async" path: blocking parse on the loop thread
+    for _ in range(PARSES):
+        raw_read_beatmap_sync(path)
+
+
+async def parse_executor() -> None:
+    await asyncio.gather(*(Beatmap.create_async_py(path) for _ in range(PARSES)))
+
+
+@pytest.mark.benchmark(group="async-loop-latency")
+def test_loop_latency_inline(benchmark) -> None:
+    bench_latency(benchmark, parse_inline)
+
+
+@pytest.mark.benchmark(group="async-loop-latency")
+def test_loop_latency_executor(benchmark) -> None:
+    bench_latency(benchmark, parse_executor)
+
+
+def test_loop_not_blocked() -> None:
+    # Other tasks keep running during the parses
+    assert async_run(loop_latency(parse_executor))[1] >= 3
+    assert async_run(loop_latency(parse_inline))[1] == 0
+
+
+def test_max_concurrency_and_cancel() -> None:
+    executor = AsyncExecutor(max_concurrency=2)
+    lock = threading.Lock()
+    running, max_running, calls = [0], [0], []
+
+    def job(i: int) -> int:
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+            calls.append(i)
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return i
+
+    async def main() -> None:
+        assert await asyncio.gather(*(executor.run(job, i) for i in range(6))) == list(range(6))
+        assert max_running[0] <= 2
+
+        # Waiting jobs are cancelled before they start
+        calls.clear()
+        tasks = [asyncio.ensure_future(executor.run(job, i)) for i in range(4)]
+        await asyncio.sleep(0.005)
+        for task in tasks[2:]:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert sorted(calls) == [0, 1]
+
+    async_run(main())
+    executor.shutdown()
+
+
+# Async calculate (Rust runtime)
+calc_beatmap = Beatmap(path)
+
+
+async def calculate_executor() -> None:
+    await calculate_many_async([(calc_beatmap, {'acc': 99 - i, 'mods': i}) for i in range(PARSES)])
+
+
+async def calculate_inline() -> None:
+    # Blocking calculate on the loop thread
+    for i in range(PARSES):
+        Calculator(acc=99 - i, mods=i).calculate(calc_beatmap)
+
+
+@pytest.mark.benchmark(group="async-loop-latency-calculate")
+def test_loop_latency_calculate_inline(benchmark) -> None:
+    bench_latency(benchmark, calculate_inline)
+
+
+@pytest.mark.benchmark(group="async-loop-latency-calculate")
+def test_loop_latency_calculate_async(benchmark) -> None:
+    bench_latency(benchmark, calculate_executor)
+
+
+def test_calculate_async() -> None:
+    jobs = [(calc_beatmap, {'acc': 99 - i, 'mods': i}) for i in range(PARSES)]
+    expected = [Calculator(config).calculate(b).pp for b, config in jobs]
+
+    async def main() -> None:
+        result = await Calculator(jobs[1][1]).calculate_async(calc_beatmap)
+        assert result.pp == expected[1]
+        results = await calculate_many_async(jobs, max_concurrency=2)
+        assert [r.pp for r in results] == expected
+        # Other tasks keep running during the calculation
+        assert (await loop_latency(calculate_executor))[1] >= 3
+        assert (await loop_latency(calculate_inline))[1] == 0
+
+    async_run(main())
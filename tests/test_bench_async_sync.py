@@ -7,7 +7,7 @@ from peace_performance_python.functions import (
     raw_read_beatmap_sync
 )
 
-from . import join_beatmap, HITORIGOTO
+from . import join_beatmap, HITORIGOTO, PADORU
 from . import async_run
 
 path = join_beatmap(HITORIGOTO)
@@ -50,3 +50,19 @@ def test_sync_read_beatmap(benchmark) -> None:
 def test_sync_raw_read_beatmap(benchmark) -> None:
     def wrap(): raw_read_beatmap_sync(path)
     benchmark(wrap)
+
+
+# Per-call overhead of the sync read (small beatmap, the parse is cheap)
+small_path = join_beatmap(PADORU)
+
+
+@pytest.mark.benchmark(group="sync-read-overhead")
+def test_sync_raw_read_small_beatmap(benchmark) -> None:
+    def wrap(): raw_read_beatmap_sync(small_path)
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="sync-read-overhead")
+def test_async_rs_raw_read_small_beatmap(benchmark) -> None:
+    def wrap(): async_run(raw_read_beatmap_async_rs(small_path))
+    benchmark(wrap)
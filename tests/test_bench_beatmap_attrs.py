@@ -0,0 +1,144 @@
+import pytest
+
+from peace_performance_python.objects import Beatmap
+
+from . import join_beatmap, FREEDOM_DIVE, MEI_FRUITS
+
+
+BEATMAP = Beatmap(join_beatmap(FREEDOM_DIVE))
+
+
+def scalar_attrs(b) -> None:
+    for _ in range(100):
+        b.ar, b.od, b.cs, b.hp, b.mode, b.n_circles
+
+
+@pytest.mark.benchmark(group="bench-beatmap-attrs")
+def test_scalar_attrs(benchmark) -> None:
+    benchmark(scalar_attrs, BEATMAP)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-attrs")
+def test_scalar_attrs_raw(benchmark) -> None:
+    benchmark(scalar_attrs, BEATMAP._raw)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hit-objects")
+def test_hit_objects_index(benchmark) -> None:
+    benchmark(lambda: [BEATMAP.hit_objects[i].start_time for i in range(100)])
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hit-objects")
+def test_hit_objects_len(benchmark) -> None:
+    benchmark(lambda: len(BEATMAP.hit_objects))
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hit-objects")
+def test_hit_objects_len_raw(benchmark) -> None:
+    benchmark(lambda: len(BEATMAP._raw.hit_objects))
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hit-objects")
+def test_timing_points_repeated(benchmark) -> None:
+    benchmark(lambda: [BEATMAP.timing_points for _ in range(100)])
+
+
+def test_hit_objects_view() -> None:
+    b = Beatmap(join_beatmap(FREEDOM_DIVE))
+    raw = b._raw.hit_objects
+    view = b.hit_objects
+
+    assert view is b.hit_objects
+    assert len(view) == len(raw)
+    assert view[0].start_time == raw[0].start_time
+    assert view[-1].start_time == raw[-1].start_time
+    assert [obj.start_time for obj in view] == [obj.start_time for obj in raw]
+    with pytest.raises(IndexError):
+        view[len(raw)]
+
+    # Fetched once, even if empty
+    points = b.timing_points
+    assert b.timing_points is points
+    assert b.difficulty_points is b.difficulty_points
+
+    # Fetched again after reload
+    b.reload()
+    assert b.hit_objects is not view
+    assert b.ar == b._raw.ar
+
+
+@pytest.mark.benchmark(group="bench-beatmap-time-range")
+def test_objects_between(benchmark) -> None:
+    benchmark(lambda: BEATMAP.objects_between(60000, 70000).to_list())
+
+
+@pytest.mark.benchmark(group="bench-beatmap-time-range")
+def test_objects_between_list_filter(benchmark) -> None:
+    benchmark(lambda: [obj for obj in BEATMAP._raw.hit_objects if 60000 <= obj.start_time < 70000])
+
+
+def test_views_slicing_and_time_range() -> None:
+    b = Beatmap(join_beatmap(FREEDOM_DIVE))
+    raw = b._raw.hit_objects
+    view = b.hit_objects
+
+    sub = view[10:20]
+    assert len(sub) == 10
+    assert sub[0].start_time == raw[10].start_time
+    assert sub[-1].start_time == raw[19].start_time
+    assert len(view[5:1]) == 0
+    assert [obj.start_time for obj in view[::50]] == [obj.start_time for obj in raw[::50]]
+    assert [obj.start_time for obj in view[-3:]] == [obj.start_time for obj in raw[-3:]]
+
+    start, end = raw[100].start_time, raw[200].start_time
+    between = b.objects_between(start, end)
+    assert [obj.start_time for obj in between] == \
+        [obj.start_time for obj in raw if start <= obj.start_time < end]
+    assert len(b.objects_between(end, start)) == 0
+    # Nested views
+    assert len(view[100:300].objects_between(start, end)) == len(between)
+
+    timing_points = b.timing_points
+    assert len(timing_points) > 0
+    first = timing_points[0]
+    assert timing_points.at_time(first.time - 1) is None
+    assert timing_points.at_time(first.time).time == first.time
+    last = timing_points[-1]
+    assert timing_points.at_time(last.time + 100000).time == last.time
+    for point in timing_points:
+        assert timing_points.at_time(point.time).time == point.time
+
+
+def test_views_at_time() -> None:
+    # Many timing and difficulty points
+    b = Beatmap(join_beatmap(MEI_FRUITS))
+    for view, attr in ((b.timing_points, 'beat_len'), (b.difficulty_points, 'speed_multiplier')):
+        points = view.to_list()
+        assert len(points) > 1
+
+        def expected(time_ms: float):
+            # Linear reference: the last point at or before the time
+            matches = [point for point in points if point.time <= time_ms]
+            return matches[-1] if matches else None
+
+        def check(time_ms: float) -> None:
+            result, reference = view.at_time(time_ms), expected(time_ms)
+            if reference is None:
+                assert result is None, time_ms
+            else:
+                assert (result.time, getattr(result, attr)) == \
+                    (reference.time, getattr(reference, attr)), time_ms
+
+        # Before the first point
+        assert view.at_time(points[0].time - 1) is None
+        check(points[0].time - 1)
+        for point, next_point in zip(points, points[1:]):
+            # Exactly on a point, and between two points
+            check(point.time)
+            check((point.time + next_point.time) / 2)
+        # After the last point
+        assert view.at_time(points[-1].time + 100000).time == points[-1].time
+        check(points[-1].time + 100000)
+        # On a sub view, only its points are used
+        if points[1].time > points[0].time:
+            assert view[1:].at_time(points[0].time) is None
@@ -0,0 +1,76 @@
+import pytest
+
+from pathlib import Path
+
+from peace_performance_python.objects import Beatmap
+from peace_performance_python.functions import (
+    raw_read_beatmap_sync,
+    read_beatmaps,
+    scan_beatmap_metadata,
+    scan_beatmaps_metadata,
+    scan_directory_metadata
+)
+
+from . import join_beatmap, BEATMAP_DIR, BLUE_ZENITH_MANIA, UNFORGIVING
+
+paths = sorted(Path(BEATMAP_DIR).glob('*.osu'))
+METADATA_ATTRS = ('mode', 'mode_str', 'version', 'n_circles', 'n_sliders', 'n_spinners',
+                  'ar', 'od', 'cs', 'hp', 'sv', 'tick_rate')
+
+
+@pytest.mark.benchmark(group="bench-beatmap-metadata")
+def test_scan_metadata(benchmark) -> None:
+    benchmark(lambda: [scan_beatmap_metadata(path) for path in paths])
+
+
+@pytest.mark.benchmark(group="bench-beatmap-metadata")
+def test_full_parse(benchmark) -> None:
+    benchmark(lambda: [raw_read_beatmap_sync(path) for path in paths])
+
+
+@pytest.mark.benchmark(group="bench-beatmap-metadata-parallel")
+def test_scan_metadata_parallel(benchmark) -> None:
+    benchmark(scan_beatmaps_metadata, paths)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-metadata-parallel")
+def test_full_parse_parallel(benchmark) -> None:
+    benchmark(read_beatmaps, paths)
+
+
+def test_metadata_matches_full_parse() -> None:
+    for path in paths:
+        metadata, beatmap = scan_beatmap_metadata(path), Beatmap(path)
+        for attr in METADATA_ATTRS:
+            assert getattr(metadata, attr) == pytest.approx(getattr(beatmap, attr)), (path, attr)
+        assert metadata.n_objects == len(beatmap.hit_objects)
+
+
+def test_metadata_sources() -> None:
+    path = join_beatmap(BLUE_ZENITH_MANIA)
+    with open(path, 'rb') as f:
+        content = f.read()
+    assert scan_beatmap_metadata(content).as_dict == scan_beatmap_metadata(path).as_dict
+    assert scan_beatmap_metadata(memoryview(content)).n_sliders > 0
+
+    results = dict(scan_directory_metadata(BEATMAP_DIR))
+    assert set(results) == set(paths)
+    assert results[Path(join_beatmap(UNFORGIVING))].mode == 0
+
+    failed = scan_beatmaps_metadata([path, 'not_exists.osu'])
+    assert failed[0].mode == 3
+    assert isinstance(failed[1], Exception)
+    with pytest.raises(Exception):
+        scan_beatmap_metadata(b'not a beatmap')
+
+
+def test_metadata_raw_lines() -> None:
+    path = join_beatmap(UNFORGIVING)
+    with open(path, 'rb') as f:
+        content = f.read()
+    expected = scan_beatmap_metadata(path).as_dict
+    # Only the scanned values are decoded: invalid UTF-8 elsewhere, CRLF and a BOM are fine
+    crlf = b'\xef\xbb\xbf' + content.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+    assert scan_beatmap_metadata(crlf).as_dict == expected
+    invalid = content.replace(b'[Metadata]', b'[Metadata]\nTitle:\xff\xfe', 1)
+    assert scan_beatmap_metadata(invalid).as_dict == expected
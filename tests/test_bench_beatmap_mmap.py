@@ -0,0 +1,27 @@
+import os
+import pytest
+
+from peace_performance_python.objects import Beatmap
+
+from . import BEATMAP_DIR, join_beatmap
+
+
+BEATMAPS = sorted(f for f in os.listdir(BEATMAP_DIR) if f.endswith('.osu'))
+
+
+@pytest.mark.parametrize('file', BEATMAPS)
+@pytest.mark.benchmark(group="bench-beatmap-mmap")
+def test_read(benchmark, file: str) -> None:
+    benchmark(Beatmap, join_beatmap(file))
+
+
+@pytest.mark.parametrize('file', BEATMAPS)
+@pytest.mark.benchmark(group="bench-beatmap-mmap")
+def test_read_mmap(benchmark, file: str) -> None:
+    benchmark(Beatmap, join_beatmap(file), True)
+
+
+@pytest.mark.parametrize('file', BEATMAPS)
+def test_mmap_same_as_read(file: str) -> None:
+    path = join_beatmap(file)
+    assert Beatmap(path)._raw.as_dict == Beatmap(path, mmap=True)._raw.as_dict
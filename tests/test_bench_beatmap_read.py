@@ -1,14 +1,23 @@
+import hashlib
+import pickle
 import pytest
-from typing import Callable
+from typing import Callable, Tuple
+
+from peace_performance_python.objects import Beatmap
 
 from . import (
+    async_run,
+    join_beatmap,
     read_beatmap as _rd,
     PADORU,
     HITORIGOTO,
     FREEDOM_DIVE,
     SOTARKS,
     GALAXY_BURST,
-    UNFORGIVING
+    UNFORGIVING,
+    THE_BIG_BLACK_TAIKO,
+    MEI_FRUITS,
+    BLUE_ZENITH_MANIA
 )
 
 
@@ -44,3 +53,137 @@ def test_galaxy_burst(benchmark) -> None:
 @pytest.mark.benchmark(group="bench-beatmap")
 def test_unforgiving(benchmark) -> None:
     benchmark(read_beatmap(UNFORGIVING))
+
+
+# Bytes (in memory) vs file path ------------
+def _read_bytes(path: str) -> bytes:
+    with open(join_beatmap(path), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_hitorigoto_path(benchmark) -> None:
+    benchmark(read_beatmap(HITORIGOTO))
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_hitorigoto_bytes(benchmark) -> None:
+    buf = _read_bytes(HITORIGOTO)
+    benchmark(Beatmap.from_bytes, buf)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_hitorigoto_memoryview(benchmark) -> None:
+    # Read-only: zero-copy
+    buf = memoryview(_read_bytes(HITORIGOTO))
+    benchmark(Beatmap.from_bytes, buf)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_hitorigoto_bytearray(benchmark) -> None:
+    # Writable: copied before the parse
+    buf = bytearray(_read_bytes(HITORIGOTO))
+    benchmark(Beatmap.from_bytes, buf)
+
+
+def test_from_bytes_buffers() -> None:
+    content = _read_bytes(HITORIGOTO)
+    expected = Beatmap.from_bytes(content).to_bytes()
+    for buf in (memoryview(content), bytearray(content), memoryview(bytearray(content))):
+        assert Beatmap.from_bytes(buf).to_bytes() == expected
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_hitorigoto_bytes_async(benchmark) -> None:
+    buf = _read_bytes(HITORIGOTO)
+    def wrap(): async_run(Beatmap.from_bytes_async(buf))
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_unforgiving_path(benchmark) -> None:
+    benchmark(read_beatmap(UNFORGIVING))
+
+
+@pytest.mark.benchmark(group="bench-beatmap-bytes")
+def test_unforgiving_bytes(benchmark) -> None:
+    buf = _read_bytes(UNFORGIVING)
+    benchmark(Beatmap.from_bytes, buf)
+
+
+def test_bytes_same_as_path() -> None:
+    a, b = Beatmap(join_beatmap(HITORIGOTO)), Beatmap.from_bytes(_read_bytes(HITORIGOTO))
+    assert a._raw.as_dict == b._raw.as_dict
+
+
+# Serialized (binary snapshot) vs parsing ------------
+@pytest.mark.benchmark(group="bench-beatmap-serialized")
+def test_unforgiving_parse(benchmark) -> None:
+    buf = _read_bytes(UNFORGIVING)
+    benchmark(Beatmap.from_bytes, buf)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-serialized")
+def test_unforgiving_serialized(benchmark) -> None:
+    buf = Beatmap(join_beatmap(UNFORGIVING)).to_bytes()
+    benchmark(Beatmap.from_bytes_serialized, buf)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-serialized")
+def test_unforgiving_to_bytes(benchmark) -> None:
+    b = Beatmap(join_beatmap(UNFORGIVING))
+    benchmark(b.to_bytes)
+
+
+def read_and_hash_twice(path: str) -> Tuple[str, Beatmap]:
+    # Hash in Python, then parse: the file is read twice
+    with open(path, 'rb') as f:
+        md5 = hashlib.md5(f.read()).hexdigest()
+    return md5, Beatmap(path)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hash")
+def test_unforgiving_no_hash(benchmark) -> None:
+    benchmark(Beatmap, join_beatmap(UNFORGIVING))
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hash")
+def test_unforgiving_hash(benchmark) -> None:
+    benchmark(Beatmap, join_beatmap(UNFORGIVING), hash=True)
+
+
+@pytest.mark.benchmark(group="bench-beatmap-hash")
+def test_unforgiving_hash_python(benchmark) -> None:
+    benchmark(read_and_hash_twice, join_beatmap(UNFORGIVING))
+
+
+def test_serialized_round_trip() -> None:
+    for path in (HITORIGOTO, UNFORGIVING):
+        a = Beatmap(join_beatmap(path))
+        buf = a.to_bytes()
+        b = Beatmap.from_bytes_serialized(buf)
+        assert a._raw.as_dict == b._raw.as_dict
+        assert b.to_bytes() == buf
+        assert [o.start_time for o in a.hit_objects] == [o.start_time for o in b.hit_objects]
+
+        c = pickle.loads(pickle.dumps(a))
+        assert c.path == a.path
+        assert c.to_bytes() == buf
+
+
+def test_serialized_round_trip_views() -> None:
+    for path in (HITORIGOTO, THE_BIG_BLACK_TAIKO, MEI_FRUITS, BLUE_ZENITH_MANIA):
+        a = Beatmap(join_beatmap(path))
+        b = Beatmap.from_bytes_serialized(a.to_bytes())
+        assert a._raw.as_dict == b._raw.as_dict
+        assert [p.as_dict for p in a.timing_points] == [p.as_dict for p in b.timing_points]
+        assert [p.as_dict for p in a.difficulty_points] == [p.as_dict for p in b.difficulty_points]
+        assert [(o.start_time, o.pos.x, o.pos.y, o.kind.as_dict) for o in a.hit_objects] == \
+            [(o.start_time, o.pos.x, o.pos.y, o.kind.as_dict) for o in b.hit_objects]
+
+
+def test_serialized_invalid() -> None:
+    buf = Beatmap(join_beatmap(HITORIGOTO)).to_bytes()
+    for invalid in (b'', b'not a beatmap', buf[:len(buf) // 2]):
+        with pytest.raises(Exception):
+            Beatmap.from_bytes_serialized(invalid)
@@ -0,0 +1,73 @@
+import os
+import sys
+import pytest
+
+from peace_performance_python.prelude import Beatmap, Calculator, PPWorkerPool
+
+from . import BEATMAP_DIR, join_beatmap
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason='requires multiprocessing.shared_memory')
+
+
+PATHS = [join_beatmap(f) for f in sorted(os.listdir(BEATMAP_DIR)) if f.endswith('.osu')]
+BEATMAPS = {i: Beatmap(path) for i, path in enumerate(PATHS)}
+# Recalculation-like jobs: many scores per beatmap
+JOBS = [(i, {'acc': 90 + (n % 100) * 0.1, 'miss': n % 5}) for i in BEATMAPS for n in range(200)]
+
+
+def run_single() -> None:
+    for i, config in JOBS:
+        Calculator(config).calculate(BEATMAPS[i]).pp
+
+
+def make_pool(workers: int) -> PPWorkerPool:
+    pool = PPWorkerPool(workers=workers)
+    for i, beatmap in BEATMAPS.items():
+        pool.add_beatmap(i, beatmap)
+    # Warm up: start the workers
+    pool.calculate_many(JOBS[:workers])
+    return pool
+
+
+def run_pool(benchmark, workers: int) -> None:
+    with make_pool(workers) as pool:
+        benchmark.pedantic(pool.calculate_many, args=(JOBS,), rounds=3)
+
+
+@pytest.mark.benchmark(group="bench-pp-pool")
+def test_pool_single_process(benchmark) -> None:
+    benchmark.pedantic(run_single, rounds=3)
+
+
+@pytest.mark.benchmark(group="bench-pp-pool")
+def test_pool_1(benchmark) -> None:
+    run_pool(benchmark, 1)
+
+
+@pytest.mark.benchmark(group="bench-pp-pool")
+def test_pool_2(benchmark) -> None:
+    run_pool(benchmark, 2)
+
+
+@pytest.mark.benchmark(group="bench-pp-pool")
+def test_pool_4(benchmark) -> None:
+    run_pool(benchmark, 4)
+
+
+@pytest.mark.benchmark(group="bench-pp-pool")
+def test_pool_8(benchmark) -> None:
+    run_pool(benchmark, 8)
+
+
+def test_pool_matches_calculator() -> None:
+    jobs = JOBS[::37]
+    with make_pool(2) as pool:
+        results = pool.calculate_many(jobs, chunksize=4)
+        assert pool.submit(0, {'acc': 95}).result()['pp'] == Calculator(acc=95).calculate(BEATMAPS[0]).pp
+        with pytest.raises(KeyError):
+            pool.submit('not_added', {})
+    assert len(results) == len(jobs)
+    for (i, config), result in zip(jobs, results):
+        expected = Calculator(config).calculate(BEATMAPS[i])
+        assert result['pp'] == expected.pp
+        assert result['stars'] == expected.stars
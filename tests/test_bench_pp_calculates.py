@@ -62,3 +62,102 @@ def test_calculate_6(benchmark) -> CalcResult:
         c.setattr('miss', 3)
         c.calculate(beatmap)
     benchmark(wrap)
+
+
+ACC_SWEEP = [90 + i * 0.1 for i in range(100)]
+
+
+@pytest.mark.benchmark(group="bench-pp-batch")
+def test_calculate_sweep_loop(benchmark) -> None:
+    def wrap():
+        for acc in ACC_SWEEP:
+            Calculator({'acc': acc, 'miss': 3}).calculate(beatmap)
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-batch")
+def test_calculate_sweep_many(benchmark) -> None:
+    configs = [{'acc': acc, 'miss': 3} for acc in ACC_SWEEP]
+    def wrap(): Calculator().calculate_many(beatmap, configs)
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-batch")
+def test_calculate_sweep_arrays(benchmark) -> None:
+    arrays = {'acc': ACC_SWEEP}
+    def wrap(): calculate_batch(beatmap, arrays)
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-fast-path")
+def test_calculate_then_pp(benchmark) -> None:
+    c = Calculator(acc=98.8, miss=3)
+    def wrap(): c.calculate(beatmap).pp
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-fast-path")
+def test_calculate_then_as_dict(benchmark) -> None:
+    c = Calculator(acc=98.8, miss=3)
+    def wrap(): c.calculate(beatmap).as_dict
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-fast-path")
+def test_calculate_pp_only(benchmark) -> None:
+    c = Calculator(acc=98.8, miss=3)
+    def wrap(): c.calculate_pp_only(beatmap)
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-fast-path")
+def test_calculate_tuple(benchmark) -> None:
+    c = Calculator(acc=98.8, miss=3)
+    def wrap(): c.calculate_tuple(beatmap)
+    benchmark(wrap)
+
+
+def test_fast_path_matches_calculate() -> None:
+    c = Calculator(acc=98.8, miss=3)
+    result = c.calculate(beatmap)
+    assert c.calculate_pp_only(beatmap) == result.pp
+    assert c.calculate_tuple(beatmap) == (result.pp, result.stars, result.raw_stars.max_combo)
+
+
+CURVE_ACCS = [95, 97, 98, 99, 100]
+
+
+@pytest.mark.benchmark(group="bench-pp-curve")
+def test_pp_curve_loop(benchmark) -> None:
+    def wrap():
+        for acc in CURVE_ACCS:
+            Calculator(acc=acc).calculate(beatmap).pp
+    benchmark(wrap)
+
+
+@pytest.mark.benchmark(group="bench-pp-curve")
+def test_pp_curve(benchmark) -> None:
+    c = Calculator()
+    def wrap(): c.pp_curve(beatmap, CURVE_ACCS)
+    benchmark(wrap)
+
+
+def test_pp_curve_matches_single() -> None:
+    accs = [95, 97.5, 99, 100]
+    misses = [3, 1, 0, 0]
+    curve = Calculator(mods=16).pp_curve(beatmap, accs, misses)
+    assert len(curve) == len(accs)
+    for acc, miss, pp in zip(accs, misses, curve):
+        assert pp == Calculator(mods=16, acc=acc, miss=miss).calculate(beatmap).pp
+    with pytest.raises(ValueError):
+        Calculator().pp_curve(beatmap, accs, [0])
+
+
+def test_calculate_many_matches_single() -> None:
+    configs = [{'acc': 95}, {'acc': 99, 'miss': 1}, {'mods': 16}]
+    results = Calculator(combo=100).calculate_many(beatmap, configs)
+    arrays = calculate_batch(beatmap, {'acc': [95, 99], 'miss': [0, 1]})
+    assert len(results) == 3 and len(arrays) == 2
+    for config, result in zip(configs, results):
+        assert result.pp == Calculator(combo=100, **config).calculate(beatmap).pp
+    assert arrays[1].pp == Calculator(acc=99, miss=1).calculate(beatmap).pp
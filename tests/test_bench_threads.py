@@ -0,0 +1,40 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from peace_performance_python.prelude import Beatmap, Calculator
+
+from . import BEATMAP_DIR, join_beatmap
+
+
+# The whole test_beatmaps/ set, parse + calculate for each .osu file
+PATHS = [join_beatmap(f) for f in sorted(os.listdir(BEATMAP_DIR)) if f.endswith('.osu')] * 4
+
+
+def parse_and_calc(path: str) -> float:
+    return Calculator(acc=98.8, miss=3).calculate(Beatmap(path)).pp
+
+
+def run_threads(workers: int) -> None:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(parse_and_calc, PATHS))
+
+
+@pytest.mark.benchmark(group="bench-gil-release-threads")
+def test_threads_1(benchmark) -> None:
+    benchmark(run_threads, 1)
+
+
+@pytest.mark.benchmark(group="bench-gil-release-threads")
+def test_threads_2(benchmark) -> None:
+    benchmark(run_threads, 2)
+
+
+@pytest.mark.benchmark(group="bench-gil-release-threads")
+def test_threads_4(benchmark) -> None:
+    benchmark(run_threads, 4)
+
+
+@pytest.mark.benchmark(group="bench-gil-release-threads")
+def test_threads_8(benchmark) -> None:
+    benchmark(run_threads, 8)
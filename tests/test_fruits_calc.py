@@ -1,7 +1,7 @@
 import pytest
 from peace_performance_python.objects.utils import Mods
 
-from peace_performance_python.prelude import Beatmap, Calculator
+from peace_performance_python.prelude import Beatmap, Calculator, GradualCalculator
 
 from . import (
     join_beatmap,
@@ -38,3 +38,39 @@ def test_std_hitorigoto_convert_fruits() -> None:
     
     pp_hdhr = Calculator(mods=Mods.HARDROCK | Mods.HIDDEN).calculate(b).pp
     assert pp_hdhr > pp_ss
+
+
+@pytest.mark.fruits_pp
+def test_gradual() -> None:
+    b = _gb(MEI_FRUITS)
+    full = Calculator().calculate(b)
+    g = GradualCalculator(b)
+
+    # One step per fruit and droplet: not cut at the amount of hit objects (juice streams)
+    last = None
+    while True:
+        result = g.process_next(n300=1)
+        if result is None:
+            break
+        last = result
+    assert g.finished
+    assert g.processed == full.raw_stars.n_fruits + full.raw_stars.n_droplets > g.n_objects
+    assert g.state['combo'] == full.raw_stars.max_combo
+    assert abs(last.pp - full.pp) < 1e-3
+
+
+@pytest.mark.fruits_pp
+def test_gradual_mid_play() -> None:
+    b = _gb(MEI_FRUITS)
+    g = GradualCalculator(b)
+
+    for _ in range(50):
+        g.process_next(n300=1)
+    g.process_next(miss=1, n300=4, n_objects=5)
+    result = g.process_next(n300=10, n_objects=10, combo=14)
+    assert g.processed == 65
+
+    # A step is a fruit or a droplet, so are the passed objects of a partial play
+    s = g.state
+    partial = Calculator(passed_obj=65, n300=s['n300'], miss=s['miss'], combo=14).calculate(b)
+    assert abs(result.pp - partial.pp) < 1e-3
@@ -1,7 +1,7 @@
 import pytest
 from peace_performance_python.objects.utils import Mods
 
-from peace_performance_python.prelude import Beatmap, Calculator
+from peace_performance_python.prelude import Beatmap, Calculator, GradualCalculator
 
 from . import (
     join_beatmap,
@@ -38,3 +38,34 @@ def test_std_hitorigoto_convert_mania() -> None:
     
     pp_hdhr = Calculator(mods=Mods.HARDROCK | Mods.HIDDEN).calculate(b).pp
     assert pp_hdhr > pp_ss
+
+
+
+@pytest.mark.mania_pp
+def test_gradual() -> None:
+    b = _gb(BLUE_ZENITH_MANIA)
+    full = Calculator(score=1000000).calculate(b)
+    g = GradualCalculator(b)
+
+    last = None
+    while True:
+        result = g.process_next(n300=10, score=1000000, n_objects=10)
+        if result is None:
+            break
+        last = result
+    assert g.finished
+    assert g.processed == g.n_objects
+    assert abs(last.pp - full.pp) < 1e-3
+
+
+@pytest.mark.mania_pp
+def test_gradual_mid_play() -> None:
+    b = _gb(BLUE_ZENITH_MANIA)
+    g = GradualCalculator(b)
+
+    g.process_next(n300=90, n100=8, miss=2, score=200000, n_objects=100)
+    result = g.process_next(n300=50, score=300000, n_objects=50)
+    assert g.processed == 150
+
+    partial = Calculator(passed_obj=150, score=300000).calculate(b)
+    assert abs(result.pp - partial.pp) < 1e-3
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import shutil
+
+from peace_performance_python.prelude import Beatmap, read_beatmaps, iter_beatmaps
+
+from . import BEATMAP_DIR, HITORIGOTO, PADORU, join_beatmap
+
+
+PATHS = [join_beatmap(f) for f in sorted(os.listdir(BEATMAP_DIR)) if f.endswith('.osu')]
+
+
+def test_read_beatmaps() -> None:
+    results = read_beatmaps(PATHS + ['not_exists.osu'], workers=4)
+    assert len(results) == len(PATHS) + 1
+    for path, beatmap in zip(PATHS, results):
+        assert isinstance(beatmap, Beatmap)
+        assert beatmap.path == path
+        assert beatmap.n_circles == Beatmap(path).n_circles
+    assert isinstance(results[-1], Exception)
+
+
+def test_iter_beatmaps() -> None:
+    results = dict(iter_beatmaps(PATHS + ['not_exists.osu'], workers=4))
+    assert set(results) == set(PATHS + ['not_exists.osu'])
+    assert isinstance(results['not_exists.osu'], Exception)
+    assert all(isinstance(results[p], Beatmap) for p in PATHS)
+
+
+def test_cache_dir(tmp_path) -> None:
+    cache_dir = tmp_path / 'cache'
+    path = tmp_path / HITORIGOTO
+    shutil.copy(join_beatmap(HITORIGOTO), path)
+
+    # Miss: parsed then written
+    a = Beatmap(path, cache_dir=cache_dir)
+    snapshots = os.listdir(cache_dir)
+    assert len(snapshots) == 1 and snapshots[0].endswith('.ppyb')
+    # Hit: loaded from the snapshot
+    b = Beatmap.create(path, cache_dir=cache_dir)
+    assert a._raw.as_dict == b._raw.as_dict
+    assert a.to_bytes() == b.to_bytes()
+
+    # The snapshot of a modified .osu file replaces the old one (not a stale hit)
+    shutil.copy(join_beatmap(PADORU), path)
+    modified = Beatmap(path).to_bytes()
+    assert modified != a.to_bytes()
+    assert Beatmap(path, cache_dir=cache_dir).to_bytes() == modified
+    assert os.listdir(cache_dir) == snapshots
+    assert Beatmap(path, cache_dir=cache_dir).to_bytes() == modified
+
+    # Corrupted snapshots are replaced
+    for name in os.listdir(cache_dir):
+        (cache_dir / name).write_bytes(b'corrupted')
+    assert Beatmap(path, cache_dir=cache_dir).to_bytes() == modified
+
+    results = read_beatmaps(PATHS, cache_dir=cache_dir)
+    assert all(isinstance(beatmap, Beatmap) for beatmap in results)
+    assert len(os.listdir(cache_dir)) == 1 + len(PATHS)
+    assert all(isinstance(beatmap, Beatmap) for _, beatmap in iter_beatmaps(PATHS, cache_dir=cache_dir))
+
+
+def test_hash(tmp_path) -> None:
+    path = join_beatmap(HITORIGOTO)
+    with open(path, 'rb') as f:
+        content = f.read()
+    md5 = hashlib.md5(content).hexdigest()
+
+    assert Beatmap(path).md5 is None
+    b = Beatmap(path, hash=True)
+    assert b.md5 == md5
+    assert isinstance(b.fast_hash, int)
+    assert Beatmap(path, mmap=True, hash=True).md5 == md5
+    assert Beatmap.from_bytes(content, hash=True).fast_hash == b.fast_hash
+    assert read_beatmaps([path], hash=True)[0].md5 == md5
+    assert dict(iter_beatmaps([path], hash=True))[path].md5 == md5
+
+    # Kept in the snapshots (serialized and cached)
+    assert Beatmap.from_bytes_serialized(b.to_bytes()).md5 == md5
+    cache_dir = tmp_path / 'cache'
+    Beatmap(path, cache_dir=cache_dir)
+    assert Beatmap(path, cache_dir=cache_dir, hash=True).md5 == md5
+    assert Beatmap(path, cache_dir=cache_dir).md5 == md5
@@ -0,0 +1,73 @@
+import os
+
+from peace_performance_python.prelude import Beatmap, Calculator, RecalcPipeline
+
+from . import BEATMAP_DIR, join_beatmap
+
+
+# md5 -> path, the file names are used as fake md5s
+FILES = {f: join_beatmap(f) for f in sorted(os.listdir(BEATMAP_DIR)) if f.endswith('.osu')}
+STD_FILES = ['hitorigoto.osu', 'freedom_dive.osu', 'padoru.osu']
+
+
+def make_rows(n: int):
+    for i in range(n):
+        yield {
+            'id': i,
+            'md5': STD_FILES[i % len(STD_FILES)],
+            'mode': 0,
+            'mods': (0, 8, 16)[i // 7 % 3],
+            'n300': 100 + i % 50,
+            'n100': i % 7,
+            'n50': 0,
+            'katu': 0,
+            'miss': i % 3,
+            'combo': 80 + i % 20,
+        }
+
+
+def test_pipeline() -> None:
+    pipeline = RecalcPipeline(FILES.get, cache_limit=2, batch_size=64)
+    results = list(pipeline.run(make_rows(300)))
+
+    assert [r.offset for r in results] == list(range(300))
+    assert [r.row['id'] for r in results] == list(range(300))
+    assert all(r.error is None for r in results)
+    assert pipeline.processed == 300 and pipeline.failed == 0
+    assert pipeline.throughput > 0
+    for r in results[::29]:
+        config = {k: r.row[k] for k in ('mode', 'mods', 'n300', 'n100', 'n50', 'katu', 'miss', 'combo')}
+        assert r.pp == Calculator(config).calculate_pp_only(Beatmap(FILES[r.row['md5']]))
+
+
+def test_pipeline_resume() -> None:
+    full = [r.pp for r in RecalcPipeline(FILES.get, batch_size=50).run(make_rows(200))]
+
+    pipeline = RecalcPipeline(FILES.get, batch_size=50)
+    first = []
+    for r in pipeline.run(make_rows(200)):
+        first.append(r.pp)
+        if r.offset == 120:
+            break
+    resumed = [r for r in pipeline.run(make_rows(200), offset=121)]
+    assert resumed[0].offset == 121
+    assert first + [r.pp for r in resumed] == full
+
+
+def test_pipeline_missing_beatmap() -> None:
+    rows = [dict(row, md5='not_exists') if row['id'] % 2 else row for row in make_rows(10)]
+    results = list(RecalcPipeline(FILES.get).run(rows))
+    assert all((r.error is None) == (r.row['id'] % 2 == 0) for r in results)
+    assert all(r.pp is None for r in results if r.error)
+
+
+def test_pipeline_invalid_row() -> None:
+    rows = [dict(row, n300='invalid') if row['id'] == 3 else row for row in make_rows(10)]
+    pipeline = RecalcPipeline(FILES.get)
+    results = list(pipeline.run(rows))
+    assert [r.row['id'] for r in results] == list(range(10))
+    assert results[3].error is not None and results[3].pp is None
+    assert all(r.error is None and r.pp is not None for r in results if r.row['id'] != 3)
+    assert pipeline.failed == 1
+    # One miss per loaded beatmap
+    assert pipeline.store.misses == len(STD_FILES)
@@ -1,7 +1,7 @@
 import pytest
 from peace_performance_python.objects.utils import Mods
 
-from peace_performance_python.prelude import Beatmap, Calculator
+from peace_performance_python.prelude import Beatmap, Calculator, GradualCalculator
 
 from . import (
     join_beatmap,
@@ -24,3 +24,115 @@ def test_hitorigoto() -> None:
 
     pp_hdhr = Calculator(mods=Mods.HARDROCK | Mods.HIDDEN).calculate(b).pp
     assert pp_hdhr > pp_ss
+
+
+@pytest.mark.std_pp
+def test_difficulty_cache() -> None:
+    b = _gb(HITORIGOTO)
+
+    pp_95 = Calculator(acc=95).calculate(b).pp
+    assert b.difficulty_cache_misses == 1
+    assert b.difficulty_cache_hits == 0
+
+    # Same (mode, mods, passed_obj), only the performance should be recalculated
+    pp_95_cached = Calculator(acc=95).calculate(b).pp
+    pp_ss = Calculator().calculate(b).pp
+    assert pp_95_cached == pp_95
+    assert pp_95 < pp_ss
+    assert b.difficulty_cache_hits == 2
+    assert b.difficulty_cache_size == 1
+
+    Calculator(mods=Mods.HARDROCK).calculate(b)
+    assert b.difficulty_cache_size == 2
+
+    b.clear_difficulty_cache()
+    assert b.difficulty_cache_size == 0
+    assert b.difficulty_cache_hits == 0
+
+
+@pytest.mark.std_pp
+def test_difficulty_cache_limit() -> None:
+    b = _gb(HITORIGOTO)
+    assert b.difficulty_cache_limit == 64
+    b.set_difficulty_cache_limit(2)
+
+    Calculator().calculate(b)
+    Calculator(mods=Mods.HARDROCK).calculate(b)
+    # NM is used again, so HR is the least recently used one
+    Calculator(acc=95).calculate(b)
+    Calculator(mods=Mods.DOUBLETIME).calculate(b)
+    assert b.difficulty_cache_size == 2
+
+    misses = b.difficulty_cache_misses
+    Calculator(acc=90).calculate(b)
+    assert b.difficulty_cache_misses == misses
+    Calculator(mods=Mods.HARDROCK).calculate(b)
+    assert b.difficulty_cache_misses == misses + 1
+
+    b.set_difficulty_cache_limit(0)
+    assert b.difficulty_cache_size == 0
+    Calculator().calculate(b)
+    assert b.difficulty_cache_size == 0
+
+
+@pytest.mark.std_pp
+def test_gradual() -> None:
+    b = _gb(HITORIGOTO)
+    full = Calculator().calculate(b)
+    g = GradualCalculator(b)
+
+    results = [g.process_next(n300=1).pp for _ in range(g.n_objects - 1)]
+    # pp only increases with a full combo
+    assert results == sorted(results)
+
+    # The combo is derived from the processed objects (slider ticks and ends included)
+    last = g.process_next(n300=1)
+    assert not g.finished
+    assert g.process_next(n300=1) is None
+    assert g.finished
+    assert g.state['n300'] == g.processed == g.n_objects
+    assert g.state['combo'] == full.raw_stars.max_combo
+    assert abs(last.pp - full.pp) < 1e-3
+
+
+@pytest.mark.std_pp
+def test_gradual_mid_play() -> None:
+    b = _gb(HITORIGOTO)
+    g = GradualCalculator(b)
+
+    for _ in range(40):
+        g.process_next(n300=1)
+    # The misses of a step come before its hits: the combo restarts at the 100
+    g.process_next(miss=1, n100=1, n_objects=2)
+    combo_after_miss = g.state['combo']
+    for _ in range(20):
+        result = g.process_next(n300=1)
+    assert g.processed == 62
+    assert g.state['combo'] >= combo_after_miss
+
+    # Same as a partial play of the processed objects
+    s = g.state
+    partial = Calculator(passed_obj=g.processed, n300=s['n300'], n100=s['n100'],
+                         miss=s['miss'], combo=s['combo']).calculate(b)
+    assert abs(result.pp - partial.pp) < 1e-3
+    assert result.pp < Calculator(n300=s['n300'], n100=s['n100'], miss=s['miss'],
+                                  combo=s['combo']).calculate(b).pp
+
+
+@pytest.mark.std_pp
+def test_difficulty_table() -> None:
+    b = _gb(HITORIGOTO)
+    mods_list = [0, Mods.HIDDEN, Mods.NOFAIL, Mods.HARDROCK, Mods.DOUBLETIME,
+                 Mods.DOUBLETIME | Mods.NIGHTCORE, Mods.HIDDEN | Mods.DOUBLETIME, Mods.NIGHTCORE]
+    table = b.difficulty_table(mods_list)
+
+    assert [result.mods for result in table] == mods_list
+    # NM, HR, DT (NC / HDDT share DT, a bare NC bit has no clock rate)
+    assert b.difficulty_cache_misses == 3
+    for mods, result in zip(mods_list, table):
+        expected = Calculator(mods=mods).calculate(_gb(HITORIGOTO))
+        assert result.stars == expected.stars
+        assert result.raw_stars.max_combo == expected.raw_stars.max_combo
+        assert abs(result.pp - expected.pp) < 1e-9
+    assert table[1].stars == table[0].stars
+    assert table[1].pp > table[0].pp
@@ -1,7 +1,7 @@
 import pytest
 from peace_performance_python.objects.utils import Mods
 
-from peace_performance_python.prelude import Beatmap, Calculator
+from peace_performance_python.prelude import Beatmap, Calculator, GradualCalculator
 
 from . import (
     join_beatmap,
@@ -38,3 +38,38 @@ def test_std_hitorigoto_convert_taiko() -> None:
 
     pp_hdhr = Calculator(mods=Mods.HARDROCK | Mods.HIDDEN).calculate(b).pp
     assert pp_hdhr > pp_ss
+
+
+@pytest.mark.taiko_pp
+def test_gradual() -> None:
+    b = _gb(THE_BIG_BLACK_TAIKO)
+    g = GradualCalculator(b)
+
+    last = None
+    while True:
+        result = g.process_next(n300=1)
+        if result is None:
+            break
+        last = result
+    assert g.finished
+    assert g.processed == g.state['n300'] > 0
+    # Same as a full calculation of the same score
+    full = Calculator(n300=g.state['n300'], miss=0, combo=g.state['combo']).calculate(b)
+    assert abs(last.pp - full.pp) < 1e-3
+
+
+@pytest.mark.taiko_pp
+def test_gradual_mid_play() -> None:
+    b = _gb(THE_BIG_BLACK_TAIKO)
+    g = GradualCalculator(b)
+
+    for _ in range(30):
+        g.process_next(n300=1)
+    g.process_next(miss=1)
+    result = g.process_next(n300=18, n100=2, n_objects=20)
+    assert g.processed == 51
+
+    s = g.state
+    partial = Calculator(passed_obj=51, n300=s['n300'], n100=s['n100'],
+                         miss=s['miss'], combo=s['combo']).calculate(b)
+    assert abs(result.pp - partial.pp) < 1e-3